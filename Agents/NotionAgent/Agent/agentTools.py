@@ -1,3 +1,4 @@
+import json
 from typing import Optional, Type, Any
 from langchain_core.pydantic_v1 import Field, validator
 
@@ -5,13 +6,12 @@ from langfuse.decorators import observe
 from operations.notion.notion_client import NotionClient
 from operations.blocks.blockDict import BlockDict
 from operations.blocks.blockHolder import FilteringOptions
-from tz_common import log, JsonConverter
+from tz_common import log
 from tz_common import CustomUUID
 from tz_common.tasks import AgentTask, AgentTaskList
 from tz_common.langchain_wrappers import ContextAwareTool, AgentState, AddTaskTool, CompleteTaskTool, CompleteTaskWithDataTool
 
 client = NotionClient()
-json_converter = JsonConverter()
 
 
 def handle_client_response(result, context: AgentState, operation_name: str, 
@@ -52,26 +52,28 @@ def handle_client_response(result, context: AgentState, operation_name: str,
 		log.error(f"Unexpected type of client response: {type(result)}", str(result))
 		raise TypeError(f"Unexpected type: {type(result)}")
 	
-	# Apply filtering to all blocks in the BlockDict once
-	filtered_result_dict = {}
-	for block_id, content in block_dict.items():
-		# Apply AGENT_OPTIMIZED filtering to each block
-		filtered_content = client.block_holder.apply_filters(content.copy(), [FilteringOptions.AGENT_OPTIMIZED])
-		filtered_result_dict[block_id] = filtered_content
+	# Filtered views are cached per content, so blocks read again are neither filtered nor serialized again
+	filtered_views = {block_id: client.filtered_views.get(content, [FilteringOptions.AGENT_OPTIMIZED])
+		for block_id, content in block_dict.items()}
 	
 	# Add to visited blocks if requested
 	if add_to_visited:
 		if visited_block_id is not None:
 			# Add single block with specific ID (for page details)
-			if filtered_result_dict:
-				first_key = next(iter(filtered_result_dict.keys()))
-				context["visitedBlocks"].add_block(visited_block_id, filtered_result_dict[first_key])
+			if filtered_views:
+				first_key = next(iter(filtered_views.keys()))
+				context["visitedBlocks"].add_block(visited_block_id, filtered_views[first_key].content)
 		else:
 			# Add all blocks from result to visitedBlocks
-			for block_id, content in filtered_result_dict.items():
-				context["visitedBlocks"].add_block(int(block_id), content)
+			for block_id, view in filtered_views.items():
+				context["visitedBlocks"].add_block(int(block_id), view.content)
 	
-	return json_converter.remove_spaces(filtered_result_dict)
+	# Same output as json_converter.remove_spaces() of the whole dict, assembled from serialized views
+	items = [f"{json.dumps(str(block_id))}:{view.serialized}" for block_id, view in filtered_views.items()]
+	# Blocks served from cache while their refetch didn't finish in time may be outdated
+	if block_dict.stale_ids:
+		items.append(f'"stale_ids":{json.dumps(sorted(block_dict.stale_ids))}')
+	return "{" + ",".join(items) + "}"
 
 
 class NotionSearchTool(ContextAwareTool):
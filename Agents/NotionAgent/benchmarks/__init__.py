@@ -0,0 +1,5 @@
+"""
+NotionAgent.benchmarks package - standalone performance measurements, run from the NotionAgent directory:
+
+	python -m benchmarks.<module>
+"""
@@ -0,0 +1,52 @@
+"""
+Memory saved and CPU cost of compressing cached content.
+
+	python -m benchmarks.cache_codec
+"""
+
+import time
+from typing import List
+
+from operations.blocks.cacheCodec import CacheCodec, Compression, zstandard
+
+from .payloads import generate_block_payloads, generate_page_payloads, generate_search_payloads
+
+PAYLOAD_COUNT = 2000
+
+
+def measure(name: str, payloads: List[str], codec: CacheCodec):
+	start_time = time.perf_counter()
+	encoded = [codec.encode(payload) for payload in payloads]
+	encode_time = time.perf_counter() - start_time
+
+	start_time = time.perf_counter()
+	for stored in encoded:
+		codec.decode(stored)
+	decode_time = time.perf_counter() - start_time
+
+	raw_size = sum(len(payload.encode("utf-8")) for payload in payloads)
+	stored_size = sum(len(stored.encode("utf-8")) if isinstance(stored, str) else len(stored) for stored in encoded)
+	compressed_count = sum(1 for stored in encoded if isinstance(stored, bytes))
+
+	print(f"{name:<28} {codec.compression.value:<5} {raw_size / 1024:>9.0f} KB -> {stored_size / 1024:>7.0f} KB "
+		f"(x{raw_size / stored_size:4.1f}, {compressed_count}/{len(payloads)} compressed) "
+		f"encode {encode_time / len(payloads) * 1e6:6.1f} us, decode {decode_time / len(payloads) * 1e6:6.1f} us per item")
+
+
+def main():
+	datasets = [
+		("blocks", generate_block_payloads(PAYLOAD_COUNT)),
+		("pages", generate_page_payloads(PAYLOAD_COUNT)),
+		("search results (20 pages)", generate_search_payloads(PAYLOAD_COUNT // 10)),
+	]
+
+	compressions = [Compression.ZLIB] + ([Compression.ZSTD] if zstandard is not None else [])
+	for threshold in [0, 512]:
+		print(f"\nThreshold: {threshold} characters")
+		for name, payloads in datasets:
+			for compression in compressions:
+				measure(name, payloads, CacheCodec(compression=compression, threshold=threshold))
+
+
+if __name__ == "__main__":
+	main()
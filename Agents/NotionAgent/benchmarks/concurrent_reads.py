@@ -0,0 +1,79 @@
+"""
+Read throughput of BlockCache with a growing number of reader threads, with and without a concurrent writer.
+"Exclusive" runs every read under the write lock, as all operations were serialized before readers got their own connections.
+Reads bypass the parsed object cache, so that every one of them reaches SQLite.
+
+	python -m benchmarks.concurrent_reads
+"""
+
+import os
+import random
+import threading
+import time
+import uuid
+from typing import List
+
+from operations.blocks.blockCache import BlockCache
+
+from .payloads import generate_block_payloads
+
+BLOCK_COUNT = 5000
+READS_PER_THREAD = 5000
+THREAD_COUNTS = [1, 2, 4, 8]
+
+
+def read_blocks(cache: BlockCache, keys: List[str], exclusive: bool, seed: int):
+	rng = random.Random(seed)
+	for _ in range(READS_PER_THREAD):
+		key = rng.choice(keys)
+		if exclusive:
+			with cache.lock:
+				cache.get_block(key)
+		else:
+			cache.get_block(key)
+
+
+def write_blocks(cache: BlockCache, keys: List[str], payloads: List[str], stop: threading.Event):
+	rng = random.Random(1)
+	while not stop.is_set():
+		cache.add_block(rng.choice(keys), rng.choice(payloads))
+
+
+def measure(cache: BlockCache, keys: List[str], payloads: List[str], thread_count: int, exclusive: bool, with_writer: bool) -> float:
+	readers = [threading.Thread(target=read_blocks, args=(cache, keys, exclusive, seed)) for seed in range(thread_count)]
+	stop = threading.Event()
+	writer = threading.Thread(target=write_blocks, args=(cache, keys, payloads, stop))
+
+	start_time = time.perf_counter()
+	if with_writer:
+		writer.start()
+	for reader in readers:
+		reader.start()
+	for reader in readers:
+		reader.join()
+	elapsed = time.perf_counter() - start_time
+
+	stop.set()
+	if with_writer:
+		writer.join()
+	return thread_count * READS_PER_THREAD / elapsed
+
+
+def main():
+	cache = BlockCache(db_path=':memory:', run_on_start=False)
+	payloads = generate_block_payloads(BLOCK_COUNT)
+	keys = [str(uuid.uuid4()) for _ in range(BLOCK_COUNT)]
+	cache.add_blocks_bulk(list(zip(keys, payloads)))
+
+	print(f"{os.cpu_count()} CPUs, {BLOCK_COUNT} blocks, {READS_PER_THREAD} reads per thread")
+	for with_writer in [False, True]:
+		print(f"\n{'With' if with_writer else 'Without'} a concurrent writer, reads per second:")
+		print(f"{'threads':>8} {'exclusive':>10} {'shared':>10}")
+		for thread_count in THREAD_COUNTS:
+			exclusive = measure(cache, keys, payloads, thread_count, exclusive=True, with_writer=with_writer)
+			shared = measure(cache, keys, payloads, thread_count, exclusive=False, with_writer=with_writer)
+			print(f"{thread_count:>8} {exclusive:>10.0f} {shared:>10.0f}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,73 @@
+"""
+Throughput of Index UUID <-> int ID lookups with the in-memory UuidMap, and with every lookup going to SQLite as before it.
+Known UUIDs are those already in the index, as most UUIDs found in payloads are.
+
+	python -m benchmarks.index_lookups
+"""
+
+import threading
+import time
+import uuid
+from typing import Callable, List, Optional
+
+from tz_common import CustomUUID
+
+from operations.blocks.index import Index
+from operations.blocks.uuidMap import UuidMap
+
+UUID_COUNT = 5000
+THREAD_COUNTS = [1, 4]
+
+
+class UnmappedUuids(UuidMap):
+	"""Remembers nothing, so that every lookup is a query."""
+
+	def add(self, int_id: int, uuid_str: str, uuid: Optional[CustomUUID] = None):
+		pass
+
+
+def measure(operation: Callable[[int], None], count: int, thread_count: int) -> float:
+	threads = [threading.Thread(target=lambda: [operation(i) for i in range(count)]) for _ in range(thread_count)]
+	start_time = time.perf_counter()
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	return thread_count * count / (time.perf_counter() - start_time)
+
+
+def run(name: str, uuid_map: UuidMap, uuids: List[CustomUUID]):
+	index = Index(db_path=':memory:', run_on_start=False)
+	index.uuid_map = uuid_map
+
+	start_time = time.perf_counter()
+	int_ids = [index.add_uuid(uuid_obj) for uuid_obj in uuids]
+	insert_rate = len(uuids) / (time.perf_counter() - start_time)
+	print(f"\n{name}: add_uuid of new UUIDs {insert_rate:>10.0f}/s")
+
+	bulk_index = Index(db_path=':memory:', run_on_start=False)
+	start_time = time.perf_counter()
+	bulk_index.add_uuids(uuids)
+	print(f"  add_uuids of new UUIDs {len(uuids) / (time.perf_counter() - start_time):>10.0f}/s")
+	bulk_index.database.close()
+
+	for thread_count in THREAD_COUNTS:
+		results = [
+			("add_uuid, known", measure(lambda i: index.add_uuid(uuids[i]), len(uuids), thread_count)),
+			("to_int", measure(lambda i: index.to_int(uuids[i]), len(uuids), thread_count)),
+			("get_uuid", measure(lambda i: index.get_uuid(int_ids[i]), len(uuids), thread_count)),
+		]
+		print(f"  {thread_count} threads: " + ", ".join(f"{operation} {rate:>10.0f}/s" for operation, rate in results))
+
+	index.database.close()
+
+
+def main():
+	uuids = [CustomUUID(value=uuid.uuid4().hex) for _ in range(UUID_COUNT)]
+	print(f"{UUID_COUNT} UUIDs")
+	run("SQLite only", UnmappedUuids(), uuids)
+	run("UuidMap", UuidMap(), uuids)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,104 @@
+"""
+Generators of payloads shaped like Notion API responses after UUID -> int conversion, as stored in BlockCache.
+"""
+
+import json
+import random
+import uuid
+from typing import List
+
+WORDS = ("project meeting notes task review design agent cache notion page block database query summary "
+	"deadline follow up draft idea research budget plan team update status release feature bug").split()
+
+BLOCK_TYPES = ["paragraph", "bulleted_list_item", "numbered_list_item", "to_do", "heading_2", "quote"]
+
+
+def make_rich_text(rng: random.Random) -> dict:
+	content = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 30)))
+	bold = rng.random() < 0.2
+	return {
+		"type": "text",
+		"text": {"content": content, "link": None},
+		"annotations": {
+			"bold": bold,
+			"italic": False,
+			"strikethrough": False,
+			"underline": False,
+			"code": False,
+			"color": "default",
+		},
+		"plain_text": content,
+		"href": None,
+	}
+
+
+def make_block(rng: random.Random, parent_id: int) -> dict:
+	block_type = rng.choice(BLOCK_TYPES)
+	block = {
+		"object": "block",
+		"id": rng.randint(1, 100000),
+		"parent": {"type": "page_id", "page_id": parent_id},
+		"created_time": "2024-05-01T10:00:00.000Z",
+		"last_edited_time": "2024-06-12T08:31:00.000Z",
+		"created_by": {"object": "user", "id": str(uuid.UUID(int=rng.getrandbits(128)))},
+		"last_edited_by": {"object": "user", "id": str(uuid.UUID(int=rng.getrandbits(128)))},
+		"has_children": rng.random() < 0.1,
+		"archived": False,
+		"in_trash": False,
+		"type": block_type,
+		block_type: {
+			"rich_text": [make_rich_text(rng) for _ in range(rng.randint(1, 4))],
+			"color": "default",
+		},
+	}
+	if block_type == "to_do":
+		block[block_type]["checked"] = rng.random() < 0.5
+	return block
+
+
+def make_page(rng: random.Random) -> dict:
+	title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6)))
+	return {
+		"object": "page",
+		"id": rng.randint(1, 100000),
+		"created_time": "2024-05-01T10:00:00.000Z",
+		"last_edited_time": "2024-06-12T08:31:00.000Z",
+		"parent": {"type": "workspace", "workspace": True},
+		"archived": False,
+		"icon": {"type": "emoji", "emoji": "📝"},
+		"url": f"https://www.notion.so/{title.replace(' ', '-')}-{uuid.UUID(int=rng.getrandbits(128)).hex}",
+		"properties": {
+			"title": {
+				"id": "title",
+				"type": "title",
+				"title": [make_rich_text(rng)],
+			}
+		},
+	}
+
+
+def make_children_response(rng: random.Random, count: int) -> dict:
+	parent_id = rng.randint(1, 100000)
+	return {
+		"object": "list",
+		"results": [make_block(rng, parent_id) for _ in range(count)],
+		"next_cursor": None,
+		"has_more": False,
+		"type": "block",
+		"block": {},
+	}
+
+
+def generate_block_payloads(count: int, seed: int = 0) -> List[str]:
+	rng = random.Random(seed)
+	return [json.dumps(make_block(rng, rng.randint(1, 100000))) for _ in range(count)]
+
+
+def generate_page_payloads(count: int, seed: int = 0) -> List[str]:
+	rng = random.Random(seed)
+	return [json.dumps(make_page(rng)) for _ in range(count)]
+
+
+def generate_search_payloads(count: int, results_per_search: int = 20, seed: int = 0) -> List[str]:
+	rng = random.Random(seed)
+	return [json.dumps({"object": "list", "results": [make_page(rng) for _ in range(results_per_search)]}) for _ in range(count)]
@@ -3,21 +3,24 @@ Block-related operations for NotionAgent.
 """
 
 from .blockCache import BlockCache, ObjectType
+from .changeJournal import PersistenceMode
 from .blockDict import BlockDict
 from .blockHolder import BlockHolder, FilteringOptions
 from .blockManager import BlockManager
 from .blockTree import BlockTree
 from .index import Index
-from .cacheOrchestrator import CacheOrchestrator
+from .cacheOrchestrator import CacheOrchestrator, StalePolicy
 
 __all__ = [
 	"BlockCache",
 	"ObjectType",
+	"PersistenceMode",
 	"BlockDict", 
 	"BlockHolder",
 	"FilteringOptions",
 	"BlockManager",
 	"BlockTree",
 	"Index",
-	"CacheOrchestrator"
+	"CacheOrchestrator",
+	"StalePolicy"
 ] 
\ No newline at end of file
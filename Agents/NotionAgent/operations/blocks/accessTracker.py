@@ -0,0 +1,41 @@
+import threading
+import time
+from typing import Dict, List, Tuple
+
+
+class AccessTracker:
+	"""
+	Buffers cache reads in memory, so that tracking access recency and frequency doesn't turn reads into writes.
+	Buffered accesses are written to the cache table on save and before eviction.
+	"""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		# (cache_key, object_type) -> (last access in epoch ms, access count)
+		self.pending: Dict[Tuple[str, str], Tuple[int, int]] = {}
+
+
+	def record(self, cache_key: str, object_type: str):
+		now_ms = int(time.time() * 1000)
+		key = (cache_key, object_type)
+		with self.lock:
+			_, count = self.pending.get(key, (0, 0))
+			self.pending[key] = (now_ms, count + 1)
+
+
+	def take_pending(self) -> List[Tuple[int, int, str, str]]:
+		"""
+		Returns buffered accesses as (last_access_ms, access_count, cache_key, object_type) rows and resets the buffer.
+		"""
+		with self.lock:
+			pending = self.pending
+			self.pending = {}
+		return [(last_access_ms, count, cache_key, object_type) for (cache_key, object_type), (last_access_ms, count) in pending.items()]
+
+
+	def restore_pending(self, rows: List[Tuple[int, int, str, str]]):
+		with self.lock:
+			for last_access_ms, count, cache_key, object_type in rows:
+				key = (cache_key, object_type)
+				previous_ms, previous_count = self.pending.get(key, (0, 0))
+				self.pending[key] = (max(previous_ms, last_access_ms), previous_count + count)
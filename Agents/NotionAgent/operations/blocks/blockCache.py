@@ -1,8 +1,9 @@
+import hashlib
 import sqlite3
 import threading
 import time
-from typing import Optional, Tuple, List, Union, Dict
-from datetime import datetime, timezone
+import zlib
+from typing import Any, Optional, Tuple, List, Union, Dict
 from enum import Enum
 from abc import ABC, abstractmethod
 
@@ -11,6 +12,17 @@ from tz_common.timed_storage import TimedStorage
 from tz_common import CustomUUID
 
 from ..utils import Utils
+from .changeJournal import ChangeJournal, PersistenceMode
+from .changeFeed import ChangeFeed
+from .parsedCache import ParsedCache, parse_content
+from .cacheMetrics import CacheMetrics
+from .schemaMigrations import apply_migrations
+from .lazyLoader import LazyLoader
+from .subtreeTracker import SubtreeTracker
+from .accessTracker import AccessTracker
+from .cacheCodec import CacheCodec
+from .sharedMemoryDatabase import SharedMemoryDatabase
+from .walDatabase import WalDatabase
 
 # TODO: Split into cache key utils and db handler?
 
@@ -20,30 +32,175 @@ class ObjectType(Enum):
 	DATABASE = "database"
 	SEARCH_RESULTS = "search"
 	DATABASE_QUERY_RESULTS = "database_query"
+	# Materialized content of a block with all its descendants
+	SUBTREE = "subtree"
 
 # TODO: Convert parent "type": "database_id" to "database" : https://developers.notion.com/reference/page
 
 class BlockCache(TimedStorage):
 
+	# Append-only list of schema upgrades applied on top of create_tables(), see schemaMigrations
+	MIGRATIONS = [
+		# 1: Secondary indexes for relationship lookups by child, cleanup by age and scans by type
+		[
+			'CREATE INDEX IF NOT EXISTS idx_block_relationships_child_key ON block_relationships (child_key)',
+			'CREATE INDEX IF NOT EXISTS idx_block_cache_timestamp ON block_cache (timestamp)',
+			'CREATE INDEX IF NOT EXISTS idx_block_cache_object_type ON block_cache (object_type)',
+		],
+		# 2: Integer timestamp in epoch milliseconds, backfilled from ISO timestamps
+		[
+			'ALTER TABLE block_cache ADD COLUMN timestamp_ms INTEGER',
+			'UPDATE block_cache SET timestamp_ms = CAST(ROUND((julianday(timestamp) - 2440587.5) * 86400000) AS INTEGER)',
+			'CREATE INDEX IF NOT EXISTS idx_block_cache_timestamp_ms ON block_cache (timestamp_ms)',
+		],
+		# 3: Access tracking and content size for eviction
+		[
+			'ALTER TABLE block_cache ADD COLUMN last_access_ms INTEGER',
+			'ALTER TABLE block_cache ADD COLUMN access_count INTEGER NOT NULL DEFAULT 0',
+			'ALTER TABLE block_cache ADD COLUMN size INTEGER NOT NULL DEFAULT 0',
+			'UPDATE block_cache SET last_access_ms = timestamp_ms, size = LENGTH(content)',
+			'CREATE INDEX IF NOT EXISTS idx_block_cache_object_type_size ON block_cache (object_type, size)',
+		],
+		# 4: Expiry time in epoch milliseconds, so that TTL checks and sweeps are done in SQL
+		[
+			'ALTER TABLE block_cache ADD COLUMN expires_at_ms INTEGER',
+			'UPDATE block_cache SET expires_at_ms = timestamp_ms + ttl * 1000 WHERE ttl > 0',
+			'CREATE INDEX IF NOT EXISTS idx_block_cache_expires_at_ms ON block_cache (expires_at_ms) WHERE expires_at_ms IS NOT NULL',
+		],
+		# 5: Hash of content, so that unchanged content isn't rewritten. Existing rows get theirs on the next write.
+		[
+			'ALTER TABLE block_cache ADD COLUMN content_hash BLOB',
+		],
+		# 6: Relationships keyed by integer IDs of cache keys, so that they take less space and recursive walks join on integers
+		[
+			'CREATE TABLE cache_keys (key_id INTEGER PRIMARY KEY, cache_key TEXT NOT NULL UNIQUE)',
+			'''INSERT INTO cache_keys (cache_key)
+				SELECT parent_key FROM block_relationships WHERE parent_key IS NOT NULL
+				UNION SELECT child_key FROM block_relationships WHERE child_key IS NOT NULL''',
+			'''CREATE TABLE block_relationships_by_id (
+				parent_id INTEGER NOT NULL,
+				child_id INTEGER NOT NULL,
+				PRIMARY KEY (parent_id, child_id)
+			) WITHOUT ROWID''',
+			'''INSERT INTO block_relationships_by_id (parent_id, child_id)
+				SELECT p.key_id, c.key_id FROM block_relationships r
+				JOIN cache_keys p ON p.cache_key = r.parent_key
+				JOIN cache_keys c ON c.cache_key = r.child_key''',
+			'DROP TABLE block_relationships',
+			'ALTER TABLE block_relationships_by_id RENAME TO block_relationships',
+			'CREATE INDEX idx_block_relationships_child_id ON block_relationships (child_id)',
+		],
+	]
+
+	# Eviction keeps total content size of each object type under its budget
+	DEFAULT_SIZE_BUDGETS = {
+		ObjectType.BLOCK: 40 * 1024 * 1024,
+		ObjectType.PAGE: 8 * 1024 * 1024,
+		ObjectType.DATABASE: 4 * 1024 * 1024,
+		ObjectType.SEARCH_RESULTS: 6 * 1024 * 1024,
+		ObjectType.DATABASE_QUERY_RESULTS: 6 * 1024 * 1024,
+		ObjectType.SUBTREE: 8 * 1024 * 1024,
+	}
+	# Evict down to this fraction of the budget, so that eviction doesn't run on every save
+	EVICTION_TARGET_RATIO = 0.9
+	# Each past access counts as this much later last access, capped at MAX_ACCESS_COUNT accesses
+	ACCESS_FREQUENCY_BONUS_MS = 60 * 1000
+	MAX_ACCESS_COUNT = 100
+	# Expired objects are deleted in bulk this often, reads skip them in the meantime
+	SWEEP_INTERVAL_S = 60
+
+	# Refreshing an existing row keeps its access statistics.
+	# Content stored with the same hash and TTL by another writer in the meantime is left as is.
+	UPSERT_SQL = '''
+		INSERT INTO block_cache (cache_key, object_type, content, content_hash, timestamp, timestamp_ms, ttl, expires_at_ms, size, last_access_ms)
+		VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+		ON CONFLICT(cache_key, object_type) DO UPDATE SET
+			content = excluded.content,
+			content_hash = excluded.content_hash,
+			timestamp = excluded.timestamp,
+			timestamp_ms = excluded.timestamp_ms,
+			ttl = excluded.ttl,
+			expires_at_ms = excluded.expires_at_ms,
+			size = excluded.size
+		WHERE block_cache.content_hash IS NOT excluded.content_hash OR block_cache.ttl IS NOT excluded.ttl
+	'''
+	# Extends freshness of content that is stored again unchanged. If the content changed meanwhile, the newer write wins.
+	REFRESH_SQL = '''
+		UPDATE block_cache SET timestamp = ?, timestamp_ms = ?, expires_at_ms = ?
+		WHERE cache_key = ? AND object_type = ? AND content_hash = ?
+	'''
+	# Keys per IN (...) query, well under SQLite's limit of bound parameters
+	MAX_QUERY_PARAMETERS = 500
+	# Relationships refer to cache keys by their integer ID
+	KEY_ID_SQL = '(SELECT key_id FROM cache_keys WHERE cache_key = ?)'
+	RELATIONSHIP_INSERT_SQL = '''
+		INSERT OR IGNORE INTO block_relationships (parent_id, child_id)
+		SELECT p.key_id, c.key_id FROM cache_keys p, cache_keys c
+		WHERE p.cache_key = ? AND c.cache_key = ?
+	'''
+
 	def __init__(self,
 			  db_path: str = 'block_cache.db',
 			  load_from_disk: bool = False,
-			  run_on_start: bool = False):
-		super().__init__(period_ms=3000, run_on_start=run_on_start)
+			  run_on_start: bool = False,
+			  persistence_mode: PersistenceMode = PersistenceMode.INCREMENTAL,
+			  size_budgets: Optional[Dict[ObjectType, int]] = None,
+			  codec: Optional[CacheCodec] = None,
+			  lazy_load: bool = False,
+			  shared: bool = False):
+		if shared and persistence_mode != PersistenceMode.WAL:
+			raise ValueError("Cache shared between processes requires WAL persistence mode")
+
+		# Every commit is already on disk in WAL mode, so there is nothing to save periodically
+		super().__init__(period_ms=3000, run_on_start=run_on_start and persistence_mode != PersistenceMode.WAL)
+		self._sweeper: Optional[threading.Thread] = None
+		self._prewarmer: Optional[threading.Thread] = None
+		# Object type -> (default TTL, grace period past it) in seconds
+		self.stale_policies: Dict[ObjectType, Tuple[int, int]] = {}
 
 		self.db_path = db_path
 		self.save_enabled = run_on_start
+		self.persistence_mode = persistence_mode
 
-		self.conn = sqlite3.connect(':memory:', check_same_thread=False)
+		# Reads run in parallel on per-thread connections, writes are serialized on self.conn
+		if persistence_mode == PersistenceMode.WAL:
+			self.database = WalDatabase(db_path)
+		else:
+			self.database = SharedMemoryDatabase("block_cache")
+		self.conn = self.database.writer
 		self.cursor = self.conn.cursor()
-		self.lock = threading.RLock()
-
-		if load_from_disk:
-			self.load_from_disk()
+		self.lock = self.database.lock
+		self.metrics = CacheMetrics()
+		self.access_tracker = AccessTracker()
+		self.codec = codec if codec is not None else CacheCodec()
+		self.size_budgets = {**self.DEFAULT_SIZE_BUDGETS, **(size_budgets or {})}
+
+		# WAL mode reads the file on demand anyway
+		lazy_load = lazy_load and load_from_disk and persistence_mode != PersistenceMode.WAL and LazyLoader.can_attach(db_path, len(self.MIGRATIONS))
+		loaded = self.load_from_disk() if load_from_disk and not lazy_load and persistence_mode != PersistenceMode.WAL else False
 		self.create_tables()
+		migrated = apply_migrations(self.conn, self.MIGRATIONS, "Block cache")
+
+		self.journal = None
+		if persistence_mode == PersistenceMode.INCREMENTAL:
+			self.journal = ChangeJournal(self.conn, ['block_cache', 'cache_keys', 'block_relationships', 'children_fetched_for_block', 'cache_metrics'])
+
+		self.lazy_loader: Optional[LazyLoader] = None
+		if lazy_load:
+			self.lazy_loader = self._attach_lazily()
 
-		# TODO: Set to low value for testing
-		self.max_size = 64 * 1024 * 1024  # 64 MB in bytes
+		# A file with an older schema has to be rewritten as a whole. Attached file has the current one.
+		if self.journal is not None and (self.lazy_loader is not None or (loaded and not migrated)):
+			self.journal.mark_synced()
+
+		self.parsed_cache = ParsedCache()
+		self._install_parsed_cache_eviction()
+		# Installed after the file is loaded or attached, so that loading doesn't count as a change
+		self.subtree_tracker = SubtreeTracker(self.conn, ObjectType.SUBTREE.value)
+		# Other processes working on the same file report their changes through it
+		self.change_feed = ChangeFeed(self.database) if shared else None
+
+		self.max_size = sum(self.size_budgets.values())
 
 		if run_on_start:
 			self.start_periodic_save()
@@ -82,6 +239,83 @@ class BlockCache(TimedStorage):
 		return self.create_cache_key(key, ObjectType.DATABASE_QUERY_RESULTS)
 
 
+	def _attach_lazily(self) -> Optional[LazyLoader]:
+		"""
+		Attach the file to be paged in on demand. Only block content is paged, relationships and metrics are small and copied at once.
+		"""
+		try:
+			with self.lock:
+				lazy_loader = LazyLoader(self.conn, self.db_path, 'block_cache', 'cache_key',
+					['cache_keys', 'block_relationships', 'children_fetched_for_block', 'cache_metrics'], self.journal)
+		except sqlite3.Error as e:
+			self.conn.rollback()
+			log.error(f"Can't attach block cache file {self.db_path}: {e}. Starting with an empty cache.")
+			return None
+
+		log.flow("Block cache attached from disk, objects are loaded on first access")
+		self.clean()
+		return lazy_loader
+
+
+	def _fault_in(self, cache_keys: List[str]):
+		"""
+		Copy objects of the keys from the attached file into memory, if they were never accessed before.
+		Must not be called with the read lock held.
+		"""
+		lazy_loader = self.lazy_loader
+		if lazy_loader is None or not lazy_loader.needs(cache_keys):
+			return
+		with self.lock:
+			if self.lazy_loader is not None:
+				self.lazy_loader.fault_in(cache_keys)
+
+
+	def _finish_lazy_load(self):
+		"""
+		Copy all objects still left in the attached file, needed before operations on the whole cache.
+		"""
+		with self.lock:
+			if self.lazy_loader is None:
+				return
+			loaded_count = self.lazy_loader.load_remaining()
+			self.lazy_loader = None
+		log.flow(f"Block cache fully loaded, {loaded_count} objects copied from disk")
+
+
+	def prewarm(self, uuids: List[CustomUUID]):
+		"""
+		Load objects of the given UUIDs, ie. favourites and most visited pages, and their children in a background thread.
+		Does nothing unless the cache is loaded lazily.
+		"""
+		if self.lazy_loader is None or not uuids:
+			return
+
+		parent_keys = list(dict.fromkeys(self.create_cache_key(str(uuid), ObjectType.BLOCK) for uuid in uuids))
+
+		def load_keys():
+			# Direct children are likely to be read next
+			cache_keys = list(parent_keys)
+			with self.lock.read():
+				for i in range(0, len(parent_keys), self.MAX_QUERY_PARAMETERS):
+					chunk = parent_keys[i:i + self.MAX_QUERY_PARAMETERS]
+					placeholders = ','.join('?' for _ in chunk)
+					cache_keys += [child_key for (child_key,) in self.database.read(f'''
+						SELECT c.cache_key FROM cache_keys p
+						JOIN block_relationships r ON r.parent_id = p.key_id
+						JOIN cache_keys c ON c.key_id = r.child_id
+						WHERE p.cache_key IN ({placeholders})
+					''', chunk)]
+
+			for i in range(0, len(cache_keys), self.MAX_QUERY_PARAMETERS):
+				if self._stop_event.is_set():
+					return
+				self._fault_in(cache_keys[i:i + self.MAX_QUERY_PARAMETERS])
+			log.debug(f"Prewarmed block cache with {len(cache_keys)} objects")
+
+		self._prewarmer = threading.Thread(target=load_keys, daemon=True)
+		self._prewarmer.start()
+
+
 	def create_tables(self):
 		with self.lock:
 			# Create block_cache table if it doesn't exist
@@ -99,7 +333,7 @@ class BlockCache(TimedStorage):
 				)
 			''')
 			
-			# Create block_relationships table if it doesn't exist
+			# Create block_relationships table if it doesn't exist, migrations key it by integer IDs of cache_keys
 			self.cursor.execute('''
 				CREATE TABLE IF NOT EXISTS block_relationships (
 					parent_key TEXT,
@@ -144,53 +378,225 @@ class BlockCache(TimedStorage):
 			self.set_dirty()
 
 
-	def _increment_metric(self, metric_type: str):
-		with self.lock:
-			self.cursor.execute('''
-				UPDATE cache_metrics
-				SET count = count + 1
-				WHERE metric_type = ?
-			''', (metric_type,))
+	def _install_parsed_cache_eviction(self):
+		# Any write to a row makes its parsed copy stale. REPLACE doesn't fire DELETE triggers, so INSERT is covered as well.
+		# Updates of access statistics alone leave the parsed copy valid.
+		self.conn.create_function('evict_parsed', 2, self.parsed_cache.evict)
+		for event, row in [("INSERT", "NEW"), ("UPDATE OF cache_key, object_type, content, timestamp, ttl", "OLD"), ("DELETE", "OLD")]:
+			self.cursor.execute(f'''
+				CREATE TEMP TRIGGER IF NOT EXISTS evict_parsed_{event.split()[0].lower()}
+				AFTER {event} ON main.block_cache
+				BEGIN SELECT evict_parsed({row}.cache_key, {row}.object_type); END
+			''')
+		self.conn.commit()
+
+
+	def _increment_metric(self, metric_type: str, object_type: Optional[ObjectType] = None):
+		# Kept in memory only, folded into cache_metrics table on save
+		self.metrics.increment(metric_type, object_type.value if object_type else None)
+
+
+	def _flush_metrics(self):
+		counts = self.metrics.take_pending()
+		if not counts:
+			return
+
+		try:
+			self.cursor.executemany('''
+				INSERT INTO cache_metrics (metric_type, count)
+				VALUES (?, ?)
+				ON CONFLICT(metric_type) DO UPDATE SET count = count + excluded.count
+			''', list(counts.items()))
 			self.conn.commit()
-			self.set_dirty()
+		except sqlite3.Error:
+			self.metrics.restore_pending(counts)
+			raise
+
+
+	def set_stale_policy(self, object_type: ObjectType, ttl: int, grace: int):
+		"""
+		Objects of the type stored without explicit TTL expire after ttl seconds,
+		and are kept for grace more seconds to be served stale by get_parsed_allow_stale().
+		"""
+		self.stale_policies[object_type] = (ttl, grace)
+
+
+	def _grace_ms(self, object_type: ObjectType) -> int:
+		policy = self.stale_policies.get(object_type)
+		return policy[1] * 1000 if policy is not None else 0
+
+
+	@staticmethod
+	def _expires_at_ms(timestamp_ms: int, ttl: Optional[int]) -> Optional[int]:
+		return timestamp_ms + ttl * 1000 if ttl and ttl > 0 else None
+
+
+	@staticmethod
+	def _hash_content(content: str) -> bytes:
+		return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+
+
+	def _get_cached_hashes(self, object_type: ObjectType, cache_keys: List[str]) -> Dict[str, Tuple[bytes, Optional[int]]]:
+		self._fault_in(cache_keys)
+		cached = {}
+		with self.lock.read():
+			for i in range(0, len(cache_keys), self.MAX_QUERY_PARAMETERS):
+				chunk = cache_keys[i:i + self.MAX_QUERY_PARAMETERS]
+				placeholders = ','.join('?' for _ in chunk)
+				rows = self.database.read(f'''
+					SELECT cache_key, content_hash, ttl FROM block_cache
+					WHERE object_type = ? AND cache_key IN ({placeholders})
+				''', [object_type.value] + chunk)
+				cached.update({cache_key: (content_hash, ttl) for cache_key, content_hash, ttl in rows})
+		return cached
+
+
+	def _prepare_rows(self, object_type: ObjectType, contents: List[Tuple[str, str]], ttl: Optional[int], now: str, now_ms: int) -> Tuple[List[tuple], List[tuple]]:
+		"""
+		Split (cache_key, content) pairs into UPSERT_SQL rows of new or changed content and REFRESH_SQL rows of content that is already cached.
+		Only changed content is encoded.
+		"""
+		if ttl is None and object_type in self.stale_policies:
+			ttl = self.stale_policies[object_type][0]
+		expires_at_ms = self._expires_at_ms(now_ms, ttl)
+		hashes = [self._hash_content(content) for _, content in contents]
+		cached = self._get_cached_hashes(object_type, [cache_key for cache_key, _ in contents])
+
+		upsert_rows = []
+		refresh_rows = []
+		for (cache_key, content), content_hash in zip(contents, hashes):
+			if cached.get(cache_key) == (content_hash, ttl):
+				self._increment_metric('unchanged_writes', object_type)
+				# Only objects with TTL need their freshness extended
+				if expires_at_ms is not None:
+					refresh_rows.append((now, now_ms, expires_at_ms, cache_key, object_type.value, content_hash))
+				continue
+
+			stored_content = self.codec.encode(content)
+			upsert_rows.append((cache_key, object_type.value, stored_content, content_hash, now, now_ms, ttl, expires_at_ms, len(stored_content), now_ms))
+
+		return upsert_rows, refresh_rows
+
+
+	def _write_rows(self, upsert_rows: List[tuple], refresh_rows: List[tuple]) -> int:
+		"""
+		Write rows prepared by _prepare_rows(), caller holds the write lock and commits.
+
+		Returns:
+			Number of objects whose content was stored
+		"""
+		stored_count = 0
+		if upsert_rows:
+			self.cursor.executemany(self.UPSERT_SQL, upsert_rows)
+			stored_count = self.cursor.rowcount
+		if refresh_rows:
+			self.cursor.executemany(self.REFRESH_SQL, refresh_rows)
+		return stored_count
 
 
 	def _add_block_internal(self, cache_key: str, object_type: ObjectType, content: str, ttl: Optional[int] = None, parent_key: Optional[str] = None):
+		start_time = time.perf_counter()
 		now = Utils.get_current_time_isoformat()
+		now_ms = Utils.convert_isoformat_to_epoch_ms(now)
 
-		content = str(content)
+		upsert_rows, refresh_rows = self._prepare_rows(object_type, [(cache_key, str(content))], ttl, now, now_ms)
+		relationship_added = False
 		
 		with self.lock:
-			# Check if the cache key already exists
-			self.cursor.execute('SELECT 1 FROM block_cache WHERE cache_key = ? AND object_type = ?', (cache_key, object_type.value))
-			exists = self.cursor.fetchone() is not None
-			
-			self.cursor.execute('''
-				INSERT OR REPLACE INTO block_cache (cache_key, object_type, content, timestamp, ttl)
-				VALUES (?, ?, ?, ?, ?)
-			''', (cache_key, object_type.value, content, now, ttl))
+			stored_count = self._write_rows(upsert_rows, refresh_rows)
 			
 			if parent_key:
-				self.cursor.execute('SELECT 1 FROM block_relationships WHERE parent_key = ? AND child_key = ?', (parent_key, cache_key))
-				relationship_exists = self.cursor.fetchone() is not None
-				
-				self.cursor.execute('''
-					INSERT OR IGNORE INTO block_relationships (parent_key, child_key)
-					VALUES (?, ?)
-				''', (parent_key, cache_key))
+				relationship_added = self._insert_relationships([(parent_key, cache_key)]) > 0
 			
 			self.conn.commit()
-			self.set_dirty()
+			# Refreshed freshness alone is saved together with the next change
+			if stored_count or relationship_added:
+				self.set_dirty()
+
+		self.metrics.record_latency("put", time.perf_counter() - start_time)
 		
-		if parent_key:
-			if relationship_exists:
-				pass
-				#log.debug(f"Updating relationship: {parent_key} -> {cache_key}")
-			else:
-				log.debug(f"Adding relationship: {parent_key} -> {cache_key}")
+		if relationship_added:
+			log.debug(f"Adding relationship: {parent_key} -> {cache_key}")
 		
-		# FIXME: Do not print if content is identical?
-		#log.debug(f'{"Updated block in" if exists else "Added block to"} cache: {cache_key}')
+		#log.debug(f"Stored block in cache: {cache_key}")
+
+
+	def add_blocks_bulk(self,
+					 blocks: List[Tuple[CustomUUID, str]],
+					 ttl: Optional[int] = None,
+					 parent_uuid: Optional[CustomUUID] = None,
+					 parent_type: ObjectType = ObjectType.BLOCK,
+					 mark_children_fetched: bool = False):
+		"""
+		Store a batch of blocks, ie. a whole children response, in a single transaction.
+		If parent_uuid is given, parent -> child relationships are written in the same transaction.
+		Blocks already cached with identical content are not rewritten.
+
+		Args:
+			blocks: List of (uuid, content) pairs
+			ttl: Optional time to live applied to every block
+			parent_uuid: Optional UUID of the common parent
+			parent_type: Type of the parent object
+			mark_children_fetched: Whether to mark the parent as having its children fetched
+		"""
+		if not blocks:
+			return
+
+		start_time = time.perf_counter()
+		now = Utils.get_current_time_isoformat()
+		now_ms = Utils.convert_isoformat_to_epoch_ms(now)
+		parent_key = self.create_cache_key(str(parent_uuid), parent_type) if parent_uuid else None
+
+		contents = [(self.create_cache_key(str(uuid), ObjectType.BLOCK), str(content)) for uuid, content in blocks]
+		upsert_rows, refresh_rows = self._prepare_rows(ObjectType.BLOCK, contents, ttl, now, now_ms)
+
+		with self.lock:
+			changed_count = self._write_rows(upsert_rows, refresh_rows)
+
+			if parent_key:
+				changed_count += self._insert_relationships([(parent_key, cache_key) for cache_key, _ in contents])
+
+				if mark_children_fetched:
+					self.cursor.execute('''
+						INSERT OR IGNORE INTO children_fetched_for_block (cache_key)
+						VALUES (?)
+					''', (parent_key,))
+					changed_count += self.cursor.rowcount
+
+			self.conn.commit()
+			if changed_count:
+				self.set_dirty()
+
+		self.metrics.record_latency("put", time.perf_counter() - start_time)
+		log.debug(f"Added {len(upsert_rows)} of {len(contents)} blocks to cache, others unchanged" + (f" under {parent_key}" if parent_key else ""))
+
+
+	def add_relationships_bulk(self, relationships: List[Tuple[str, str]]):
+		"""
+		Add many (parent_key, child_key) relationships in a single transaction.
+		Keys are cache keys, so composite keys of search and query results are accepted as parents.
+		"""
+		if not relationships:
+			return
+
+		with self.lock:
+			self._insert_relationships(relationships)
+			self.conn.commit()
+			self.set_dirty()
+
+
+	def _insert_relationships(self, relationships: List[Tuple[str, str]]) -> int:
+		"""
+		Insert (parent_key, child_key) relationships, assigning integer IDs to keys seen for the first time.
+		Caller holds the write lock and commits.
+
+		Returns:
+			Number of relationships that were not stored before
+		"""
+		keys = dict.fromkeys(key for relationship in relationships for key in relationship)
+		self.cursor.executemany('INSERT OR IGNORE INTO cache_keys (cache_key) VALUES (?)', [(key,) for key in keys])
+		self.cursor.executemany(self.RELATIONSHIP_INSERT_SQL, relationships)
+		return self.cursor.rowcount
 
 
 	def add_block(self, uuid: CustomUUID, content: str, ttl: Optional[int] = None, parent_uuid: Optional[CustomUUID] = None, parent_type: ObjectType = ObjectType.BLOCK):
@@ -249,34 +655,126 @@ class BlockCache(TimedStorage):
 		self._add_block_internal(cache_key, ObjectType.DATABASE_QUERY_RESULTS, content, ttl)
 
 
+	def add_subtree(self, uuid: CustomUUID, content: str, ttl: Optional[int] = None):
+		"""
+		Store a snapshot of the block with all its descendants. It is deleted as soon as any object under the block changes.
+		"""
+		# Changes made while the snapshot was assembled must not delete it once it's stored
+		self._sync_shared_changes()
+		self._invalidate_changed_subtrees()
+		cache_key = self.create_cache_key(str(uuid), ObjectType.SUBTREE)
+		self._add_block_internal(cache_key, ObjectType.SUBTREE, content, ttl)
+
+
+	def _invalidate_changed_subtrees(self):
+		if not self.subtree_tracker.has_changes():
+			return
+
+		with self.lock:
+			deleted_count = self.subtree_tracker.invalidate(self.lazy_loader)
+			self.conn.commit()
+			if deleted_count:
+				self.set_dirty()
+				log.debug(f"Invalidated {deleted_count} subtree snapshots")
+
+
+	def _sync_shared_changes(self):
+		"""
+		Drop parsed copies of objects changed by other processes, and report their changes to subtree tracking.
+		Does nothing unless the cache is shared.
+		"""
+		if self.change_feed is None:
+			return
+
+		changes = self.change_feed.poll()
+		if changes is None:
+			log.flow("Missed changes of other processes, dropping parsed objects and subtree snapshots")
+			self.parsed_cache.clear()
+			with self.lock:
+				self.cursor.execute('DELETE FROM block_cache WHERE object_type = ?', (ObjectType.SUBTREE.value,))
+				self.conn.commit()
+			return
+
+		for cache_key, object_type in changes:
+			if object_type is not None:
+				self.parsed_cache.evict(cache_key, object_type)
+			if object_type != ObjectType.SUBTREE.value:
+				self.subtree_tracker.mark_changed(cache_key)
+
+
 	def _invalidate_block_recursive(self, cache_key: str):
+		"""
+		Delete the object with all its descendants in a single transaction.
+		Descendants that are cached as pages or databases themselves are not descended into:
+		only their block entry and link to the parent are removed, their own content stays valid.
+		"""
 
 		log.flow(f"Invalidating block {cache_key} and its children recursively")
 
-		child_keys = []
 		with self.lock:
+			if self.lazy_loader is not None:
+				# Descendants still on disk have to be in memory to be told apart from pages and deleted
+				subtree_keys = self.cursor.execute(f'''
+					WITH RECURSIVE subtree(key_id) AS (
+						SELECT {self.KEY_ID_SQL}
+						UNION
+						SELECT r.child_id FROM block_relationships r JOIN subtree s ON r.parent_id = s.key_id
+					)
+					SELECT k.cache_key FROM subtree s JOIN cache_keys k ON k.key_id = s.key_id
+				''', (cache_key,)).fetchall()
+				self.lazy_loader.fault_in([cache_key] + [key for (key,) in subtree_keys])
 
-			# TODO: Do not invalidate children pages, only blocks
-			
-			# Find and recursively delete all child blocks
-			self.cursor.execute('SELECT child_key FROM block_relationships WHERE parent_key = ?', (cache_key,))
-			child_keys = self.cursor.fetchall()
-			
-			# Delete the current block
-			self.cursor.execute('DELETE FROM block_cache WHERE cache_key = ?', (cache_key,))
-			
-			# Remove the relationships for this block
-			self.cursor.execute('DELETE FROM block_relationships WHERE parent_key = ? OR child_key = ?', (cache_key, cache_key))
+			self.cursor.execute('''
+				CREATE TEMP TABLE IF NOT EXISTS invalidated_keys (
+					cache_key TEXT PRIMARY KEY,
+					key_id INTEGER,
+					is_boundary INTEGER NOT NULL
+				)
+			''')
+			self.cursor.execute('DELETE FROM invalidated_keys')
+
+			# UNION discards rows already visited, so cycles in relationships terminate
+			self.cursor.execute(f'''
+				WITH RECURSIVE subtree(key_id, is_boundary) AS (
+					SELECT {self.KEY_ID_SQL}, 0
+					UNION
+					SELECT r.child_id, EXISTS (
+						SELECT 1 FROM cache_keys k JOIN block_cache c ON c.cache_key = k.cache_key
+						WHERE k.key_id = r.child_id AND c.object_type IN (?, ?)
+					)
+					FROM block_relationships r
+					JOIN subtree s ON r.parent_id = s.key_id
+					WHERE s.is_boundary = 0
+				)
+				INSERT INTO invalidated_keys (cache_key, key_id, is_boundary)
+				SELECT k.cache_key, s.key_id, MIN(s.is_boundary) FROM subtree s JOIN cache_keys k ON k.key_id = s.key_id GROUP BY s.key_id
+			''', (cache_key, ObjectType.PAGE.value, ObjectType.DATABASE.value))
+			# Object without any relationships has no key ID
+			self.cursor.execute('INSERT OR IGNORE INTO invalidated_keys (cache_key, key_id, is_boundary) VALUES (?, NULL, 0)', (cache_key,))
 
-			self.remove_children_fetched_for_block(cache_key)
-			
+			self.cursor.execute('''
+				DELETE FROM block_cache
+				WHERE cache_key IN (SELECT cache_key FROM invalidated_keys WHERE is_boundary = 0)
+					OR (object_type = ? AND cache_key IN (SELECT cache_key FROM invalidated_keys WHERE is_boundary = 1))
+			''', (ObjectType.BLOCK.value,))
+			deleted_count = self.cursor.rowcount
+
+			self.cursor.execute('''
+				DELETE FROM block_relationships
+				WHERE parent_id IN (SELECT key_id FROM invalidated_keys WHERE is_boundary = 0)
+					OR child_id IN (SELECT key_id FROM invalidated_keys WHERE is_boundary = 0)
+			''')
+
+			self.cursor.execute('''
+				DELETE FROM children_fetched_for_block
+				WHERE cache_key IN (SELECT cache_key FROM invalidated_keys WHERE is_boundary = 0)
+			''')
+
+			self.cursor.execute('DELETE FROM invalidated_keys')
 			self.conn.commit()
 			self.set_dirty()
 
-		for (child_key,) in child_keys:
-			# FIXME: Never printed
-			log.debug(f"Invalidating child {child_key}")
-			self._invalidate_block_recursive(child_key)
+		log.debug(f"Invalidated {deleted_count} cached objects under {cache_key}")
 
 
 	def _invalidate_parent_search_or_query(self, cache_key: str):
@@ -285,7 +783,10 @@ class BlockCache(TimedStorage):
 
 		with self.lock:
 			# Find and delete all parent blocks that have this block as a child
-			self.cursor.execute('SELECT parent_key FROM block_relationships WHERE child_key = ?', (cache_key,))
+			self.cursor.execute(f'''
+				SELECT p.cache_key FROM block_relationships r JOIN cache_keys p ON p.key_id = r.parent_id
+				WHERE r.child_id = {self.KEY_ID_SQL}
+			''', (cache_key,))
 			parent_keys = self.cursor.fetchall()
 
 			# Filter parent keys that contain "search" or "database_query"
@@ -295,7 +796,7 @@ class BlockCache(TimedStorage):
 
 			# Remove the relationships for this block only for filtered parent keys
 			for parent_key in filtered_parent_keys:
-				self.cursor.execute('DELETE FROM block_relationships WHERE parent_key = ? AND child_key = ?', (parent_key, cache_key))
+				self.cursor.execute(f'DELETE FROM block_relationships WHERE parent_id = {self.KEY_ID_SQL} AND child_id = {self.KEY_ID_SQL}', (parent_key, cache_key))
 			
 			self.conn.commit()
 			self.set_dirty()
@@ -306,12 +807,16 @@ class BlockCache(TimedStorage):
 
 
 	def check_if_expired(self, cache_key: str, object_type: ObjectType, last_update_time: str) -> bool:
+		"""
+		Check if the object was stored before last_update_time, an ISO timestamp as returned by Notion API.
+		"""
+		last_update_ms = Utils.convert_isoformat_to_epoch_ms(last_update_time)
+		self._fault_in([cache_key])
 
-		with self.lock:
-			self.cursor.execute('SELECT timestamp FROM block_cache WHERE cache_key = ? AND object_type = ?', (cache_key, object_type.value))
-			result = self.cursor.fetchone()
-			if result:
-				return result[0] < last_update_time
+		with self.lock.read():
+			rows = self.database.read('SELECT timestamp_ms < ? FROM block_cache WHERE cache_key = ? AND object_type = ?', (last_update_ms, cache_key, object_type.value))
+			if rows:
+				return bool(rows[0][0])
 			else:
 				log.debug(f"Item {cache_key} not found in cache")
 				return False
@@ -319,22 +824,22 @@ class BlockCache(TimedStorage):
 
 	def invalidate_block_if_expired(self, uuid: CustomUUID, last_update_time: str) -> bool:
 		cache_key = self.create_cache_key(str(uuid), ObjectType.BLOCK)
+		self._fault_in([cache_key])
 
 		# First check if the block exists at all
-		with self.lock:
-			self.cursor.execute('SELECT 1 FROM block_cache WHERE cache_key = ? AND object_type = ?', (cache_key, ObjectType.BLOCK.value))
-			exists = self.cursor.fetchone() is not None
+		with self.lock.read():
+			exists = len(self.database.read('SELECT 1 FROM block_cache WHERE cache_key = ? AND object_type = ?', (cache_key, ObjectType.BLOCK.value))) > 0
 		
 		if not exists:
 			# Block doesn't exist, count as a miss
-			self._increment_metric('misses_not_found')
+			self._increment_metric('misses_not_found', ObjectType.BLOCK)
 			return False
 
 		expired = self.check_if_expired(cache_key, ObjectType.BLOCK, last_update_time)
 
 		if expired:
 			# Block exists but is expired, count as a miss_expired
-			self._increment_metric('misses_expired')
+			self._increment_metric('misses_expired', ObjectType.BLOCK)
 			self._invalidate_block_recursive(cache_key)
 			log.debug(f"Invalidating item {cache_key} and its children due to expiration")
 		else:
@@ -347,15 +852,15 @@ class BlockCache(TimedStorage):
 	def invalidate_page_if_expired(self, uuid: CustomUUID, last_update_time: str):
 		cache_key = self.create_cache_key(str(uuid), ObjectType.PAGE)
 		# FIXME: Some methods are checking timestamp internally, others are not
+		self._fault_in([cache_key])
 
 		# First check if the page exists at all
-		with self.lock:
-			self.cursor.execute('SELECT 1 FROM block_cache WHERE cache_key = ? AND object_type = ?', (cache_key, ObjectType.PAGE.value))
-			exists = self.cursor.fetchone() is not None
+		with self.lock.read():
+			exists = len(self.database.read('SELECT 1 FROM block_cache WHERE cache_key = ? AND object_type = ?', (cache_key, ObjectType.PAGE.value))) > 0
 		
 		if not exists:
 			# Page doesn't exist, count as a miss
-			self._increment_metric('misses_not_found')
+			self._increment_metric('misses_not_found', ObjectType.PAGE)
 			return
 			
 		expired = self.check_if_expired(cache_key, ObjectType.PAGE, last_update_time)
@@ -363,7 +868,7 @@ class BlockCache(TimedStorage):
 		# Invalidate all blocks under this page
 		if expired:
 			# Page exists but is expired, count as a miss_expired
-			self._increment_metric('misses_expired')
+			self._increment_metric('misses_expired', ObjectType.PAGE)
 			self._invalidate_block_recursive(cache_key)
 		
 		# Use the internal method to directly invalidate the page itself
@@ -371,7 +876,7 @@ class BlockCache(TimedStorage):
 		with self.lock:
 			if self.check_if_expired(cache_key, ObjectType.PAGE, last_update_time):
 				self.cursor.execute('DELETE FROM block_cache WHERE cache_key = ? AND object_type = ?', (cache_key, ObjectType.PAGE.value))
-				self.cursor.execute('DELETE FROM block_relationships WHERE parent_key = ? OR child_key = ?', (cache_key, cache_key))
+				self.cursor.execute(f'DELETE FROM block_relationships WHERE parent_id = {self.KEY_ID_SQL} OR child_id = {self.KEY_ID_SQL}', (cache_key, cache_key))
 				self.remove_children_fetched_for_block(cache_key)
 				self.conn.commit()
 				self.set_dirty()
@@ -381,41 +886,166 @@ class BlockCache(TimedStorage):
 			self._invalidate_parent_search_or_query(cache_key)
 
 
-	def _get_block_internal(self, cache_key: str, object_type: ObjectType) -> Optional[str]:
+	def _get_row_internal(self, cache_key: str, object_type: ObjectType, allow_stale: bool = False) -> Tuple[Optional[Tuple[str, Optional[float], bool]], Optional[int]]:
 		"""
-		Returns the content of the block if it is not expired,
-		otherwise deletes it and returns None
+		Returns the content of the block, its expiry time (epoch seconds) and whether it is past it,
+		or None if it is missing, expired or can't be decoded. Expired content is only returned with allow_stale, within the grace period of its type.
+		Second element is timestamp_ms of an expired or undecodable row, to be dropped with _drop_row() once the read lock is released.
 		"""
 
+		now_ms = int(time.time() * 1000)
+
+		with self.lock.read():
+			rows = self.database.read('''
+				SELECT content, timestamp_ms, expires_at_ms, expires_at_ms < ?, expires_at_ms + ? < ?
+				FROM block_cache WHERE cache_key = ? AND object_type = ?
+			''', (now_ms, self._grace_ms(object_type), now_ms, cache_key, object_type.value))
+
+		if not rows:
+			# Increment miss count for not found items
+			self._increment_metric('misses_not_found', object_type)
+			return None, None
+
+		stored_content, timestamp_ms, expires_at_ms, expired, past_grace = rows[0]
+
+		if expired and (past_grace or not allow_stale):
+			log.debug(f"Item {cache_key} has expired")
+
+			# Increment miss count for expired items
+			self._increment_metric('misses_expired', object_type)
+			# Row within the grace period is kept for readers that accept stale content
+			return None, timestamp_ms if past_grace else None
+
+		try:
+			content = self.codec.decode(stored_content)
+		except (ValueError, zlib.error) as e:
+			log.error(f"Can't decode cached {cache_key}, dropping it: {e}")
+			self._increment_metric('misses_not_found', object_type)
+			return None, timestamp_ms
+
+		expires_at = expires_at_ms / 1000 if expires_at_ms is not None else None
+
+		# Increment hit count
+		self._increment_metric('stale_hits' if expired else 'hits', object_type)
+		self.access_tracker.record(cache_key, object_type.value)
+		#log.debug(f"Returning cached {cache_key}")
+		return (content, expires_at, bool(expired)), None
+
+
+	def _drop_row(self, cache_key: str, object_type: ObjectType, timestamp_ms: int):
 		with self.lock:
-			self.cursor.execute('SELECT content, timestamp, ttl FROM block_cache WHERE cache_key = ? AND object_type = ?', (cache_key, object_type.value))
-			result = self.cursor.fetchone()
-
-			if result is not None:
-				content, timestamp_str, ttl = result
-
-				if ttl and ttl > 0:
-					stored_time = datetime.strptime(timestamp_str, "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
-					now = datetime.now(timezone.utc)
-					if (now - stored_time).total_seconds() > ttl:
-						log.debug(f"Item {cache_key} has expired")
-						
-						# Increment miss count for expired items
-						self._increment_metric('misses_expired')
-
-						self.cursor.execute('DELETE FROM block_cache WHERE cache_key = ? AND object_type = ?', (cache_key, object_type.value))
-						self.conn.commit()
-						self.set_dirty()
-						return None
-
-				# Increment hit count
-				self._increment_metric('hits')
-				#log.debug(f"Returning cached {cache_key}")
-				return content
+			# Skip the row if it was stored again since it was read
+			self.cursor.execute('DELETE FROM block_cache WHERE cache_key = ? AND object_type = ? AND timestamp_ms = ?', (cache_key, object_type.value, timestamp_ms))
+			deleted = self.cursor.rowcount > 0
+			self.conn.commit()
+			if deleted:
+				self.set_dirty()
+
+
+	def _get_block_internal(self, cache_key: str, object_type: ObjectType) -> Optional[str]:
+		start_time = time.perf_counter()
+		self._fault_in([cache_key])
+		row, stale_timestamp_ms = self._get_row_internal(cache_key, object_type)
+		if stale_timestamp_ms is not None:
+			self._drop_row(cache_key, object_type, stale_timestamp_ms)
+		self.metrics.record_latency("get", time.perf_counter() - start_time)
+		return row[0] if row is not None else None
+
+
+	def _get_parsed_internal(self, cache_key: str, object_type: ObjectType, allow_stale: bool = False) -> Tuple[Optional[Any], bool]:
+		"""
+		Returns parsed content of the block, deserializing it only on the first access, and whether it is past its TTL.
+		Returned object is shared with other callers and must not be modified.
+		"""
+		start_time = time.perf_counter()
+		self._sync_shared_changes()
+		parsed, is_stale = None, False
+		entry = self.parsed_cache.get_allow_stale(cache_key, object_type.value, self._grace_ms(object_type) / 1000 if allow_stale else 0)
+		if entry is not None:
+			parsed, is_stale = entry
+			self._increment_metric('stale_hits' if is_stale else 'hits', object_type)
+			self.access_tracker.record(cache_key, object_type.value)
+		else:
+			self._fault_in([cache_key])
+			# Parse under the read lock, so that a concurrent write can't be overwritten with a stale copy
+			with self.lock.read():
+				row, stale_timestamp_ms = self._get_row_internal(cache_key, object_type, allow_stale)
+				if row is not None:
+					content, expires_at, is_stale = row
+					parsed = parse_content(content)
+					self.parsed_cache.put(cache_key, object_type.value, parsed, len(content), expires_at)
+
+			if stale_timestamp_ms is not None:
+				self._drop_row(cache_key, object_type, stale_timestamp_ms)
+
+		self.metrics.record_latency("get", time.perf_counter() - start_time)
+		return parsed, is_stale
+
+
+	def _get_parsed_many(self, cache_keys: List[str], object_type: ObjectType) -> Dict[str, Any]:
+		"""
+		Returns parsed content of all keys that are cached and not expired, with one query per chunk of keys
+		that were not parsed before. Returned objects are shared with other callers and must not be modified.
+		"""
+		start_time = time.perf_counter()
+		self._sync_shared_changes()
+		found: Dict[str, Any] = {}
+		missing = []
+		for cache_key in dict.fromkeys(cache_keys):
+			parsed = self.parsed_cache.get(cache_key, object_type.value)
+			if parsed is not None:
+				found[cache_key] = parsed
+				self._increment_metric('hits', object_type)
+				self.access_tracker.record(cache_key, object_type.value)
 			else:
-				# Increment miss count for not found items
-				self._increment_metric('misses_not_found')
-				return None
+				missing.append(cache_key)
+
+		dropped = []
+		if missing:
+			self._fault_in(missing)
+			row_count = 0
+			now_ms = int(time.time() * 1000)
+			with self.lock.read():
+				for i in range(0, len(missing), self.MAX_QUERY_PARAMETERS):
+					chunk = missing[i:i + self.MAX_QUERY_PARAMETERS]
+					placeholders = ','.join('?' for _ in chunk)
+					rows = self.database.read(f'''
+						SELECT cache_key, content, timestamp_ms, expires_at_ms, expires_at_ms < ?, expires_at_ms + ? < ?
+						FROM block_cache WHERE object_type = ? AND cache_key IN ({placeholders})
+					''', [now_ms, self._grace_ms(object_type), now_ms, object_type.value] + chunk)
+					row_count += len(rows)
+
+					for cache_key, stored_content, timestamp_ms, expires_at_ms, expired, past_grace in rows:
+						if expired:
+							self._increment_metric('misses_expired', object_type)
+							if past_grace:
+								dropped.append((cache_key, timestamp_ms))
+							continue
+
+						try:
+							content = self.codec.decode(stored_content)
+						except (ValueError, zlib.error) as e:
+							log.error(f"Can't decode cached {cache_key}, dropping it: {e}")
+							self._increment_metric('misses_not_found', object_type)
+							dropped.append((cache_key, timestamp_ms))
+							continue
+
+						# Parsed under the read lock, so that a concurrent write can't be overwritten with a stale copy
+						parsed = parse_content(content)
+						expires_at = expires_at_ms / 1000 if expires_at_ms is not None else None
+						self.parsed_cache.put(cache_key, object_type.value, parsed, len(content), expires_at)
+						found[cache_key] = parsed
+						self._increment_metric('hits', object_type)
+						self.access_tracker.record(cache_key, object_type.value)
+
+			for _ in range(len(missing) - row_count):
+				self._increment_metric('misses_not_found', object_type)
+
+		for cache_key, timestamp_ms in dropped:
+			self._drop_row(cache_key, object_type, timestamp_ms)
+
+		self.metrics.record_latency("get", time.perf_counter() - start_time)
+		return found
 
 
 	def get_block(self, uuid: CustomUUID) -> Optional[str]:
@@ -443,14 +1073,70 @@ class BlockCache(TimedStorage):
 		return self._get_block_internal(cache_key, ObjectType.DATABASE_QUERY_RESULTS)
 
 
-	def get_metrics(self) -> Dict[str, int]:
+	def get_block_parsed(self, uuid: CustomUUID) -> Optional[Any]:
+		cache_key = self.create_cache_key(str(uuid), ObjectType.BLOCK)
+		return self._get_parsed_internal(cache_key, ObjectType.BLOCK)[0]
+
+
+	def get_page_parsed(self, uuid: CustomUUID) -> Optional[Any]:
+		cache_key = self.create_cache_key(str(uuid), ObjectType.PAGE)
+		return self._get_parsed_internal(cache_key, ObjectType.PAGE)[0]
+
+
+	def get_database_parsed(self, uuid: CustomUUID) -> Optional[Any]:
+		cache_key = self.create_cache_key(str(uuid), ObjectType.DATABASE)
+		return self._get_parsed_internal(cache_key, ObjectType.DATABASE)[0]
+
+
+	def get_search_results_parsed(self, query: str, filter_str: Optional[str] = None, start_cursor: Optional[CustomUUID] = None) -> Optional[Any]:
+		cache_key = self.create_search_results_cache_key(query, filter_str, start_cursor)
+		return self._get_parsed_internal(cache_key, ObjectType.SEARCH_RESULTS)[0]
+
+
+	def get_database_query_results_parsed(self, database_id: CustomUUID, filter_str: Optional[str] = None, start_cursor: Optional[CustomUUID] = None) -> Optional[Any]:
+		cache_key = self.create_database_query_results_cache_key(database_id, filter_str, start_cursor)
+		return self._get_parsed_internal(cache_key, ObjectType.DATABASE_QUERY_RESULTS)[0]
+
+
+	def get_subtree_parsed(self, uuid: CustomUUID) -> Optional[Any]:
+		self._sync_shared_changes()
+		self._invalidate_changed_subtrees()
+		cache_key = self.create_cache_key(str(uuid), ObjectType.SUBTREE)
+		return self._get_parsed_internal(cache_key, ObjectType.SUBTREE)[0]
+
+
+	def get_blocks_parsed(self, uuids: List[CustomUUID]) -> Dict[CustomUUID, Any]:
 		"""
-		Returns a dictionary with cache metrics.
+		Batched get_block_parsed(). Returns parsed content of blocks that are cached, missing ones are left out.
 		"""
-		with self.lock:
-			self.cursor.execute('SELECT metric_type, count FROM cache_metrics')
-			results = self.cursor.fetchall()
-			return {metric_type: count for metric_type, count in results}
+		cache_keys = {uuid: self.create_cache_key(str(uuid), ObjectType.BLOCK) for uuid in uuids}
+		found = self._get_parsed_many(list(cache_keys.values()), ObjectType.BLOCK)
+		return {uuid: found[cache_key] for uuid, cache_key in cache_keys.items() if cache_key in found}
+
+
+	def get_parsed_allow_stale(self, uuid: CustomUUID, object_type: ObjectType) -> Tuple[Optional[Any], bool]:
+		"""
+		Returns parsed content of a block, page or database and whether it is past its TTL.
+		Content past its TTL is returned within the grace period set with set_stale_policy(), to be revalidated by the caller.
+		"""
+		cache_key = self.create_cache_key(str(uuid), object_type)
+		return self._get_parsed_internal(cache_key, object_type, allow_stale=True)
+
+
+	def get_metrics(self) -> Dict[str, Any]:
+		"""
+		Returns a dictionary with cache metrics: total counters ("hits", "misses_not_found", "misses_expired"),
+		per object type counters ("hits:page" etc.) and get / put latency histograms under "latency_ms".
+		"""
+		with self.lock.read():
+			metrics = {metric_type: count for metric_type, count in self.database.read('SELECT metric_type, count FROM cache_metrics')}
+
+			# Add counters not yet folded into the table
+			for metric_type, count in self.metrics.get_pending().items():
+				metrics[metric_type] = metrics.get(metric_type, 0) + count
+
+		metrics["latency_ms"] = self.metrics.get_latency_histograms()
+		return metrics
 
 
 	def verify_object_type_or_raise(self, uuid: CustomUUID, expected_type: ObjectType) -> None:
@@ -467,11 +1153,11 @@ class BlockCache(TimedStorage):
 			ValueError: If the UUID exists in cache but with a different object type
 		"""
 		cache_key = self.create_cache_key(str(uuid), expected_type)
+		self._fault_in([cache_key])
 		
-		with self.lock:
-			# Check if this UUID exists with any object type
-			self.cursor.execute('SELECT object_type FROM block_cache WHERE cache_key = ?', (cache_key,))
-			results = self.cursor.fetchall()
+		with self.lock.read():
+			# Check if this UUID exists with any object type, snapshots are stored under any of them
+			results = self.database.read('SELECT object_type FROM block_cache WHERE cache_key = ? AND object_type != ?', (cache_key, ObjectType.SUBTREE.value))
 			
 			if results:
 				# Get all object types for this UUID
@@ -490,9 +1176,11 @@ class BlockCache(TimedStorage):
 		cache_key = self.create_cache_key(str(uuid), ObjectType.BLOCK)
 
 		children_keys = []
-		with self.lock:
-			self.cursor.execute('SELECT child_key FROM block_relationships WHERE parent_key = ?', (cache_key,))
-			children_keys = self.cursor.fetchall()
+		with self.lock.read():
+			children_keys = self.database.read(f'''
+				SELECT c.cache_key FROM block_relationships r JOIN cache_keys c ON c.key_id = r.child_id
+				WHERE r.parent_id = {self.KEY_ID_SQL}
+			''', (cache_key,))
 
 		# Convert clean cache keys directly to CustomUUID objects
 		return [CustomUUID.from_string(child_key_tuple[0]) for child_key_tuple in children_keys]
@@ -506,22 +1194,65 @@ class BlockCache(TimedStorage):
 			return
 
 		try:
-			with self.lock:
-				# Double-check connection is still valid
-				if not self.conn:
-					return
-					
-				disk_conn = sqlite3.connect(self.db_path)
-				with disk_conn:
-					self.conn.backup(disk_conn)
-				log.flow("Block cache saved to disk")
-				self.clean()
+			self._write_to_disk()
 		except sqlite3.Error as e:
 			# Don't log errors if we're already closing
 			if not self._is_closing:
 				log.error(f"Failed to save block cache: {e}")
 
 
+	def _write_to_disk(self):
+		with self.lock:
+			# Double-check connection is still valid
+			if not self.conn:
+				return
+
+			# Also writes buffered access statistics
+			self.evict_to_budget()
+			self._flush_metrics()
+
+			if self.persistence_mode == PersistenceMode.WAL:
+				# Changes are already on disk, only fold the WAL back into the database file
+				self.database.checkpoint()
+			# Only rows changed since the last save are written, unless a full snapshot is due
+			elif self.journal is not None and self.journal.flush(self.db_path):
+				log.flow("Block cache changes saved to disk")
+			else:
+				# Snapshot replaces the file, so objects still only on disk have to be copied first
+				self._finish_lazy_load()
+				self._save_snapshot()
+			self.clean()
+
+
+	def _save_snapshot(self):
+		disk_conn = sqlite3.connect(self.db_path)
+		with disk_conn:
+			self.conn.backup(disk_conn)
+		disk_conn.close()
+
+		if self.journal is not None:
+			self.journal.mark_synced()
+		log.flow("Block cache saved to disk")
+
+
+	def compact(self):
+		"""
+		Write a full snapshot of the cache to disk, reclaiming space left behind by incremental saves.
+		In WAL mode, the database file is vacuumed instead.
+		"""
+		with self.lock:
+			if not self.conn:
+				return
+			if self.persistence_mode == PersistenceMode.WAL:
+				self.conn.execute('VACUUM')
+				self.database.checkpoint(truncate=True)
+				log.flow("Block cache compacted")
+			else:
+				self._finish_lazy_load()
+				self._save_snapshot()
+		self.clean()
+
+
 	def cleanup(self):
 		#override
 
@@ -541,10 +1272,10 @@ class BlockCache(TimedStorage):
 			# Stop the periodic save thread first
 			self.stop_periodic_save()
 			
-			# Save one final time if connection is still valid
+			# Save one final time if connection is still valid, save() itself is a no-op once closing
 			if self.conn:
-				self.save()  # Call the virtual save method
-				self.conn.close()
+				self._write_to_disk()
+				self.database.close()
 				self.conn = None
 		except Exception as e:
 			# Only log if it's not a "closed database" error during shutdown
@@ -552,43 +1283,48 @@ class BlockCache(TimedStorage):
 				log.error(f"Cleanup failed: {e}")
 
 
-	def load_from_disk(self):
+	def load_from_disk(self) -> bool:
 		try:
 			with self.lock:
 				disk_conn = sqlite3.connect(self.db_path)
 				disk_conn.backup(self.conn)
+				disk_conn.close()
 				log.flow("Block cache loaded from disk")
 				self.clean()
+				return True
 		except sqlite3.Error:
 			log.flow("No existing block cache file found. Starting with an empty cache.")
+			return False
 
 
 	def get_blocks_updated_since(self, timestamp: str) -> List[Tuple[str, str, str, str]]:
-		with self.lock:
-			self.cursor.execute('''
+		timestamp_ms = Utils.convert_isoformat_to_epoch_ms(timestamp)
+		self._finish_lazy_load()
+		with self.lock.read():
+			rows = self.database.read('''
 				SELECT cache_key, object_type, content, timestamp
 				FROM block_cache
-				WHERE timestamp > ?
-				ORDER BY timestamp DESC
-			''', (timestamp,))
-			return self.cursor.fetchall()
+				WHERE timestamp_ms > ?
+				ORDER BY timestamp_ms DESC
+			''', (timestamp_ms,))
+		return [(cache_key, object_type, self.codec.decode(content), row_timestamp) for cache_key, object_type, content, row_timestamp in rows]
 
 
 	def _invalidate_block_internal(self, cache_key: str, object_type: ObjectType, timestamp: str):
+		self._fault_in([cache_key])
 		
 		# First check if the block exists
-		with self.lock:
-			self.cursor.execute('SELECT 1 FROM block_cache WHERE cache_key = ? AND object_type = ?', (cache_key, object_type.value))
-			exists = self.cursor.fetchone() is not None
+		with self.lock.read():
+			exists = len(self.database.read('SELECT 1 FROM block_cache WHERE cache_key = ? AND object_type = ?', (cache_key, object_type.value))) > 0
 			
 		if not exists:
 			# Block doesn't exist, count as a miss
-			self._increment_metric('misses_not_found')
+			self._increment_metric('misses_not_found', object_type)
 			return
 			
 		if self.check_if_expired(cache_key, object_type, timestamp):
 			# Block exists but is expired, count as a miss_expired
-			self._increment_metric('misses_expired')
+			self._increment_metric('misses_expired', object_type)
 			
 			with self.lock:
 				self.cursor.execute('''
@@ -608,47 +1344,184 @@ class BlockCache(TimedStorage):
 
 
 	def remove_unused_blocks(self):
-		
-		# TODO: Trigger periodically?
+		# Kept for compatibility, eviction runs on every save
+		self.evict_to_budget()
 
-		current_size = 0
+
+	def _flush_access(self):
+		rows = self.access_tracker.take_pending()
+		if not rows:
+			return
+
+		try:
+			with self.lock:
+				self.cursor.executemany('''
+					UPDATE block_cache
+					SET last_access_ms = MAX(COALESCE(last_access_ms, 0), ?), access_count = access_count + ?
+					WHERE cache_key = ? AND object_type = ?
+				''', rows)
+				self.conn.commit()
+		except sqlite3.Error:
+			self.access_tracker.restore_pending(rows)
+			raise
+
+
+	def evict_to_budget(self) -> int:
+		"""
+		Evict least valuable objects of each type whose total content size exceeds its budget.
+		Value is last access time, raised by a bonus for every past access, so that frequently used objects survive longer.
+		Freed pages are reused by SQLite for new rows, so no VACUUM is needed to keep memory bounded.
+
+		Returns:
+			Number of evicted objects
+		"""
+		evicted_count = 0
 
 		with self.lock:
-			# Get current database size
-			self.cursor.execute("PRAGMA page_count")
-			page_count = self.cursor.fetchone()[0]
-			self.cursor.execute("PRAGMA page_size")
-			page_size = self.cursor.fetchone()[0]
-			current_size = page_count * page_size
-
-			if current_size <= self.max_size:
-				return  # Database is already within size limit
-
-			# Remove old blocks until the database fits the size limit
-			while current_size > self.max_size:
-				# Delete the oldest 1000 blocks
-				self.cursor.execute('''
-					DELETE FROM block_cache
-					WHERE cache_key IN (
-						SELECT cache_key FROM block_cache
-						ORDER BY timestamp ASC
-						LIMIT 1000
-					)
-				''')
-				# TODO: Remove from other tables? What if block was not accessed but its parent was?
+			self._flush_access()
+
+			for object_type, budget in self.size_budgets.items():
+				self.cursor.execute('SELECT COALESCE(SUM(size), 0) FROM block_cache WHERE object_type = ?', (object_type.value,))
+				total_size = self.cursor.fetchone()[0]
+				if total_size <= budget:
+					continue
 
+				excess = total_size - int(budget * self.EVICTION_TARGET_RATIO)
+				self.cursor.execute('''
+					SELECT cache_key, size FROM block_cache
+					WHERE object_type = ?
+					ORDER BY COALESCE(last_access_ms, timestamp_ms, 0) + MIN(access_count, ?) * ? ASC
+				''', (object_type.value, self.MAX_ACCESS_COUNT, self.ACCESS_FREQUENCY_BONUS_MS))
+
+				victims = []
+				freed = 0
+				for cache_key, size in self.cursor.fetchall():
+					if freed >= excess:
+						break
+					victims.append(cache_key)
+					freed += size
+
+				self._delete_evicted(victims, object_type)
+				evicted_count += len(victims)
+				log.flow(f"Evicted {len(victims)} {object_type.value} objects ({freed} bytes) from block cache")
+
+			if evicted_count:
 				self.conn.commit()
 				self.set_dirty()
 
-				# Recalculate the current size
-				self.cursor.execute("PRAGMA page_count")
-				page_count = self.cursor.fetchone()[0]
-				current_size = page_count * page_size
+		return evicted_count
 
-				# Vacuum the database to reclaim space
-				self.cursor.execute("VACUUM")
-				self.conn.commit()
-			
+
+	def sweep_expired(self) -> int:
+		"""
+		Delete all objects past their TTL in bulk, together with their dependent rows.
+
+		Returns:
+			Number of deleted objects
+		"""
+		now_ms = int(time.time() * 1000)
+		swept_count = 0
+
+		with self.lock:
+			if not self.conn:
+				return 0
+
+			self.cursor.execute('SELECT cache_key, object_type, expires_at_ms FROM block_cache WHERE expires_at_ms < ?', (now_ms,))
+			expired_by_type: Dict[str, List[str]] = {}
+			for cache_key, object_type, expires_at_ms in self.cursor.fetchall():
+				# Stale objects are kept until the grace period of their type is over
+				if expires_at_ms + self._grace_ms(ObjectType(object_type)) < now_ms:
+					expired_by_type.setdefault(object_type, []).append(cache_key)
+
+			for object_type, cache_keys in expired_by_type.items():
+				self._delete_evicted(cache_keys, ObjectType(object_type))
+				swept_count += len(cache_keys)
+
+			# IDs of keys left without relationships are not referenced anymore
+			self.cursor.execute('''
+				DELETE FROM cache_keys
+				WHERE NOT EXISTS (SELECT 1 FROM block_relationships WHERE parent_id = key_id)
+					AND NOT EXISTS (SELECT 1 FROM block_relationships WHERE child_id = key_id)
+			''')
+
+			# Other processes had enough time to read old changes
+			if self.change_feed is not None:
+				self.change_feed.prune()
+
+			self.conn.commit()
+			if swept_count:
+				self.set_dirty()
+
+		if swept_count:
+			log.flow(f"Swept {swept_count} expired objects from block cache")
+		return swept_count
+
+
+	def _sweep_periodically(self):
+		while not self._stop_event.wait(self.SWEEP_INTERVAL_S):
+			try:
+				self.sweep_expired()
+				# Without periodic saves, eviction, metrics and checkpoints run on the sweep schedule
+				if self.persistence_mode == PersistenceMode.WAL:
+					self._write_to_disk()
+			except sqlite3.Error as e:
+				if not self._is_closing:
+					log.error(f"Failed to sweep expired objects from block cache: {e}")
+
+
+	def start_periodic_save(self):
+		#override, expired objects are swept on their own schedule
+		if self.persistence_mode != PersistenceMode.WAL:
+			super().start_periodic_save()
+		with self._periodic_save_lock:
+			if self._sweeper is None or not self._sweeper.is_alive():
+				self._stop_event.clear()
+				self._sweeper = threading.Thread(target=self._sweep_periodically, daemon=True)
+				self._sweeper.start()
+
+
+	def stop_periodic_save(self):
+		#override
+		super().stop_periodic_save()
+		if self._sweeper is not None and self._sweeper.is_alive():
+			self._sweeper.join()
+		if self._prewarmer is not None and self._prewarmer.is_alive():
+			self._prewarmer.join()
+
+
+	def _delete_evicted(self, cache_keys: List[str], object_type: ObjectType):
+		self.cursor.execute('CREATE TEMP TABLE IF NOT EXISTS evicted_keys (cache_key TEXT PRIMARY KEY)')
+		self.cursor.execute('DELETE FROM evicted_keys')
+		self.cursor.executemany('INSERT OR IGNORE INTO evicted_keys (cache_key) VALUES (?)', [(key,) for key in cache_keys])
+
+		self.cursor.execute('''
+			DELETE FROM block_cache
+			WHERE object_type = ? AND cache_key IN (SELECT cache_key FROM evicted_keys)
+		''', (object_type.value,))
+
+		if object_type == ObjectType.SUBTREE:
+			# Snapshots have no relationships of their own
+			self.cursor.execute('DELETE FROM evicted_keys')
+			return
+
+		# Parents no longer have all their children cached
+		self.cursor.execute('''
+			DELETE FROM children_fetched_for_block
+			WHERE cache_key IN (
+				SELECT p.cache_key FROM block_relationships r JOIN cache_keys p ON p.key_id = r.parent_id
+				WHERE r.child_id IN (SELECT k.key_id FROM cache_keys k JOIN evicted_keys e ON e.cache_key = k.cache_key)
+			)
+		''')
+
+		# Same key may still be cached as another object type, ie. a child page listed as a block
+		self.cursor.execute('DELETE FROM evicted_keys WHERE cache_key IN (SELECT cache_key FROM block_cache)')
+		self.cursor.execute('''
+			WITH evicted_ids AS (SELECT k.key_id FROM cache_keys k JOIN evicted_keys e ON e.cache_key = k.cache_key)
+			DELETE FROM block_relationships
+			WHERE parent_id IN (SELECT key_id FROM evicted_ids) OR child_id IN (SELECT key_id FROM evicted_ids)
+		''')
+		self.cursor.execute('DELETE FROM children_fetched_for_block WHERE cache_key IN (SELECT cache_key FROM evicted_keys)')
+		self.cursor.execute('DELETE FROM evicted_keys')
 
 
 	def add_parent_child_relationship(self, parent_uuid: CustomUUID, child_uuid: CustomUUID, parent_type: ObjectType, child_type: ObjectType = ObjectType.BLOCK):
@@ -657,12 +1530,7 @@ class BlockCache(TimedStorage):
 		child_key = self.create_cache_key(str(child_uuid), child_type)
 
 		with self.lock:
-
-			self.cursor.execute('''
-				INSERT OR IGNORE INTO block_relationships (parent_key, child_key)
-				VALUES (?, ?)
-			''', (parent_key, child_key))
-			
+			self._insert_relationships([(parent_key, child_key)])
 			self.conn.commit()
 			self.set_dirty()
 
@@ -671,16 +1539,9 @@ class BlockCache(TimedStorage):
 
 	def add_parent_children_relationships(self, parent_uuid: CustomUUID, children_uuids: List[CustomUUID], parent_type: ObjectType, child_type: ObjectType = ObjectType.BLOCK):
 		parent_key = self.create_cache_key(str(parent_uuid), parent_type)
-		with self.lock:
-			child_keys = [(parent_key, self.create_cache_key(str(child_uuid), child_type)) for child_uuid in children_uuids]
-			
-			self.cursor.executemany('''
-				INSERT OR IGNORE INTO block_relationships (parent_key, child_key)
-				VALUES (?, ?)
-			''', child_keys)
-			
-			self.conn.commit()
-			self.set_dirty()
+		child_keys = [(parent_key, self.create_cache_key(str(child_uuid), child_type)) for child_uuid in children_uuids]
+
+		self.add_relationships_bulk(child_keys)
 
 		log.debug(f"Added parent-children relationships: {parent_key} -> {len(children_uuids)} children")
 
@@ -696,9 +1557,8 @@ class BlockCache(TimedStorage):
 
 
 	def get_children_fetched_for_block(self, cache_key: str) -> bool:
-		with self.lock:
-			self.cursor.execute('SELECT 1 FROM children_fetched_for_block WHERE cache_key = ?', (cache_key,))
-			return self.cursor.fetchone() is not None
+		with self.lock.read():
+			return len(self.database.read('SELECT 1 FROM children_fetched_for_block WHERE cache_key = ?', (cache_key,))) > 0
 
 
 	def remove_children_fetched_for_block(self, cache_key: str):
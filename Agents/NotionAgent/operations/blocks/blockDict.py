@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, Set
 from pydantic.v1 import BaseModel, Field
 
 
@@ -12,6 +12,10 @@ class BlockDict(BaseModel):
 		default_factory=dict,
 		description="Mapping of integer block IDs to their content dictionaries"
 	)
+	stale_ids: Set[int] = Field(
+		default_factory=set,
+		description="IDs of blocks served from cache past their TTL, while a fresh copy is fetched in the background"
+	)
 
 	class Config:
 		# Enable JSON serialization by allowing the model to be converted to dict
@@ -72,6 +76,7 @@ class BlockDict(BaseModel):
 		"""Update blocks with another dictionary or BlockDict instance."""
 		if isinstance(other_dict, BlockDict):
 			self.blocks.update(other_dict.blocks)
+			self.stale_ids.update(other_dict.stale_ids)
 		else:
 			self.blocks.update(other_dict)
 
@@ -81,6 +86,15 @@ class BlockDict(BaseModel):
 		self.blocks[block_id] = content
 
 
+	def mark_stale(self, block_id: int) -> None:
+		"""Flag a block as possibly outdated."""
+		self.stale_ids.add(block_id)
+
+
+	def is_stale(self, block_id: int) -> bool:
+		return block_id in self.stale_ids
+
+
 	def to_dict(self) -> Dict[int, Dict[str, Any]]:
 		"""Convert to a regular dictionary."""
 		return self.blocks.copy() 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Union, Dict, List
+from typing import Union, Dict, List, Optional
 from enum import Enum, auto
 from tz_common import CustomUUID
 from tz_common.logs import log
@@ -63,6 +63,25 @@ class BlockHolder:
 		return uuids
 
 
+	@staticmethod
+	def extract_title(obj: dict) -> Optional[str]:
+		"""
+		Plain text title of a raw page or database, None for other objects or when it has no title.
+		"""
+		if obj.get("object") == "database":
+			rich_text = obj.get("title")
+		elif obj.get("object") == "page":
+			rich_text = next((prop.get("title") for prop in obj.get("properties", {}).values()
+							  if isinstance(prop, dict) and prop.get("type", "title") == "title" and "title" in prop), None)
+		else:
+			return None
+
+		if not isinstance(rich_text, list):
+			return None
+		title = "".join(item.get("plain_text", item.get("text", {}).get("content", "")) for item in rich_text if isinstance(item, dict))
+		return title.strip() or None
+
+
 	def convert_uuids_to_int(self, message: dict | list, uuid_to_int_map: Dict[CustomUUID, int]) -> dict | list:
 		"""
 		Convert UUID strings to integer IDs using the provided mapping.
@@ -1,4 +1,4 @@
-from typing import Optional, Dict, Union, List
+from typing import Optional, Dict, Union, List, Tuple
 import json
 from tz_common import CustomUUID
 from tz_common.logs import log
@@ -7,6 +7,7 @@ from .blockCache import BlockCache, ObjectType
 from .index import Index
 from .blockHolder import BlockHolder, FilteringOptions
 from .blockDict import BlockDict
+from .parsedCache import parse_content
 
 
 class BlockManager:
@@ -31,40 +32,39 @@ class BlockManager:
 		Returns:
 			Parsed dictionary or original content if parsing fails
 		"""
-		if isinstance(cache_content, str):
-			try:
-				return json.loads(cache_content)
-			except json.JSONDecodeError:
-				return cache_content
-		return cache_content
+		return parse_content(cache_content)
 
 
-	def process_and_store_block(self, 
-								raw_data: dict, 
-								object_type: ObjectType, 
-								parent_uuid: Optional[CustomUUID] = None,
-								parent_type: ObjectType = ObjectType.BLOCK) -> int:
+	def _register_titles(self, objects: List[dict], uuid_to_int_map: Dict[CustomUUID, int]):
 		"""
-		Process raw Notion API data and store it in cache with proper relationships.
-		Stores unfiltered data with only UUID conversion.
-		
-		Args:
-			raw_data: Raw JSON data from Notion API
-			object_type: Type of the main object (BLOCK, PAGE, DATABASE, etc.)
-			parent_uuid: UUID of parent object if this is a child
-			parent_type: Type of parent object
-			
+		Store titles of raw pages and databases in the index, for local search.
+		"""
+		titles = {}
+		for obj in objects:
+			if not isinstance(obj, dict) or not isinstance(obj.get("id"), str) or not CustomUUID.validate(obj["id"]):
+				continue
+			title = self.block_holder.extract_title(obj)
+			int_id = uuid_to_int_map.get(CustomUUID.from_string(obj["id"]))
+			if title is not None and int_id is not None:
+				titles[int_id] = title
+		self.index.set_titles(titles)
+
+
+	def _convert_block(self, raw_data: dict, uuid_to_int_map: Optional[Dict[CustomUUID, int]] = None) -> Tuple[CustomUUID, int, str]:
+		"""
+		Register all UUIDs of a raw Notion object with the index and convert them to int IDs.
+		Objects of one response pass uuid_to_int_map they were all registered with, so that the index is written once.
+
 		Returns:
-			Integer ID of the main processed object
+			Tuple of (main UUID, main int ID, unfiltered JSON string ready for cache)
 		"""
-		# Extract all UUIDs from the raw data
-		all_uuids = self.block_holder.extract_all_uuids(raw_data)
-		
-		# Register all UUIDs with the index and create mapping
-		uuid_to_int_map = {}
-		for uuid_obj in all_uuids:
-			int_id = self.index.add_uuid(uuid_obj)
-			uuid_to_int_map[uuid_obj] = int_id
+		if uuid_to_int_map is None:
+			# Extract all UUIDs from the raw data
+			all_uuids = self.block_holder.extract_all_uuids(raw_data)
+			
+			# Register all UUIDs with the index and create mapping
+			uuid_to_int_map = self.index.add_uuids(list(all_uuids))
+			self._register_titles([raw_data], uuid_to_int_map)
 		
 		# Get the main object's UUID and int ID
 		main_uuid_str = raw_data.get('id')
@@ -83,6 +83,29 @@ class BlockManager:
 		
 		# Convert processed data to string for cache storage
 		processed_data_str = json.dumps(processed_data) if isinstance(processed_data, dict) else str(processed_data)
+
+		return main_uuid, main_int_id, processed_data_str
+
+
+	def process_and_store_block(self, 
+								raw_data: dict, 
+								object_type: ObjectType, 
+								parent_uuid: Optional[CustomUUID] = None,
+								parent_type: ObjectType = ObjectType.BLOCK) -> int:
+		"""
+		Process raw Notion API data and store it in cache with proper relationships.
+		Stores unfiltered data with only UUID conversion.
+		
+		Args:
+			raw_data: Raw JSON data from Notion API
+			object_type: Type of the main object (BLOCK, PAGE, DATABASE, etc.)
+			parent_uuid: UUID of parent object if this is a child
+			parent_type: Type of parent object
+			
+		Returns:
+			Integer ID of the main processed object
+		"""
+		main_uuid, main_int_id, processed_data_str = self._convert_block(raw_data)
 		
 		# Store in cache based on object type
 		if object_type == ObjectType.BLOCK:
@@ -132,10 +155,8 @@ class BlockManager:
 		all_uuids = self.block_holder.extract_all_uuids(raw_results)
 		
 		# Register UUIDs and create mapping
-		uuid_to_int_map = {}
-		for uuid_obj in all_uuids:
-			int_id = self.index.add_uuid(uuid_obj)
-			uuid_to_int_map[uuid_obj] = int_id
+		uuid_to_int_map = self.index.add_uuids(list(all_uuids))
+		self._register_titles(raw_results.get("results", []), uuid_to_int_map)
 		
 		# Store unfiltered data with only UUID conversion
 		unfiltered_data = self.block_holder.convert_uuids_to_int(raw_results.copy(), uuid_to_int_map)
@@ -145,7 +166,9 @@ class BlockManager:
 		self.cache.add_search_results(query, unfiltered_data_str, filter_str, start_cursor, ttl)
 		
 		# Create parent-child relationships for search results using original data
+		# Search results are keyed by a composite cache key, not a UUID, so relationships are added by key
 		cache_key = self.cache.create_search_results_cache_key(query, filter_str, start_cursor)
+		relationships = []
 		for result_info in original_results:
 			result_id = result_info["id"]
 			result_object_type = result_info["object_type"]
@@ -160,20 +183,10 @@ class BlockManager:
 			else:
 				child_type = ObjectType.BLOCK
 			
-			# For search results, we need to use cache_key as parent_uuid
-			# But add_parent_child_relationship expects CustomUUID, so we need a different approach
-			# Let's use the cache's internal method that works with cache keys
-			parent_key = cache_key
 			child_key = self.cache.create_cache_key(str(result_uuid), child_type)
-			
-			# Use the cache's internal relationship method
-			with self.cache.lock:
-				self.cache.cursor.execute('''
-					INSERT OR IGNORE INTO block_relationships (parent_key, child_key)
-					VALUES (?, ?)
-				''', (parent_key, child_key))
-				self.cache.conn.commit()
-				self.cache.set_dirty()
+			relationships.append((cache_key, child_key))
+		
+		self.cache.add_relationships_bulk(relationships)
 		
 		# Convert to BlockDict for return (unfiltered)
 		block_dict = BlockDict()
@@ -209,10 +222,8 @@ class BlockManager:
 		all_uuids = self.block_holder.extract_all_uuids(raw_results)
 		
 		# Register UUIDs and create mapping
-		uuid_to_int_map = {}
-		for uuid_obj in all_uuids:
-			int_id = self.index.add_uuid(uuid_obj)
-			uuid_to_int_map[uuid_obj] = int_id
+		uuid_to_int_map = self.index.add_uuids(list(all_uuids))
+		self._register_titles(raw_results.get("results", []), uuid_to_int_map)
 		
 		# Store unfiltered data with only UUID conversion
 		unfiltered_data = self.block_holder.convert_uuids_to_int(raw_results.copy(), uuid_to_int_map)
@@ -247,30 +258,29 @@ class BlockManager:
 			List of children UUIDs
 		"""
 		children_uuids = []
+		children_blocks = []
+		children_data = [child_data for child_data in children_data if child_data.get("id")]
+		if not children_data:
+			return children_uuids
+		
+		# Register UUIDs of all children with the index at once
+		uuid_to_int_map = self.index.add_uuids(list(self.block_holder.extract_all_uuids(children_data)))
+		self._register_titles(children_data, uuid_to_int_map)
 		
 		for child_data in children_data:
-			child_id_str = child_data.get("id")
-			if child_id_str:
-				child_uuid = CustomUUID.from_string(child_id_str)
-				children_uuids.append(child_uuid)
-				
-				# Process and store each child (now stores unfiltered data)
-				self.process_and_store_block(
-					child_data, 
-					ObjectType.BLOCK, 
-					parent_uuid=parent_uuid,
-					parent_type=parent_type
-				)
-		
-		# Add batch parent-children relationships
-		if children_uuids:
-			self.cache.add_parent_children_relationships(
-				parent_uuid, children_uuids, parent_type, ObjectType.BLOCK
-			)
-			
-			# Mark children as fetched for the parent
-			parent_cache_key = self.cache.create_cache_key(str(parent_uuid), parent_type)
-			self.cache.add_children_fetched_for_block(parent_cache_key)
+			# Convert each child (stores unfiltered data), but write them all at once
+			child_uuid, child_int_id, child_content = self._convert_block(child_data, uuid_to_int_map)
+			children_uuids.append(child_uuid)
+			children_blocks.append((child_uuid, child_content))
+		
+		# Store children, parent-children relationships and the fetched flag in one transaction
+		self.cache.add_blocks_bulk(
+			children_blocks,
+			parent_uuid=parent_uuid,
+			parent_type=parent_type,
+			mark_children_fetched=True
+		)
+		log.debug(f"Processed and stored {len(children_blocks)} children of {parent_uuid}")
 		
 		return children_uuids
 
@@ -296,14 +306,14 @@ class BlockManager:
 		# Process all children (stores unfiltered data in cache)
 		children_uuids = self.process_children_batch(children_data, parent_uuid, parent_type)
 		
-		# Create BlockDict with all children (unfiltered)
+		# Create BlockDict with all children (unfiltered), read from cache and index in batches
+		children_content = self.cache.get_blocks_parsed(children_uuids)
+		children_int_ids, _ = self.index.map_uuids(children_uuids)
 		block_dict = BlockDict()
 		for child_uuid in children_uuids:
-			# Get unfiltered content from cache
-			cached_content = self.cache.get_block(child_uuid)
-			if cached_content:
-				unfiltered_data = self.parse_cache_content(cached_content)
-				child_int_id = self.index.resolve_to_int(child_uuid)
+			unfiltered_data = children_content.get(child_uuid)
+			if unfiltered_data:
+				child_int_id = children_int_ids.get(child_uuid)
 				if child_int_id is not None:
 					block_dict.add_block(child_int_id, unfiltered_data)
 		
@@ -0,0 +1,84 @@
+import zlib
+from enum import Enum
+from typing import Optional, Union
+
+from tz_common.logs import log
+
+try:
+	import zstandard
+except ImportError:
+	zstandard = None
+
+
+class Compression(Enum):
+	NONE = "none"
+	ZLIB = "zlib"
+	ZSTD = "zstd"
+
+
+class CacheCodec:
+	"""
+	Encodes cached content for storage.
+
+	TEXT values are raw JSON, which includes every row written before compression was introduced.
+	BLOB values start with a one-byte format tag, followed by compressed UTF-8 JSON.
+	zstd is used when the optional zstandard package is installed, zlib otherwise.
+	"""
+
+	TAGS = {
+		Compression.ZLIB: b"z",
+		Compression.ZSTD: b"s",
+	}
+
+	def __init__(self, compression: Optional[Compression] = None, threshold: int = 512):
+		"""
+		Args:
+			compression: Algorithm for new content, best available if None
+			threshold: Content shorter than this many characters is stored raw
+		"""
+		if compression is None:
+			compression = Compression.ZSTD if zstandard is not None else Compression.ZLIB
+		if compression == Compression.ZSTD and zstandard is None:
+			log.error("zstandard is not installed, falling back to zlib compression")
+			compression = Compression.ZLIB
+
+		self.compression = compression
+		self.threshold = threshold
+
+		if zstandard is not None:
+			self._zstd_compressor = zstandard.ZstdCompressor(level=3)
+			self._zstd_decompressor = zstandard.ZstdDecompressor()
+
+
+	def encode(self, content: str) -> Union[str, bytes]:
+		if self.compression == Compression.NONE or len(content) < self.threshold:
+			return content
+
+		data = content.encode("utf-8")
+		if self.compression == Compression.ZSTD:
+			compressed = self._zstd_compressor.compress(data)
+		else:
+			compressed = zlib.compress(data, 6)
+
+		# Keep incompressible content raw
+		if len(compressed) + 1 >= len(data):
+			return content
+		return self.TAGS[self.compression] + compressed
+
+
+	def decode(self, stored: Union[str, bytes, None]) -> Optional[str]:
+		"""
+		Raises:
+			ValueError: If the format tag is unknown or its decompressor isn't available
+		"""
+		if stored is None or isinstance(stored, str):
+			return stored
+
+		tag, payload = stored[:1], stored[1:]
+		if tag == self.TAGS[Compression.ZLIB]:
+			return zlib.decompress(payload).decode("utf-8")
+		if tag == self.TAGS[Compression.ZSTD]:
+			if zstandard is None:
+				raise ValueError("Cached content is compressed with zstd, but zstandard is not installed")
+			return self._zstd_decompressor.decompress(payload).decode("utf-8")
+		raise ValueError(f"Unknown cached content format tag: {tag!r}")
@@ -0,0 +1,82 @@
+import bisect
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+
+class CacheMetrics:
+	"""
+	In-memory hit / miss counters and get / put latency histograms.
+	Counters are folded into the persistent cache_metrics table only at save time,
+	so that reads don't turn into writes.
+	"""
+
+	# Upper bounds of latency buckets in milliseconds, the last bucket is unbounded
+	LATENCY_BUCKETS_MS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100]
+	OPERATIONS = ["get", "put"]
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		# Counts not yet written to the table
+		self.pending: Dict[str, int] = defaultdict(int)
+		self.latency_buckets: Dict[str, List[int]] = {operation: [0] * (len(self.LATENCY_BUCKETS_MS) + 1) for operation in self.OPERATIONS}
+		self.latency_total_ms: Dict[str, float] = {operation: 0.0 for operation in self.OPERATIONS}
+
+
+	def increment(self, metric_type: str, object_type: Optional[str] = None):
+		"""
+		Count an event, both in total and, if given, per object type as "<metric_type>:<object_type>".
+		"""
+		with self.lock:
+			self.pending[metric_type] += 1
+			if object_type is not None:
+				self.pending[f"{metric_type}:{object_type}"] += 1
+
+
+	def record_latency(self, operation: str, seconds: float):
+		milliseconds = seconds * 1000
+		bucket = bisect.bisect_left(self.LATENCY_BUCKETS_MS, milliseconds)
+		with self.lock:
+			self.latency_buckets[operation][bucket] += 1
+			self.latency_total_ms[operation] += milliseconds
+
+
+	def take_pending(self) -> Dict[str, int]:
+		"""
+		Returns counts accumulated since the last call and resets them.
+		"""
+		with self.lock:
+			pending = dict(self.pending)
+			self.pending.clear()
+		return pending
+
+
+	def restore_pending(self, counts: Dict[str, int]):
+		"""
+		Put back counts that could not be written.
+		"""
+		with self.lock:
+			for metric_type, count in counts.items():
+				self.pending[metric_type] += count
+
+
+	def get_pending(self) -> Dict[str, int]:
+		with self.lock:
+			return dict(self.pending)
+
+
+	def get_latency_histograms(self) -> Dict[str, Dict[str, Any]]:
+		"""
+		Returns per-operation histograms with bucket counts keyed by upper bound in milliseconds.
+		"""
+		labels = [str(bound) for bound in self.LATENCY_BUCKETS_MS] + ["+Inf"]
+		histograms = {}
+		with self.lock:
+			for operation in self.OPERATIONS:
+				buckets = self.latency_buckets[operation]
+				histograms[operation] = {
+					"count": sum(buckets),
+					"total_ms": self.latency_total_ms[operation],
+					"buckets": dict(zip(labels, buckets)),
+				}
+		return histograms
@@ -1,4 +1,5 @@
-from typing import Optional, Callable, Awaitable, Dict, Any
+from typing import Optional, Callable, Awaitable, Dict, Any, NamedTuple, Tuple
+import asyncio
 import json
 
 from tz_common import CustomUUID
@@ -7,8 +8,31 @@ from tz_common.logs import log
 from .blockCache import BlockCache, ObjectType
 from .blockManager import BlockManager
 from .blockDict import BlockDict
-from ..utils import Utils
 from .index import Index
+from .negativeCache import NegativeCache
+from .subtreeSnapshot import SubtreeSnapshot
+
+
+class StalePolicy(NamedTuple):
+	"""
+	Objects are fresh for ttl seconds after they are fetched. For grace more seconds a read refetches them,
+	but serves the stale copy, flagged, if the fresh one doesn't arrive within the revalidation timeout.
+	"""
+	ttl: int
+	grace: int
+
+
+def parse_stale_policies(value: str) -> Dict[ObjectType, StalePolicy]:
+	"""
+	Parse stale policies given as comma separated "object_type:ttl:grace", ie. "page:600:86400,database:600:86400".
+	"""
+	policies = {}
+	for item in value.split(","):
+		if not item.strip():
+			continue
+		object_type, ttl, grace = item.strip().split(":")
+		policies[ObjectType(object_type)] = StalePolicy(int(ttl), int(grace))
+	return policies
 
 
 class CacheOrchestrator:
@@ -17,173 +41,307 @@ class CacheOrchestrator:
 	Handles cache invalidation logic, TTL management, and cache coordination.
 	"""
 
-	def __init__(self, cache: BlockCache, block_manager: BlockManager, index: Index):
+	def __init__(self,
+				 cache: BlockCache,
+				 block_manager: BlockManager,
+				 index: Index,
+				 negative_cache: Optional[NegativeCache] = None,
+				 stale_policies: Optional[Dict[ObjectType, StalePolicy]] = None,
+				 revalidation_timeout: float = 1.0):
 
 		self.cache = cache
 		self.block_manager = block_manager
 		self.index = index
+		# Objects recently reported by the API as missing or not shared
+		self.negative_cache = negative_cache
 
+		# Object types opted in to stale-while-revalidate
+		self.stale_policies = stale_policies or {}
+		for object_type, policy in self.stale_policies.items():
+			self.cache.set_stale_policy(object_type, policy.ttl, policy.grace)
+		# Seconds a read of a stale object waits for the fresh copy
+		self.revalidation_timeout = revalidation_timeout
+		# Running refetches of stale objects by (object type, UUID), shared by concurrent reads
+		self._revalidations: Dict[Tuple[str, str], asyncio.Task] = {}
+		# Fetches in flight by (object type, cache key), shared by concurrent misses of the same object
+		self._in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
 
-	async def get_or_fetch_page(self, 
-								page_id: CustomUUID, 
-								fetcher_func: Callable[[], Awaitable[Dict[str, Any]]]) -> Optional[BlockDict]:
+
+	def _raise_if_unavailable(self, uuid: CustomUUID, object_type: ObjectType) -> None:
 		"""
-		Args:
-			page_id: UUID of the page
-			fetcher_func: Async function that fetches raw data from API
-			
+		Raise the recorded HTTPError if the object was recently reported as missing or not shared, so that it isn't mistaken for a cache miss.
+		"""
+		if self.negative_cache is None:
+			return
+		error = self.negative_cache.get(uuid, object_type)
+		if error is not None:
+			log.debug(f"{object_type.value} {uuid} is unavailable ({error.status_code}), not fetching")
+			raise error
+
+
+	async def _get_cached(self,
+						  uuid: CustomUUID,
+						  object_type: ObjectType,
+						  get_parsed: Callable[[CustomUUID], Optional[Any]],
+						  refetch: Optional[Callable[[], Awaitable[Any]]]) -> Tuple[Optional[BlockDict], bool]:
+		"""
+		Returns a BlockDict with cached content of the object, if any. Stale content of opted-in types is refetched,
+		and served flagged if the refetch doesn't finish in time. Without refetch, stale content is not served.
+		Second element is True if the object is cached, but can't be returned.
+		"""
+		is_stale = False
+		if object_type in self.stale_policies and refetch is not None:
+			unfiltered_data, is_stale = self.cache.get_parsed_allow_stale(uuid, object_type)
+			if is_stale and await self._revalidate(uuid, object_type, refetch):
+				fresh_data = get_parsed(uuid)
+				if fresh_data is not None:
+					unfiltered_data, is_stale = fresh_data, False
+		else:
+			# Parsed content is shared with other readers
+			unfiltered_data = get_parsed(uuid)
+		if unfiltered_data is None:
+			return None, False
+
+		# Get proper integer ID from Index
+		int_id = self.index.to_int(uuid)
+		if int_id is None:
+			log.error(f"Could not convert {object_type.value} UUID {uuid} to integer ID")
+			return None, True
+
+		block_dict = BlockDict()
+		block_dict.add_block(int_id, unfiltered_data)
+		if is_stale:
+			block_dict.mark_stale(int_id)
+		return block_dict, False
+
+
+	async def _revalidate(self, uuid: CustomUUID, object_type: ObjectType, refetch: Callable[[], Awaitable[Any]]) -> bool:
+		"""
+		Refetch a stale object, waiting at most revalidation_timeout seconds. Returns True if the cached copy is fresh again.
+		Tool calls run in event loops closed right after them, so a refetch is never left running past the wait.
+		"""
+		key = (object_type.value, str(uuid))
+		loop = asyncio.get_running_loop()
+		task = self._revalidations.get(key)
+		# Task of a closed loop will never finish
+		if task is None or task.get_loop() is not loop:
+			task = loop.create_task(self._refetch_stale(uuid, object_type, refetch))
+			self._revalidations[key] = task
+			task.add_done_callback(lambda done: self._forget_revalidation(key, done))
+
+		done, _ = await asyncio.wait({task}, timeout=self.revalidation_timeout)
+		if not done:
+			log.debug(f"Serving stale {object_type.value} {uuid}, refetch took over {self.revalidation_timeout}s")
+			task.cancel()
+			# Let the cancellation finish before the loop may be closed
+			await asyncio.wait({task})
+			return False
+		return not task.cancelled() and task.result()
+
+
+	async def _refetch_stale(self, uuid: CustomUUID, object_type: ObjectType, refetch: Callable[[], Awaitable[Any]]) -> bool:
+		try:
+			await refetch()
+			log.debug(f"Revalidated stale {object_type.value} {uuid}")
+			return True
+		except Exception as e:
+			# Stale copy is served until its grace period is over
+			log.error(f"Error revalidating {object_type.value} {uuid}: {e}")
+			return False
+
+
+	def _forget_revalidation(self, key: Tuple[str, str], task: asyncio.Task):
+		if self._revalidations.get(key) is task:
+			del self._revalidations[key]
+
+
+	async def _single_flight(self, key: Tuple[str, str], fetch_func: Callable[[], Awaitable[Any]]) -> Any:
+		"""
+		Run fetch_func, or wait for the one already running under the same key, so that concurrent misses
+		of an object spend a single API request.
+		"""
+		loop = asyncio.get_running_loop()
+		task = self._in_flight.get(key)
+		# Tasks can't be awaited from another event loop
+		if task is None or task.get_loop() is not loop:
+			task = loop.create_task(fetch_func())
+			self._in_flight[key] = task
+			task.add_done_callback(lambda done: self._forget_in_flight(key, done))
+		else:
+			log.debug(f"Joining fetch of {key[0]} {key[1]} in flight")
+
+		# Cancelled caller doesn't cancel the fetch for the others
+		result = await asyncio.shield(task)
+		if isinstance(result, BlockDict):
+			# Every caller gets its own BlockDict, block contents are shared anyway
+			return BlockDict(blocks=dict(result.blocks), stale_ids=set(result.stale_ids))
+		return result
+
+
+	def _forget_in_flight(self, key: Tuple[str, str], task: asyncio.Task):
+		if self._in_flight.get(key) is task:
+			del self._in_flight[key]
+		# Mark the error as retrieved, in case all callers were cancelled
+		if not task.cancelled():
+			task.exception()
+
+
+	async def _fetch_and_store_object(self, object_type: ObjectType, fetcher_func: Callable[[], Awaitable[Dict[str, Any]]]) -> int:
+		"""
+		Fetch a page or database and store it, invalidating the cached copy if it was edited since.
+
 		Returns:
-			BlockDict with page data or None if not found
+			Integer ID of the object
 		"""
-		# Check cache first
-		cached_content = self.cache.get_page(page_id)
-		if cached_content is not None:
-			# Parse and wrap cached content in BlockDict
-			unfiltered_data = self.block_manager.parse_cache_content(cached_content)
-			# Get proper integer ID from Index
-			int_id = self.index.to_int(page_id)
-			if int_id is None:
-				log.error(f"Could not convert page UUID {page_id} to integer ID")
-				return None
-			block_dict = BlockDict()
-			block_dict.add_block(int_id, unfiltered_data)
+		raw_data = await fetcher_func()
+
+		# Process invalidation if we have last_edited_time
+		if "last_edited_time" in raw_data and "id" in raw_data:
+			response_uuid = CustomUUID.from_string(raw_data["id"])
+			last_edited_time = raw_data["last_edited_time"]
+			self.invalidate_if_expired(response_uuid, last_edited_time, object_type)
+
+		# Use BlockManager to process and store
+		return self.block_manager.process_and_store_block(raw_data, object_type)
+
+
+	async def _fetch_and_store_children(self, block_id: CustomUUID, fetcher_func: Callable[[], Awaitable[Dict[str, Any]]]) -> BlockDict:
+		raw_data = await fetcher_func()
+
+		# Process invalidation for child blocks if we have results
+		if "results" in raw_data:
+			for block_item in raw_data.get("results", []):
+				block_item_id_str = block_item.get("id")
+				block_item_last_edited = block_item.get("last_edited_time")
+				if block_item_id_str and block_item_last_edited:
+					block_item_uuid = CustomUUID.from_string(block_item_id_str)
+					self.cache.invalidate_block_if_expired(block_item_uuid, block_item_last_edited)
+
+		# Use BlockManager to process children response
+		return self.block_manager.process_children_response(
+			raw_data, block_id, ObjectType.BLOCK
+		)
+
+
+	async def _get_or_fetch_object(self,
+								   uuid: CustomUUID,
+								   object_type: ObjectType,
+								   get_parsed: Callable[[CustomUUID], Optional[Any]],
+								   fetcher_func: Callable[[], Awaitable[Dict[str, Any]]]) -> Optional[BlockDict]:
+		# Not shared with concurrent misses, so that a revalidation running out of time can be cancelled
+		refetch = lambda: self._fetch_and_store_object(object_type, fetcher_func)
+		block_dict, unusable = await self._get_cached(uuid, object_type, get_parsed, refetch)
+		if block_dict is not None or unusable:
 			return block_dict
-		
-		# Cache miss - fetch from API
+
+		# Cache miss - fetch from API, unless it has just failed with the same object
+		self._raise_if_unavailable(uuid, object_type)
+
 		try:
-			raw_data = await fetcher_func()
-			
-			# Process invalidation if we have last_edited_time
-			if "last_edited_time" in raw_data and "id" in raw_data:
-				response_uuid = CustomUUID.from_string(raw_data["id"])
-				last_edited_time = raw_data["last_edited_time"]
-				self.invalidate_if_expired(response_uuid, Utils.convert_date_to_timestamp(last_edited_time), ObjectType.PAGE)
-			
-			# Use BlockManager to process and store
-			main_int_id = self.block_manager.process_and_store_block(raw_data, ObjectType.PAGE)
-			
+			main_int_id = await self._single_flight((object_type.value, str(uuid)), refetch)
+
 			# Get the stored data and return
-			cached_content = self.cache.get_page(page_id)
-			if cached_content:
-				unfiltered_data = self.block_manager.parse_cache_content(cached_content)
+			unfiltered_data = get_parsed(uuid)
+			if unfiltered_data:
 				block_dict = BlockDict()
 				block_dict.add_block(main_int_id, unfiltered_data)
 				return block_dict
-			
+
 			return None
-			
+
 		except Exception as e:
-			log.error(f"Error fetching page {page_id}: {e}")
+			log.error(f"Error fetching {object_type.value} {uuid}: {e}")
 			return None
 
 
+	async def get_or_fetch_page(self, 
+								page_id: CustomUUID, 
+								fetcher_func: Callable[[], Awaitable[Dict[str, Any]]]) -> Optional[BlockDict]:
+		"""
+		Args:
+			page_id: UUID of the page
+			fetcher_func: Async function that fetches raw data from API
+			
+		Returns:
+			BlockDict with page data or None if not found
+
+		Raises:
+			HTTPError: The page was recently reported by the API as missing or not shared
+		"""
+		return await self._get_or_fetch_object(page_id, ObjectType.PAGE, self.cache.get_page_parsed, fetcher_func)
+
+
 	async def get_or_fetch_database(self, 
 									database_id: CustomUUID, 
 									fetcher_func: Callable[[], Awaitable[Dict[str, Any]]]) -> Optional[BlockDict]:
 		"""
-		TODO: Explain if it is needed to be generic?
-		
 		Args:
 			database_id: UUID of the database
 			fetcher_func: Async function that fetches raw data from API
 			
 		Returns:
 			BlockDict with database data or None if not found
+
+		Raises:
+			HTTPError: The database was recently reported by the API as missing or not shared
 		"""
-		# Check cache first
-		cached_content = self.cache.get_database(database_id)
-		if cached_content is not None:
-			# Parse and wrap cached content in BlockDict
-			unfiltered_data = self.block_manager.parse_cache_content(cached_content)
-			# Get proper integer ID from Index
-			int_id = self.index.to_int(database_id)
-			if int_id is None:
-				log.error(f"Could not convert database UUID {database_id} to integer ID")
-				return None
-			block_dict = BlockDict()
-			block_dict.add_block(int_id, unfiltered_data)
-			return block_dict
-		
-		# Cache miss - fetch from API
-		try:
-			raw_data = await fetcher_func()
-			
-			# Process invalidation if we have last_edited_time
-			if "last_edited_time" in raw_data and "id" in raw_data:
-				response_uuid = CustomUUID.from_string(raw_data["id"])
-				last_edited_time = raw_data["last_edited_time"]
-				self.invalidate_if_expired(response_uuid, Utils.convert_date_to_timestamp(last_edited_time), ObjectType.DATABASE)
-			
-			# Use BlockManager to process and store
-			main_int_id = self.block_manager.process_and_store_block(raw_data, ObjectType.DATABASE)
-			
-			# Get the stored data and return
-			cached_content = self.cache.get_database(database_id)
-			if cached_content:
-				unfiltered_data = self.block_manager.parse_cache_content(cached_content)
-				block_dict = BlockDict()
-				block_dict.add_block(main_int_id, unfiltered_data)
-				return block_dict
-			
-			return None
-			
-		except Exception as e:
-			log.error(f"Error fetching database {database_id}: {e}")
-			return None
+		return await self._get_or_fetch_object(database_id, ObjectType.DATABASE, self.cache.get_database_parsed, fetcher_func)
 
 
 	async def get_or_fetch_block(self, 
 								 block_id: CustomUUID, 
-								 fetcher_func: Callable[[], Awaitable[Dict[str, Any]]]) -> Optional[BlockDict]:
+								 fetcher_func: Callable[[], Awaitable[Dict[str, Any]]],
+								 block_fetcher_func: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None) -> Optional[BlockDict]:
 		"""
-		TODO: Explain if it is needed to be generic?
-		
 		Args:
 			block_id: UUID of the block
-			fetcher_func: Async function that fetches raw data from API
+			fetcher_func: Async function that fetches raw children data from API
+			block_fetcher_func: Optional async function that fetches the raw block itself, to revalidate a stale copy
 			
 		Returns:
 			BlockDict with block data or None if not found
+
+		Raises:
+			HTTPError: The block was recently reported by the API as missing or not shared
 		"""
-		# Check cache first
-		cached_content = self.cache.get_block(block_id)
-		if cached_content is not None:
-			# Parse and wrap cached content in BlockDict
-			unfiltered_data = self.block_manager.parse_cache_content(cached_content)
-			# Get proper integer ID from Index
-			int_id = self.index.to_int(block_id)
-			if int_id is None:
-				log.error(f"Could not convert block UUID {block_id} to integer ID")
-				return None
-			block_dict = BlockDict()
-			block_dict.add_block(int_id, unfiltered_data)
+		# Children don't refresh the block's own row, so only the block itself can revalidate it
+		revalidate = None
+		if block_fetcher_func is not None:
+			revalidate = lambda: self._fetch_and_store_object(ObjectType.BLOCK, block_fetcher_func)
+		block_dict, unusable = await self._get_cached(block_id, ObjectType.BLOCK, self.cache.get_block_parsed, revalidate)
+		if block_dict is not None or unusable:
 			return block_dict
-		
-		# Cache miss - fetch from API
+
+		# Cache miss - fetch from API, unless it has just failed with the same object
+		self._raise_if_unavailable(block_id, ObjectType.BLOCK)
+
 		try:
-			raw_data = await fetcher_func()
-			
-			# Process invalidation for child blocks if we have results
-			if "results" in raw_data:
-				for block_item in raw_data.get("results", []):
-					block_item_id_str = block_item.get("id")
-					block_item_last_edited = block_item.get("last_edited_time")
-					if block_item_id_str and block_item_last_edited:
-						block_item_uuid = CustomUUID.from_string(block_item_id_str)
-						self.cache.invalidate_block_if_expired(block_item_uuid, block_item_last_edited)
-			
-			# Use BlockManager to process children response
-			children_block_dict = self.block_manager.process_children_response(
-				raw_data, block_id, ObjectType.BLOCK
-			)
-			
-			return children_block_dict
-			
+			return await self._single_flight((ObjectType.BLOCK.value, str(block_id)), lambda: self._fetch_and_store_children(block_id, fetcher_func))
 		except Exception as e:
 			log.error(f"Error fetching block {block_id}: {e}")
 			return None
 
 
+	async def fetch_block_children(self,
+								   block_id: CustomUUID,
+								   fetcher_func: Callable[[], Awaitable[Dict[str, Any]]],
+								   start_cursor: Optional[str] = None) -> Dict[str, Any]:
+		"""
+		Fetch a page of raw children of a block. Concurrent calls for the same block and cursor share one request,
+		so the returned dictionary must not be modified.
+
+		Args:
+			block_id: UUID of the parent block
+			fetcher_func: Async function that fetches raw children data from API
+			start_cursor: Optional pagination cursor
+
+		Returns:
+			Raw children response
+		"""
+		key = str(block_id) if start_cursor is None else f"{block_id}:{start_cursor}"
+		return await self._single_flight(("children", key), fetcher_func)
+
+
 	def get_cached_search_results(self, 
 								  query: str, 
 								  filter_str: Optional[str] = None, 
@@ -197,11 +355,9 @@ class CacheOrchestrator:
 		Returns:
 			BlockDict with search results or None if not cached
 		"""
-		cache_entry = self.cache.get_search_results(query, filter_str, start_cursor)
-		if cache_entry is not None:
-			# Parse JSON string back to dictionary (this is unfiltered data)
-			cache_data = self.block_manager.parse_cache_content(cache_entry)
-			
+		# Parsed, unfiltered data shared with other readers
+		cache_data = self.cache.get_search_results_parsed(query, filter_str, start_cursor)
+		if cache_data is not None:
 			# Wrap unfiltered search results in BlockDict
 			block_dict = BlockDict()
 			if isinstance(cache_data, dict) and "results" in cache_data:
@@ -215,7 +371,43 @@ class CacheOrchestrator:
 		return None
 
 
-	async def cache_search_results(self, 
+	def get_cached_title_matches(self,
+								 query: str,
+								 filter_str: Optional[str] = None,
+								 count: int = 10) -> Optional[BlockDict]:
+		"""
+		Search titles of known pages and databases locally, without an API call.
+
+		Args:
+			query: Search query string
+			filter_str: Optional object type, "page" or "database", as in the search filter
+			count: Maximum number of results
+
+		Returns:
+			BlockDict of cached matches, best first, or None if no match is cached
+		"""
+		object_types = [ObjectType.PAGE, ObjectType.DATABASE]
+		if filter_str is not None:
+			object_types = [object_type for object_type in object_types if object_type.value == filter_str]
+
+		block_dict = BlockDict()
+		for int_id in self.index.search_titles(query, count):
+			uuid = self.index.get_uuid(int_id)
+			if uuid is None:
+				continue
+			for object_type in object_types:
+				content = self.cache.get_page_parsed(uuid) if object_type == ObjectType.PAGE else self.cache.get_database_parsed(uuid)
+				if content is not None:
+					block_dict.add_block(int_id, content)
+					break
+
+		if len(block_dict) == 0:
+			return None
+		log.debug(f"Found {len(block_dict)} cached title matches for '{query}'")
+		return block_dict
+
+
+	async def cache_search_results(self,
 								   query: str, 
 								   results: Dict[str, Any], 
 								   filter_str: Optional[str] = None, 
@@ -256,6 +448,33 @@ class CacheOrchestrator:
 		return block_dict
 
 
+	async def fetch_search_results(self,
+								   query: str,
+								   fetcher_func: Callable[[], Awaitable[Dict[str, Any]]],
+								   filter_str: Optional[str] = None,
+								   start_cursor: Optional[CustomUUID] = None,
+								   ttl: Optional[int] = None) -> BlockDict:
+		"""
+		Fetch search results and cache them. Concurrent calls for the same search share one request.
+
+		Args:
+			query: Search query string
+			fetcher_func: Async function that fetches raw search results from API
+			filter_str: Optional filter string
+			start_cursor: Optional pagination cursor
+			ttl: Time to live for cache entry
+
+		Returns:
+			BlockDict with processed search results
+		"""
+		async def fetch_and_cache():
+			results = await fetcher_func()
+			return await self.cache_search_results(query, results, filter_str, start_cursor, ttl)
+
+		cache_key = self.cache.create_search_results_cache_key(query, filter_str, start_cursor)
+		return await self._single_flight((ObjectType.SEARCH_RESULTS.value, cache_key), fetch_and_cache)
+
+
 	def get_cached_database_query_results(self, 
 										  database_id: CustomUUID, 
 										  filter_str: Optional[str] = None, 
@@ -269,11 +488,9 @@ class CacheOrchestrator:
 		Returns:
 			BlockDict with query results or None if not cached
 		"""
-		cache_entry = self.cache.get_database_query_results(database_id, filter_str, start_cursor)
-		if cache_entry is not None:
-			# Parse JSON string back to dictionary (this is unfiltered data)
-			cache_data = self.block_manager.parse_cache_content(cache_entry)
-			
+		# Parsed, unfiltered data shared with other readers
+		cache_data = self.cache.get_database_query_results_parsed(database_id, filter_str, start_cursor)
+		if cache_data is not None:
 			# Wrap unfiltered database query results in BlockDict
 			block_dict = BlockDict()
 			if isinstance(cache_data, dict) and "results" in cache_data:
@@ -318,6 +535,31 @@ class CacheOrchestrator:
 		return block_dict
 
 
+	async def fetch_database_query_results(self,
+										   database_id: CustomUUID,
+										   fetcher_func: Callable[[], Awaitable[Dict[str, Any]]],
+										   filter_str: Optional[str] = None,
+										   start_cursor: Optional[CustomUUID] = None) -> BlockDict:
+		"""
+		Fetch database query results and cache them. Concurrent calls for the same query share one request.
+
+		Args:
+			database_id: UUID of the database
+			fetcher_func: Async function that fetches raw query results from API
+			filter_str: Optional filter string
+			start_cursor: Optional pagination cursor
+
+		Returns:
+			BlockDict with processed query results
+		"""
+		async def fetch_and_cache():
+			results = await fetcher_func()
+			return await self.cache_database_query_results(database_id, results, filter_str, start_cursor)
+
+		cache_key = self.cache.create_database_query_results_cache_key(database_id, filter_str, start_cursor)
+		return await self._single_flight((ObjectType.DATABASE_QUERY_RESULTS.value, cache_key), fetch_and_cache)
+
+
 	def invalidate_if_expired(self, 
 							  uuid: CustomUUID, 
 							  last_edited_time: str, 
@@ -379,9 +621,45 @@ class CacheOrchestrator:
 		return self.cache.get_children_fetched_for_block(cache_key)
 
 
+	def get_cached_subtree(self, root_uuid: CustomUUID) -> Optional[SubtreeSnapshot]:
+		"""
+		Args:
+			root_uuid: UUID of the root block
+			
+		Returns:
+			Snapshot of the block with all its descendants, or None if it isn't cached or anything under the block changed since
+		"""
+		parsed = self.cache.get_subtree_parsed(root_uuid)
+		if parsed is None:
+			return None
+		return SubtreeSnapshot.from_dict(parsed)
+
+
+	def cache_subtree(self, snapshot: SubtreeSnapshot, ttl: Optional[int] = None) -> None:
+		"""
+		Args:
+			snapshot: Complete snapshot assembled by a recursive traversal
+			ttl: Time to live for cache entry
+		"""
+		self.cache.add_subtree(snapshot.root, snapshot.to_json(), ttl)
+
+
+	def get_cached_blocks_content(self, uuids: list[CustomUUID]) -> Dict[CustomUUID, dict]:
+		"""
+		Batched get_cached_block_content(). Returned dictionaries are shared with other readers and must not be modified.
+		
+		Args:
+			uuids: UUIDs of the blocks
+			
+		Returns:
+			Parsed block content by UUID, blocks that are not cached are left out
+		"""
+		return self.cache.get_blocks_parsed(uuids)
+
+
 	def get_cached_block_content(self, uuid: CustomUUID) -> Optional[dict]:
 		"""
-		Get cached block content and parse it.
+		Get parsed cached block content. Returned dictionary is shared with other readers and must not be modified.
 		
 		Args:
 			uuid: UUID of the block
@@ -389,7 +667,7 @@ class CacheOrchestrator:
 		Returns:
 			Parsed block content dictionary or None if not cached
 		"""
-		cached_content = self.cache.get_block(uuid)
-		if cached_content:
-			return self.block_manager.parse_cache_content(cached_content)
+		parsed_content = self.cache.get_block_parsed(uuid)
+		if parsed_content:
+			return parsed_content
 		return None 
\ No newline at end of file
@@ -0,0 +1,104 @@
+import threading
+import time
+import uuid
+from typing import List, Optional, Tuple
+
+from .sharedMemoryDatabase import SharedMemoryDatabase
+
+
+class ChangeFeed:
+	"""
+	Tells processes sharing one database file which objects were changed by the others, so that they can drop in-memory copies.
+
+	TEMP triggers of the writer connection append keys of changed objects, and parents of added or removed relationships,
+	to cache_changes table in the shared file, tagged with a random ID of the writer. poll() returns changes of other
+	writers committed since the previous poll. Rows older than RETENTION_S are pruned: a reader that didn't poll for that long
+	can't tell what changed, and poll() returns None instead.
+	"""
+
+	RETENTION_S = 10 * 60
+	# Reads may miss changes of other processes by at most this long
+	POLL_INTERVAL_S = 0.1
+
+	# Same columns as parsed content eviction, updates of access statistics don't change content
+	TRIGGERS = [
+		("block_cache_insert", "INSERT ON main.block_cache", "NEW.cache_key, NEW.object_type"),
+		("block_cache_update", "UPDATE OF cache_key, object_type, content, timestamp, ttl ON main.block_cache", "OLD.cache_key, OLD.object_type"),
+		("block_cache_delete", "DELETE ON main.block_cache", "OLD.cache_key, OLD.object_type"),
+		# Relationships are reported as a change of the parent, without object type
+		("relationship_insert", "INSERT ON main.block_relationships", "(SELECT cache_key FROM cache_keys WHERE key_id = NEW.parent_id), NULL"),
+		("relationship_delete", "DELETE ON main.block_relationships", "(SELECT cache_key FROM cache_keys WHERE key_id = OLD.parent_id), NULL"),
+	]
+
+	def __init__(self, database: SharedMemoryDatabase):
+		self.database = database
+		self.origin = uuid.uuid4().hex
+		self.poll_interval = self.POLL_INTERVAL_S
+		self._last_poll = 0.0
+		self._poll_lock = threading.Lock()
+
+		conn = database.writer
+		with database.lock:
+			conn.execute('''
+				CREATE TABLE IF NOT EXISTS cache_changes (
+					seq INTEGER PRIMARY KEY AUTOINCREMENT,
+					origin TEXT NOT NULL,
+					cache_key TEXT NOT NULL,
+					object_type TEXT,
+					created_ms INTEGER NOT NULL DEFAULT (CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER))
+				)
+			''')
+			conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_changes_created_ms ON cache_changes (created_ms)')
+			for name, event, values in self.TRIGGERS:
+				conn.execute(f'''
+					CREATE TEMP TRIGGER IF NOT EXISTS change_feed_{name}
+					AFTER {event}
+					BEGIN INSERT INTO cache_changes (origin, cache_key, object_type) VALUES ('{self.origin}', {values}); END
+				''')
+			conn.commit()
+			# Changes made before this process started don't concern its empty in-memory state
+			self.last_seq = self._allocated_seq()
+
+
+	def _allocated_seq(self) -> int:
+		# Sequence of AUTOINCREMENT has no gaps: rolled back inserts roll it back as well
+		rows = self.database.read("SELECT seq FROM sqlite_sequence WHERE name = 'cache_changes'")
+		return rows[0][0] if rows else 0
+
+
+	def poll(self) -> Optional[List[Tuple[str, Optional[str]]]]:
+		"""
+		Returns (cache_key, object_type) of objects changed by other writers since the last poll, object type is None
+		for a changed relationship of the parent. Returns None if some changes were pruned before they were read.
+		Polls at most once per poll_interval, a concurrent or too early call returns no changes.
+		"""
+		now = time.monotonic()
+		if now - self._last_poll < self.poll_interval or not self._poll_lock.acquire(blocking=False):
+			return []
+
+		try:
+			self._last_poll = now
+			with self.database.lock.read():
+				allocated_seq = self._allocated_seq()
+				if allocated_seq == self.last_seq:
+					return []
+				rows = self.database.read('''
+					SELECT seq, origin, cache_key, object_type FROM cache_changes
+					WHERE seq > ? AND seq <= ?
+				''', (self.last_seq, allocated_seq))
+
+			complete = len(rows) == allocated_seq - self.last_seq
+			self.last_seq = allocated_seq
+			if not complete:
+				return None
+			return [(cache_key, object_type) for _, origin, cache_key, object_type in rows if origin != self.origin]
+		finally:
+			self._poll_lock.release()
+
+
+	def prune(self) -> int:
+		"""
+		Delete changes older than RETENTION_S. Caller holds the write lock and commits.
+		"""
+		cutoff_ms = int((time.time() - self.RETENTION_S) * 1000)
+		return self.database.writer.execute('DELETE FROM cache_changes WHERE created_ms < ?', (cutoff_ms,)).rowcount
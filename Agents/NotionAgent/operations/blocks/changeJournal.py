@@ -0,0 +1,170 @@
+import sqlite3
+from enum import Enum
+from typing import Dict, List
+
+from tz_common.logs import log
+
+
+class PersistenceMode(Enum):
+	SNAPSHOT = "snapshot"  # Copy the whole in-memory database to disk on every save
+	INCREMENTAL = "incremental"  # Write only rows changed since the last save
+	WAL = "wal"  # Work on the database file directly in WAL mode, nothing is loaded at start or copied on save
+
+
+class ChangeJournal:
+	"""
+	Tracks keys of changed rows of an in-memory SQLite database, so that only deltas are written to disk.
+	Keys are recorded by TEMP triggers into a TEMP table, which are never copied by backup().
+	A full snapshot is still required for the first save, after schema changes and for compaction.
+	"""
+
+	# Once this many changes are pending, a snapshot is cheaper than replaying them
+	MAX_PENDING_CHANGES = 100000
+
+	def __init__(self, conn: sqlite3.Connection, tables: List[str]):
+		self.conn = conn
+		self.tables = tables
+		self.key_columns: Dict[str, List[str]] = {}
+		self.snapshot_required = True
+		self.install()
+
+
+	def install(self):
+		"""Create the journal table and triggers. Safe to call repeatedly."""
+		cursor = self.conn.cursor()
+
+		for table in self.tables:
+			columns = cursor.execute(f'PRAGMA main.table_info({table})').fetchall()
+			# Column 5 is the 1-based position in the primary key, 0 if not a part of it
+			key_columns = [column[1] for column in sorted(columns, key=lambda c: c[5]) if column[5] > 0]
+			if not key_columns:
+				key_columns = self._unique_columns(cursor, table)
+			if not key_columns:
+				raise ValueError(f"Table {table} has no primary key or unique constraint and can't be journaled")
+			self.key_columns[table] = key_columns
+
+		key_count = max(len(columns) for columns in self.key_columns.values())
+		key_definitions = ", ".join(f"k{i}" for i in range(key_count))
+		cursor.execute(f'''
+			CREATE TEMP TABLE IF NOT EXISTS change_journal (
+				seq INTEGER PRIMARY KEY,
+				table_name TEXT NOT NULL,
+				{key_definitions}
+			)
+		''')
+
+		for table, key_columns in self.key_columns.items():
+			key_names = ", ".join(f"k{i}" for i in range(len(key_columns)))
+			for event, rows in [("INSERT", ["NEW"]), ("UPDATE", ["OLD", "NEW"]), ("DELETE", ["OLD"])]:
+				statements = "".join(
+					f"INSERT INTO change_journal (table_name, {key_names}) VALUES ('{table}', {', '.join(f'{row}.{column}' for column in key_columns)}); "
+					for row in rows
+				)
+				cursor.execute(f'''
+					CREATE TEMP TRIGGER IF NOT EXISTS journal_{table}_{event.lower()}
+					AFTER {event} ON main.{table}
+					BEGIN {statements}END
+				''')
+
+		self.conn.commit()
+
+
+	@staticmethod
+	def _unique_columns(cursor: sqlite3.Cursor, table: str) -> List[str]:
+		# Index list columns: seq, name, unique, origin, partial
+		for index in cursor.execute(f'PRAGMA main.index_list({table})').fetchall():
+			if index[2] and not index[4]:
+				return [column[2] for column in cursor.execute(f'PRAGMA main.index_info("{index[1]}")').fetchall()]
+		return []
+
+
+	def require_snapshot(self):
+		self.snapshot_required = True
+
+
+	def mark_synced(self):
+		"""Disk file is now identical to the in-memory database."""
+		self.conn.execute('DELETE FROM change_journal')
+		self.conn.commit()
+		self.snapshot_required = False
+
+
+	def last_seq(self) -> int:
+		return self.conn.execute('SELECT COALESCE(MAX(seq), 0) FROM change_journal').fetchone()[0]
+
+
+	def discard_after(self, seq: int):
+		"""
+		Forget changes recorded after seq, ie. rows copied from the file that are already on disk.
+		Runs in the caller's transaction.
+		"""
+		self.conn.execute('DELETE FROM change_journal WHERE seq > ?', (seq,))
+
+
+	def pending_changes(self) -> int:
+		return self.conn.execute('SELECT COUNT(*) FROM change_journal').fetchone()[0]
+
+
+	def flush(self, db_path: str) -> bool:
+		"""
+		Apply journaled changes to the database file in one transaction.
+		Must be called with the owner's lock held and no transaction open on the in-memory connection.
+
+		Returns:
+			True if the file is up to date, False if a full snapshot is needed instead
+		"""
+		if self.snapshot_required:
+			return False
+
+		cursor = self.conn.cursor()
+		last_seq, change_count = cursor.execute('SELECT MAX(seq), COUNT(*) FROM change_journal').fetchone()
+		if last_seq is None:
+			return True
+		if change_count > self.MAX_PENDING_CHANGES:
+			return False
+
+		disk_conn = sqlite3.connect(db_path)
+		try:
+			with disk_conn:
+				for table, key_columns in self.key_columns.items():
+					self._flush_table(cursor, disk_conn, table, key_columns, last_seq)
+
+			# Deleted rows leave free pages behind, compact once they take half of the file
+			free_pages = disk_conn.execute('PRAGMA freelist_count').fetchone()[0]
+			total_pages = disk_conn.execute('PRAGMA page_count').fetchone()[0]
+			if free_pages * 2 > total_pages:
+				self.snapshot_required = True
+		except sqlite3.Error as e:
+			log.debug(f"Incremental save to {db_path} failed, falling back to snapshot: {e}")
+			return False
+		finally:
+			disk_conn.close()
+
+		cursor.execute('DELETE FROM change_journal WHERE seq <= ?', (last_seq,))
+		self.conn.commit()
+		return True
+
+
+	def _flush_table(self, cursor: sqlite3.Cursor, disk_conn: sqlite3.Connection, table: str, key_columns: List[str], last_seq: int):
+		key_names = ", ".join(f"k{i}" for i in range(len(key_columns)))
+		join_condition = " AND ".join(f"t.{column} IS j.k{i}" for i, column in enumerate(key_columns))
+		changed_keys = f"SELECT DISTINCT {key_names} FROM change_journal WHERE table_name = ? AND seq <= ?"
+
+		deleted = cursor.execute(f'''
+			SELECT {key_names} FROM ({changed_keys}) j
+			WHERE NOT EXISTS (SELECT 1 FROM main.{table} t WHERE {join_condition})
+		''', (table, last_seq)).fetchall()
+
+		if deleted:
+			where = " AND ".join(f"{column} = ?" for column in key_columns)
+			disk_conn.executemany(f'DELETE FROM {table} WHERE {where}', deleted)
+
+		upserted = cursor.execute(f'''
+			SELECT t.* FROM main.{table} t
+			JOIN ({changed_keys}) j ON {join_condition}
+		''', (table, last_seq)).fetchall()
+
+		if upserted:
+			columns = [description[0] for description in cursor.description]
+			placeholders = ", ".join("?" for _ in columns)
+			disk_conn.executemany(f'INSERT OR REPLACE INTO {table} ({", ".join(columns)}) VALUES ({placeholders})', upserted)
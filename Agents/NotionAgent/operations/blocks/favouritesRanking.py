@@ -0,0 +1,84 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class FavouritesRanking:
+	"""
+	Favourite pages kept ordered by visit count, so that the top favourites are a slice of a list.
+
+	Visits only ever increase a count, so a visited favourite moves towards the front by swapping with its
+	neighbours, which are few. Renames are applied in place, any other change of favourites marks the ranking stale and
+	the owner loads it again on the next read. Favourites not in index_data yet are not ranked, as they have
+	no int ID, and are remembered so that indexing them can mark the ranking stale.
+	"""
+
+	def __init__(self):
+		# int IDs, most visited first
+		self.ranked: List[int] = []
+		self.positions: Dict[int, int] = {}
+		self.visits: Dict[int, int] = {}
+		# int ID -> (uuid, name)
+		self.details: Dict[int, Tuple[str, str]] = {}
+		self.unindexed: Set[str] = set()
+		self.stale = True
+		self.lock = threading.Lock()
+
+
+	def load(self, rows: Iterable[Tuple[int, str, str, int]], unindexed: Iterable[str]):
+		"""
+		Replace the ranking with (int_id, uuid, name, visit_count) rows of favourites.
+		"""
+		rows = sorted(rows, key=lambda row: row[3], reverse=True)
+		with self.lock:
+			self.ranked = [int_id for int_id, _, _, _ in rows]
+			self.positions = {int_id: position for position, int_id in enumerate(self.ranked)}
+			self.visits = {int_id: visit_count for int_id, _, _, visit_count in rows}
+			self.details = {int_id: (uuid_str, name) for int_id, uuid_str, name, _ in rows}
+			self.unindexed = set(unindexed)
+			self.stale = False
+
+
+	def invalidate(self):
+		with self.lock:
+			self.stale = True
+
+
+	def indexed(self, uuid_str: str):
+		"""
+		Called for every UUID added to index_data.
+		"""
+		if uuid_str in self.unindexed:
+			self.invalidate()
+
+
+	def rename(self, int_id: int, name: str):
+		with self.lock:
+			details = self.details.get(int_id)
+			if details is not None:
+				self.details[int_id] = (details[0], name)
+
+
+	def visit(self, int_id: int, count: int = 1):
+		with self.lock:
+			position = self.positions.get(int_id)
+			if position is None:
+				return
+			visit_count = self.visits[int_id] + count
+			self.visits[int_id] = visit_count
+			while position > 0 and self.visits[self.ranked[position - 1]] < visit_count:
+				previous = self.ranked[position - 1]
+				self.ranked[position] = previous
+				self.positions[previous] = position
+				position -= 1
+			self.ranked[position] = int_id
+			self.positions[int_id] = position
+
+
+	def top(self, count: int) -> Optional[List[Tuple[int, str, str]]]:
+		"""
+		Returns (int_id, uuid, name) of the most visited favourites, or None if the ranking has to be loaded first.
+		"""
+		with self.lock:
+			if self.stale:
+				return None
+			return [(int_id, *self.details[int_id]) for int_id in self.ranked[:count]]
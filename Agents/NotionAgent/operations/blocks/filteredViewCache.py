@@ -0,0 +1,105 @@
+import copy
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Set, Tuple
+
+from .blockHolder import BlockHolder, FilteringOptions
+
+
+class FilteredView(NamedTuple):
+	# Shared with other callers, must not be modified
+	content: Any
+	# Compact JSON, as produced by JsonConverter.remove_spaces()
+	serialized: str
+
+
+class FilteredViewCache:
+	"""
+	Filtered and serialized copies of cached content, per filter profile, so that repeated reads skip filtering.
+
+	BlockCache keeps storing unfiltered content only. Views are derived in memory from the parsed objects that
+	ParsedCache shares between readers, and are keyed by identity of these objects: new content of an object
+	is parsed into a new one, so a view never outlives the content it was made from.
+	Views are also dropped as soon as ParsedCache drops their object, see discard().
+
+	Every view keeps its source object alive, whether ParsedCache holds it or not, so views are limited both by
+	the size of serialized views and by their count, which bounds the number of sources kept.
+	"""
+
+	def __init__(self, block_holder: BlockHolder, max_size: int = 8 * 1024 * 1024, max_entries: int = 2000):
+		self.block_holder = block_holder
+		self.max_size = max_size
+		self.max_entries = max_entries
+		self.size = 0
+		# (id of source object, filter profile) -> (source object, view). Source is referenced, so that its id can't be reused.
+		self.entries: OrderedDict[Tuple[int, Tuple[str, ...]], Tuple[Any, FilteredView]] = OrderedDict()
+		# id of source object -> keys of its views, so that discard() doesn't scan all views
+		self.keys_by_source: Dict[int, Set[Tuple[int, Tuple[str, ...]]]] = {}
+		self.lock = threading.Lock()
+
+
+	@staticmethod
+	def _profile(filter_options: List[FilteringOptions]) -> Tuple[str, ...]:
+		return tuple(sorted(option.name for option in filter_options))
+
+
+	def get(self, content: Any, filter_options: List[FilteringOptions]) -> FilteredView:
+		"""
+		Returns filtered view of unfiltered content, filtering it on the first request only.
+		"""
+		key = (id(content), self._profile(filter_options))
+		with self.lock:
+			entry = self.entries.get(key)
+			if entry is not None and entry[0] is content:
+				self.entries.move_to_end(key)
+				return entry[1]
+
+		# Filters modify nested objects in place, and cached content is shared, so filter a deep copy
+		filtered_content = self.block_holder.apply_filters(copy.deepcopy(content), filter_options)
+		view = FilteredView(filtered_content, json.dumps(filtered_content, separators=(',', ':')))
+
+		with self.lock:
+			self._remove(key)
+			self.entries[key] = (content, view)
+			self.keys_by_source.setdefault(key[0], set()).add(key)
+			self.size += len(view.serialized)
+			while (self.size > self.max_size or len(self.entries) > self.max_entries) and self.entries:
+				self._remove(next(iter(self.entries)))
+		return view
+
+
+	def discard(self, content: Any):
+		"""
+		Drop all views of the content. Results of search and query responses are viewed one by one, so their views are dropped as well.
+		"""
+		sources = [content]
+		if isinstance(content, dict) and isinstance(content.get("results"), list):
+			sources += content["results"]
+		with self.lock:
+			for source in sources:
+				for key in list(self.keys_by_source.get(id(source), ())):
+					self._remove(key)
+
+
+	def clear(self):
+		with self.lock:
+			self.entries.clear()
+			self.keys_by_source.clear()
+			self.size = 0
+
+
+	def __len__(self) -> int:
+		return len(self.entries)
+
+
+	def _remove(self, key: Tuple[int, Tuple[str, ...]]):
+		entry = self.entries.pop(key, None)
+		if entry is None:
+			return
+		self.size -= len(entry[1].serialized)
+		keys = self.keys_by_source.get(key[0])
+		if keys is not None:
+			keys.discard(key)
+			if not keys:
+				del self.keys_by_source[key[0]]
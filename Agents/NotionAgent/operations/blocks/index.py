@@ -1,12 +1,19 @@
 import re
 import sqlite3
-import threading
 from typing import List, Tuple, Union, Dict, Optional
 from urllib.parse import urlparse
 
 from tz_common.logs import log
 from tz_common.timed_storage import TimedStorage
 from tz_common import CustomUUID
+
+from .changeJournal import ChangeJournal, PersistenceMode
+from .favouritesRanking import FavouritesRanking
+from .schemaMigrations import apply_migrations
+from .sharedMemoryDatabase import SharedMemoryDatabase
+from .uuidMap import UuidMap
+from .visitCounter import VisitCounter
+from .walDatabase import WalDatabase
 """
 TODO: Split class responsibilities:
 - Database management
@@ -19,26 +26,94 @@ class Index(TimedStorage):
 
 	# TODO: Separate test for loading from disk and running on start
 
+	# Append-only list of schema upgrades applied on top of _create_tables(), see schemaMigrations
+	MIGRATIONS = [
+		# 1: Index for favourites and most popular pages ordered by visits
+		[
+			'CREATE INDEX IF NOT EXISTS idx_index_data_visit_count ON index_data (visit_count)',
+		],
+		# 2: Full-text search over names, with trigrams so that any part of a word matches. Rowid is int_id.
+		[
+			"CREATE VIRTUAL TABLE title_search USING fts5(name, tokenize = 'trigram')",
+			"INSERT INTO title_search (rowid, name) SELECT int_id, name FROM index_data WHERE name != ''",
+			# Incremental saves replace rows without firing the delete trigger, so inserts drop the old entry themselves
+			'''CREATE TRIGGER title_search_insert AFTER INSERT ON index_data BEGIN
+				DELETE FROM title_search WHERE rowid = NEW.int_id;
+				INSERT INTO title_search (rowid, name) SELECT NEW.int_id, NEW.name WHERE NEW.name != '';
+			END''',
+			'''CREATE TRIGGER title_search_update AFTER UPDATE OF name ON index_data BEGIN
+				DELETE FROM title_search WHERE rowid = OLD.int_id;
+				INSERT INTO title_search (rowid, name) SELECT NEW.int_id, NEW.name WHERE NEW.name != '';
+			END''',
+			'''CREATE TRIGGER title_search_delete AFTER DELETE ON index_data BEGIN
+				DELETE FROM title_search WHERE rowid = OLD.int_id;
+			END''',
+		],
+		# 3: Titles of pages and databases from Notion, kept apart from names given by the user, and searched along with them
+		[
+			'ALTER TABLE index_data ADD COLUMN title TEXT',
+			'DROP TRIGGER title_search_insert',
+			'DROP TRIGGER title_search_update',
+			'DROP TRIGGER title_search_delete',
+			'DROP TABLE title_search',
+			"CREATE VIRTUAL TABLE title_search USING fts5(name, title, tokenize = 'trigram')",
+			"INSERT INTO title_search (rowid, name, title) SELECT int_id, name, title FROM index_data WHERE name != ''",
+			'''CREATE TRIGGER title_search_insert AFTER INSERT ON index_data BEGIN
+				DELETE FROM title_search WHERE rowid = NEW.int_id;
+				INSERT INTO title_search (rowid, name, title) SELECT NEW.int_id, NEW.name, NEW.title
+				WHERE COALESCE(NEW.name, '') != '' OR COALESCE(NEW.title, '') != '';
+			END''',
+			'''CREATE TRIGGER title_search_update AFTER UPDATE OF name, title ON index_data BEGIN
+				DELETE FROM title_search WHERE rowid = OLD.int_id;
+				INSERT INTO title_search (rowid, name, title) SELECT NEW.int_id, NEW.name, NEW.title
+				WHERE COALESCE(NEW.name, '') != '' OR COALESCE(NEW.title, '') != '';
+			END''',
+			'''CREATE TRIGGER title_search_delete AFTER DELETE ON index_data BEGIN
+				DELETE FROM title_search WHERE rowid = OLD.int_id;
+			END''',
+		],
+	]
+
+	# Keys per IN (...) query, well under SQLite's limit of bound parameters
+	MAX_QUERY_PARAMETERS = 500
+	# Pending visits are written once this many pages were visited, or on the next save
+	MAX_PENDING_VISITS = 100
+	# Trigram tokenizer can't match shorter terms
+	MIN_SEARCH_TERM_LENGTH = 3
+
 	def __init__(self,
 			  db_path: str = 'index.db',
 			  load_from_disk: bool = False,
-			  run_on_start: bool = False):
+			  run_on_start: bool = False,
+			  persistence_mode: PersistenceMode = PersistenceMode.INCREMENTAL):
 
 		self._is_closing = False
 		self.save_enabled = run_on_start
 		self.db_path = db_path
+		self.persistence_mode = persistence_mode
 
+		# Every commit is already on disk in WAL mode, but visits are buffered in memory and written by save()
 		super().__init__(period_ms=3000, run_on_start=run_on_start)
 
-		self.db_conn = sqlite3.connect(':memory:', check_same_thread=False)
+		# Reads run in parallel on per-thread connections, writes are serialized on self.db_conn
+		if persistence_mode == PersistenceMode.WAL:
+			self.database = WalDatabase(db_path)
+		else:
+			self.database = SharedMemoryDatabase("index")
+		self.db_conn = self.database.writer
 		self.cursor = self.db_conn.cursor()
-		self.db_lock = threading.RLock()
+		self.db_lock = self.database.lock
+		# Write-through copy of index_data pairs, filled once tables are loaded
+		self.uuid_map = UuidMap()
+		self.visit_counter = VisitCounter()
+		self.favourites = FavouritesRanking()
 
 		import atexit
 		atexit.register(self.cleanup)
 
-		if load_from_disk:
-			self.load_from_disk()
+		loaded = False
+		if load_from_disk and persistence_mode != PersistenceMode.WAL:
+			loaded = self.load_from_disk()
 			# Check if tables exist after loading
 			if not self._tables_exist():
 				self._create_tables()
@@ -46,7 +121,18 @@ class Index(TimedStorage):
 			# Only create tables if we're not loading from disk
 			self._create_tables()
 
-		if (run_on_start):
+		with self.db_lock:
+			migrated = apply_migrations(self.db_conn, self.MIGRATIONS, "Index")
+		self._load_uuid_map()
+
+		self.journal = None
+		if persistence_mode == PersistenceMode.INCREMENTAL:
+			self.journal = ChangeJournal(self.db_conn, ['index_data', 'favourites'])
+			# A file with an older schema has to be rewritten as a whole
+			if loaded and not migrated:
+				self.journal.mark_synced()
+
+		if run_on_start:
 			self.start_periodic_save()
 
 
@@ -86,6 +172,11 @@ class Index(TimedStorage):
 		return self.to_int(uuid)
 
 
+	def _load_uuid_map(self):
+		with self.db_lock.read():
+			self.uuid_map.load(self.database.read('SELECT int_id, uuid FROM index_data'))
+
+
 	def _tables_exist(self):
 		"""Check if required tables already exist"""
 		try:
@@ -135,36 +226,42 @@ class Index(TimedStorage):
 				log.flow("Created favourites table")
 
 
-	def get_favourites(self, count: int = 10) -> List[CustomUUID]:
+	def _ranked_favourites(self, count: int) -> List[Tuple[int, str, str]]:
+		ranked = self.favourites.top(count)
+		if ranked is None:
+			self._load_favourites()
+			ranked = self.favourites.top(count)
+		return ranked
+
+
+	def _load_favourites(self):
+		# Write lock keeps visits from being flushed between reading counts and adding the pending ones
 		with self.db_lock:
-			self.cursor.execute('''
-				SELECT f.uuid 
+			rows = self.cursor.execute('''
+				SELECT i.int_id, f.uuid, i.name, i.visit_count
 				FROM favourites f
-				JOIN index_data i ON f.uuid = i.uuid
-				ORDER BY i.visit_count DESC 
-				LIMIT ?
-			''', (count,))
-			results = self.cursor.fetchall()
+				LEFT JOIN index_data i ON f.uuid = i.uuid
+			''').fetchall()
+			pending = self.visit_counter.pending_snapshot()
+			self.favourites.load(
+				[row for row in rows if row[0] is not None],
+				[row[1] for row in rows if row[0] is None])
+			for int_id, visits in pending.items():
+				self.favourites.visit(int_id, visits)
+
 
-			ret = [CustomUUID(value=result[0]) for result in results]
-			log.common(f"Favourites:", [str(uuid) for uuid in ret])
-			return ret
+	def get_favourites(self, count: int = 10) -> List[CustomUUID]:
+		ret = [CustomUUID(value=uuid_str) for _, uuid_str, _ in self._ranked_favourites(count)]
+		log.common(f"Favourites:", [str(uuid) for uuid in ret])
+		return ret
 		
 
 	def get_favourites_with_names(self, count: int = 10) -> List[Tuple[int, str]]:
 		# TODO: Display visit count?
 
-		with self.db_lock:
-			self.cursor.execute('''
-				SELECT i.int_id, i.name
-				FROM favourites f
-				JOIN index_data i ON f.uuid = i.uuid
-				ORDER BY i.visit_count DESC 
-				LIMIT ?
-			''', (count,))
-			results = self.cursor.fetchall()
-			log.common("Favourites with descriptions:\n", "\n".join([f"{r[0]:02}: {r[1]}" for r in results]))
-			return results
+		results = [(int_id, name) for int_id, _, name in self._ranked_favourites(count)]
+		log.common("Favourites with descriptions:\n", "\n".join([f"{r[0]:02}: {r[1]}" for r in results]))
+		return results
 
 
 	def set_favourite(self, uuid: Union[CustomUUID, List[CustomUUID]], add: bool) -> str:
@@ -195,6 +292,7 @@ class Index(TimedStorage):
 				raise ValueError(f"Invalid type for set_favourite: {type(uuid)}. Expected CustomUUID or List[CustomUUID].")
 
 			self.db_conn.commit()
+			self.favourites.invalidate()
 			self.set_dirty()
 
 		log.debug(message)
@@ -202,7 +300,7 @@ class Index(TimedStorage):
 	
 
 	def set_favourite_int(self, id: Union[int, List[int]], add: bool) -> str:
-		with self.db_lock:
+		with self.db_lock.read():
 			if isinstance(id, int):
 				custom_uuid = self.get_uuid(id)
 				uuids_to_process = [custom_uuid] if custom_uuid else []
@@ -244,17 +342,19 @@ class Index(TimedStorage):
 			raise TypeError(f"Expected CustomUUID, got {type(uuid)}")
 		uuid_str = str(uuid)
 
-		# First check if UUID exists
-		if not self.db_lock.acquire(timeout=5):  # 5 second timeout
+		int_id = self.uuid_map.get_int(uuid_str)
+		if int_id is not None:
+			return int_id
+
+		# Not known to this process, but may have been added by another one sharing the file
+		if not self.db_lock.acquire_read(timeout=5):  # 5 second timeout
 			raise TimeoutError("Could not acquire lock for UUID check")
 		
 		try:
-			self.cursor.execute("PRAGMA busy_timeout = 5000")
-			self.cursor.execute('SELECT int_id FROM index_data WHERE uuid = ?', (uuid_str,))
-			existing_id = self.cursor.fetchone()
+			existing_id = self.database.read('SELECT int_id FROM index_data WHERE uuid = ?', (uuid_str,))
 			if existing_id:
-				#log.debug(f"Returning existing UUID {uuid_str} from index")
-				return existing_id[0]
+				self.uuid_map.add(existing_id[0][0], uuid_str, uuid)
+				return existing_id[0][0]
 		except sqlite3.OperationalError as e:
 			log.error(f"Database error during UUID check: {e}")
 			raise
@@ -262,7 +362,7 @@ class Index(TimedStorage):
 			log.error(f"Unexpected error during UUID check: {e}")
 			raise
 		finally:
-			self.db_lock.release()
+			self.db_lock.release_read()
 		
 		# If not exists, add it with a new lock acquisition
 		if not self.db_lock.acquire(timeout=5):
@@ -270,20 +370,23 @@ class Index(TimedStorage):
 			raise TimeoutError("Could not acquire lock for UUID insertion")
 		
 		try:
-			self.cursor.execute("PRAGMA busy_timeout = 5000")
 			self.cursor.execute('''
 				INSERT OR IGNORE INTO index_data (uuid, name)
 				VALUES (?, ?)
 				''', (uuid_str, name))
-			self.db_conn.commit()
-			last_row_id = self.cursor.lastrowid
-
 			if self.cursor.rowcount > 0:
+				int_id = self.cursor.lastrowid
+				self.db_conn.commit()
+				self.favourites.indexed(uuid_str)
 				self.set_dirty()
 			else:
+				# Added by another thread or process since the check, lastrowid is not its ID
 				log.debug(f"UUID {uuid_str} already exists in index")
-			
-			return last_row_id
+				int_id = self.cursor.execute('SELECT int_id FROM index_data WHERE uuid = ?', (uuid_str,)).fetchone()[0]
+				self.db_conn.commit()
+
+			self.uuid_map.add(int_id, uuid_str, uuid)
+			return int_id
 		except sqlite3.OperationalError as e:
 			log.error(f"Database error during UUID insertion: {e}")
 			raise
@@ -294,39 +397,120 @@ class Index(TimedStorage):
 			self.db_lock.release()
 
 
+	def add_uuids(self, uuids: List[CustomUUID], names: Optional[List[str]] = None) -> Dict[CustomUUID, int]:
+		"""
+		Bulk add_uuid: UUIDs unknown to this process are inserted with one statement and their IDs read back with
+		one query per chunk, in a single transaction. names, if given, are parallel to uuids and only used for new UUIDs.
+		"""
+		if names is not None and len(names) != len(uuids):
+			raise ValueError(f"Got {len(names)} names for {len(uuids)} UUIDs")
+
+		result: Dict[CustomUUID, int] = {}
+		# uuid string -> (CustomUUID, name) of UUIDs to insert, first occurrence wins
+		missing: Dict[str, Tuple[CustomUUID, str]] = {}
+		for i, uuid in enumerate(uuids):
+			if not isinstance(uuid, CustomUUID):
+				raise TypeError(f"Expected CustomUUID, got {type(uuid)}")
+			uuid_str = str(uuid)
+			int_id = self.uuid_map.get_int(uuid_str)
+			if int_id is not None:
+				result[uuid] = int_id
+			elif uuid_str not in missing:
+				missing[uuid_str] = (uuid, names[i] if names is not None else "")
+
+		if not missing:
+			return result
+
+		if not self.db_lock.acquire(timeout=5):
+			log.error("Timeout while acquiring lock for UUID insertion")
+			raise TimeoutError("Could not acquire lock for UUID insertion")
+
+		try:
+			# Ignored rows were added by another thread or process, their IDs are read back along with the new ones
+			self.cursor.executemany('''
+				INSERT OR IGNORE INTO index_data (uuid, name)
+				VALUES (?, ?)
+				''', [(uuid_str, name) for uuid_str, (_, name) in missing.items()])
+			inserted = self.cursor.rowcount
+
+			rows = []
+			missing_strs = list(missing)
+			for i in range(0, len(missing_strs), self.MAX_QUERY_PARAMETERS):
+				chunk = missing_strs[i:i + self.MAX_QUERY_PARAMETERS]
+				placeholders = ','.join('?' for _ in chunk)
+				rows += self.cursor.execute(f"SELECT uuid, int_id FROM index_data WHERE uuid IN ({placeholders})", chunk).fetchall()
+			self.db_conn.commit()
+			if inserted > 0:
+				self.set_dirty()
+		except sqlite3.OperationalError as e:
+			self.db_conn.rollback()
+			log.error(f"Database error during UUID insertion: {e}")
+			raise
+		except Exception as e:
+			self.db_conn.rollback()
+			log.error(f"Unexpected error during UUID insertion: {e}")
+			raise
+		finally:
+			self.db_lock.release()
+
+		# Mapped only once committed
+		for uuid_str, int_id in rows:
+			self.uuid_map.add(int_id, uuid_str, missing[uuid_str][0])
+			self.favourites.indexed(uuid_str)
+		for uuid in uuids:
+			if uuid not in result:
+				result[uuid] = self.uuid_map.get_int(str(uuid))
+		return result
+
+
 	def visit_uuid(self, uuid: CustomUUID):
 		"""
 		Increase visit count for a page
 		"""
 		if not isinstance(uuid, CustomUUID):
 			raise TypeError(f"Expected CustomUUID, got {type(uuid)}")
-		uuid_str = str(uuid)
-		with self.db_lock:
-			self.cursor.execute('''
-				UPDATE index_data
-				SET visit_count = visit_count + 1
-				WHERE uuid = ?
-			''', (uuid_str,))
-			self.db_conn.commit()
-			self.set_dirty()
+		int_id = self.to_int(uuid)
+		if int_id is not None:
+			self.visit_int(int_id)
 
 
 	def visit_int(self, int_id: int):
 		"""
-		Increase visit count for a page
+		Increase visit count for a page. The visit is counted in memory and written by flush_visits().
 		"""
 		if not isinstance(int_id, int):
 			raise TypeError(f"Expected int, got {type(int_id)}")
-		with self.db_lock:
-			self.cursor.execute('''
-				UPDATE index_data
-				SET visit_count = visit_count + 1
-				WHERE int_id = ?
-			''', (int_id,))
-			self.db_conn.commit()
+		self.favourites.visit(int_id)
+		if self.visit_counter.add(int_id) >= self.MAX_PENDING_VISITS:
+			self.flush_visits()
+		else:
 			self.set_dirty()
 
 
+	def flush_visits(self) -> int:
+		"""
+		Write pending visits to index_data in one transaction. Returns number of updated pages.
+		"""
+		with self.db_lock:
+			visits = self.visit_counter.take()
+			if not visits:
+				return 0
+			try:
+				self.cursor.executemany('''
+					UPDATE index_data
+					SET visit_count = visit_count + ?
+					WHERE int_id = ?
+				''', [(count, int_id) for int_id, count in visits.items()])
+				self.db_conn.commit()
+			except sqlite3.Error as e:
+				self.db_conn.rollback()
+				self.visit_counter.restore(visits)
+				log.error(f"Failed to write visits: {e}")
+				raise
+		self.set_dirty()
+		return len(visits)
+
+
 	def add_notion_url_or_uuid_to_index(self, url_or_uuid: Union[str, CustomUUID], title: str = "") -> int:
 		uuid_obj = self.resolve_to_uuid(url_or_uuid)
 		if not uuid_obj:
@@ -359,39 +543,76 @@ class Index(TimedStorage):
 	def to_int(self, uuid: Union[CustomUUID, List[CustomUUID]]) -> Union[Optional[int], Dict[CustomUUID, Optional[int]]]:
 
 		
-		with self.db_lock:
-			if isinstance(uuid, CustomUUID) or isinstance(uuid, str):
-				uuid_str = str(uuid)
-				self.cursor.execute('SELECT int_id FROM index_data WHERE uuid = ?', (uuid_str,))
-				result = self.cursor.fetchone()
-				return result[0] if result else None
-			elif isinstance(uuid, list):
-				uuid_strs = [str(u) for u in uuid]
-				placeholders = ','.join('?' for _ in uuid_strs)
-				query = f"SELECT uuid, int_id FROM index_data WHERE uuid IN ({placeholders})"
-				self.cursor.execute(query, uuid_strs)
-				rows = self.cursor.fetchall()
-				return {CustomUUID(value=row[0]): row[1] for row in rows}
-			else:
-				raise ValueError(f"Invalid type for to_int: {type(uuid)}. Expected CustomUUID or List[CustomUUID].")
+		if isinstance(uuid, CustomUUID) or isinstance(uuid, str):
+			uuid_str = str(uuid)
+			int_id = self.uuid_map.get_int(uuid_str)
+			if int_id is not None:
+				return int_id
+			with self.db_lock.read():
+				result = self.database.read('SELECT int_id FROM index_data WHERE uuid = ?', (uuid_str,))
+			if not result:
+				return None
+			self.uuid_map.add(result[0][0], uuid_str)
+			return result[0][0]
+		elif isinstance(uuid, list):
+			return self.map_uuids(uuid)[0]
+		else:
+			raise ValueError(f"Invalid type for to_int: {type(uuid)}. Expected CustomUUID or List[CustomUUID].")
+
+
+	def map_uuids(self, uuids: List[CustomUUID]) -> Tuple[Dict[CustomUUID, int], Dict[int, CustomUUID]]:
+		"""
+		Look up integer IDs of UUIDs in one query per chunk. Returns both UUID -> int ID and int ID -> UUID mappings,
+		UUIDs missing in the index are left out.
+		"""
+		to_int: Dict[CustomUUID, int] = {}
+		to_uuid: Dict[int, CustomUUID] = {}
+		missing = []
+		for uuid_str in dict.fromkeys(str(u) for u in uuids):
+			int_id = self.uuid_map.get_int(uuid_str)
+			if int_id is None:
+				missing.append(uuid_str)
+				continue
+			uuid_obj = self.uuid_map.get_uuid(int_id)
+			to_int[uuid_obj] = int_id
+			to_uuid[int_id] = uuid_obj
+
+		if not missing:
+			return to_int, to_uuid
+
+		with self.db_lock.read():
+			for i in range(0, len(missing), self.MAX_QUERY_PARAMETERS):
+				chunk = missing[i:i + self.MAX_QUERY_PARAMETERS]
+				placeholders = ','.join('?' for _ in chunk)
+				for uuid_str, int_id in self.database.read(f"SELECT uuid, int_id FROM index_data WHERE uuid IN ({placeholders})", chunk):
+					self.uuid_map.add(int_id, uuid_str)
+					uuid_obj = self.uuid_map.get_uuid(int_id)
+					to_int[uuid_obj] = int_id
+					to_uuid[int_id] = uuid_obj
+		return to_int, to_uuid
 
 
 	def get_uuid(self, int_id: int) -> Optional[CustomUUID]:
 		if not isinstance(int_id, int):
 			raise TypeError(f"Expected int, got {type(int_id)}")
-		with self.db_lock:
-			self.cursor.execute('SELECT uuid FROM index_data WHERE int_id = ?', (int_id,))
-			result = self.cursor.fetchone()
-			return CustomUUID(value=result[0]) if result else None
+		uuid_obj = self.uuid_map.get_uuid(int_id)
+		if uuid_obj is not None:
+			return uuid_obj
+		with self.db_lock.read():
+			result = self.database.read('SELECT uuid FROM index_data WHERE int_id = ?', (int_id,))
+		if not result:
+			return None
+		self.uuid_map.add(int_id, result[0][0])
+		return self.uuid_map.get_uuid(int_id)
 
 
 	def get_visit_count(self, int_id: int) -> int:
 		if not isinstance(int_id, int):
 			raise TypeError(f"Expected int, got {type(int_id)}")
-		with self.db_lock:
-			self.cursor.execute('SELECT visit_count FROM index_data WHERE int_id = ?', (int_id,))
-			result = self.cursor.fetchone()
-			return result[0] if result else 0
+		self.flush_visits()
+		with self.db_lock.read():
+			result = self.database.read('SELECT visit_count FROM index_data WHERE int_id = ?', (int_id,))
+			return result[0][0] if result else 0
 
 
 	def set_name(self, int_id: int, name: str):
@@ -402,26 +623,72 @@ class Index(TimedStorage):
 		with self.db_lock:
 			self.cursor.execute('UPDATE index_data SET name = ? WHERE int_id = ?', (name, int_id))
 			self.db_conn.commit()
+			self.favourites.rename(int_id, name)
 			self.set_dirty()
 
 
 	def get_name(self, int_id: int) -> str:
 		if not isinstance(int_id, int):
 			raise TypeError(f"Expected int, got {type(int_id)}")
+		with self.db_lock.read():
+			result = self.database.read('SELECT name FROM index_data WHERE int_id = ?', (int_id,))
+			return result[0][0] if result else ""
+
+
+	def set_titles(self, titles: Dict[int, str]):
+		"""
+		Store Notion titles of pages and databases, in one transaction. Rows that already have the title are not written.
+		Titles are only searched, names given by the user are kept.
+		"""
+		if not titles:
+			return
 		with self.db_lock:
-			self.cursor.execute('SELECT name FROM index_data WHERE int_id = ?', (int_id,))
-			result = self.cursor.fetchone()
-			return result[0] if result else ""
+			self.cursor.executemany(
+				'UPDATE index_data SET title = ? WHERE int_id = ? AND title IS NOT ?',
+				[(title, int_id, title) for int_id, title in titles.items()])
+			changed = self.cursor.rowcount
+			self.db_conn.commit()
+		if changed > 0:
+			self.set_dirty()
+
+
+	def search_titles(self, query: str, count: int = 10) -> List[int]:
+		"""
+		Returns int IDs of pages and databases whose name or title contains all words of the query, ignoring case,
+		best matches first. Words shorter than MIN_SEARCH_TERM_LENGTH only match if the whole query is such a word.
+		"""
+		terms = [term for term in query.split() if len(term) >= self.MIN_SEARCH_TERM_LENGTH]
+		with self.db_lock.read():
+			if terms:
+				# Every term is a quoted phrase, so that FTS5 operators in the query are taken literally
+				match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+				rows = self.database.read('''
+					SELECT t.rowid FROM title_search t
+					JOIN index_data i ON i.int_id = t.rowid
+					WHERE title_search MATCH ?
+					ORDER BY t.rank, i.visit_count DESC
+					LIMIT ?
+				''', (match, count))
+			elif query.strip():
+				pattern = '%' + query.strip().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+				rows = self.database.read('''
+					SELECT int_id FROM index_data
+					WHERE name LIKE ?1 ESCAPE '\\' OR title LIKE ?1 ESCAPE '\\'
+					ORDER BY visit_count DESC
+					LIMIT ?2
+				''', (pattern, count))
+			else:
+				return []
+		return [row[0] for row in rows]
 
 
 	def get_names(self, int_ids: List[int]) -> Dict[int, str]:
 		if not isinstance(int_ids, list) or not all(isinstance(i, int) for i in int_ids):
 			raise TypeError(f"Expected List[int], got {type(int_ids)}")
-		with self.db_lock:
+		with self.db_lock.read():
 			placeholders = ','.join('?' for _ in int_ids)
 			query = f"SELECT int_id, name FROM index_data WHERE int_id IN ({placeholders})"
-			self.cursor.execute(query, int_ids)
-			results = {row[0]: row[1] for row in self.cursor.fetchall()}
+			results = {row[0]: row[1] for row in self.database.read(query, int_ids)}
 			return {id: results.get(id, "") for id in int_ids}
 
 
@@ -432,19 +699,21 @@ class Index(TimedStorage):
 		with self.db_lock:
 			self.cursor.execute('DELETE FROM index_data WHERE uuid = ?', (uuid_str,))
 			self.db_conn.commit()
+			self.uuid_map.remove(uuid_str)
+			self.favourites.invalidate()
 			self.set_dirty()
 			return self.cursor.rowcount
 
 
 	def get_most_popular(self, count: int) -> str:
-		with self.db_lock:
-			self.cursor.execute('''
+		self.flush_visits()
+		with self.db_lock.read():
+			results = self.database.read('''
 				SELECT int_id, name, visit_count
 				FROM index_data
 				ORDER BY visit_count DESC
 				LIMIT ?
 			''', (count,))
-			results = self.cursor.fetchall()
 
 		ret = "Index of most visited pages:\n"
 		for int_id, name, visit_count in results:
@@ -452,16 +721,31 @@ class Index(TimedStorage):
 		return ret
 
 
-	def load_from_disk(self):
+	def get_most_visited(self, count: int) -> List[CustomUUID]:
+		self.flush_visits()
+		with self.db_lock.read():
+			results = self.database.read('''
+				SELECT uuid FROM index_data
+				WHERE visit_count > 0
+				ORDER BY visit_count DESC
+				LIMIT ?
+			''', (count,))
+		return [CustomUUID(value=result[0]) for result in results]
+
+
+	def load_from_disk(self) -> bool:
 		try:
 			with self.db_lock:
 				disk_conn = sqlite3.connect(self.db_path)
 				disk_conn.backup(self.db_conn)
 				disk_conn.close()
 			log.flow("Index loaded from disk")
+			self.favourites.invalidate()
 			self.clean()
+			return True
 		except sqlite3.Error:
 			log.flow("No existing index file found. Starting with an empty index.")
+			return False
 
 
 	def save(self):
@@ -470,15 +754,53 @@ class Index(TimedStorage):
 			return
 		
 		try:
-			with self.db_lock:
-				disk_conn = sqlite3.connect(self.db_path)
-				self.db_conn.backup(disk_conn)
-				disk_conn.close()
-			log.flow("Index saved to disk")
+			self._write_to_disk()
 		except Exception as e:
 			log.error(f"Failed to save index to disk: {e}")
 
 
+	def _write_to_disk(self):
+		# Buffered visits are only in memory until written here
+		self.flush_visits()
+		with self.db_lock:
+			if self.persistence_mode == PersistenceMode.WAL:
+				# Favourites and their visits may have been changed by other processes sharing the file,
+				# reload them here rather than on the next read
+				self._load_favourites()
+				# Changes are already on disk, only fold the WAL back into the database file
+				self.database.checkpoint()
+			# Only rows changed since the last save are written, unless a full snapshot is due
+			elif self.journal is not None and self.journal.flush(self.db_path):
+				log.flow("Index changes saved to disk")
+			else:
+				self._save_snapshot()
+
+
+	def _save_snapshot(self):
+		disk_conn = sqlite3.connect(self.db_path)
+		self.db_conn.backup(disk_conn)
+		disk_conn.close()
+
+		if self.journal is not None:
+			self.journal.mark_synced()
+		log.flow("Index saved to disk")
+
+
+	def compact(self):
+		"""
+		Write a full snapshot of the index to disk, reclaiming space left behind by incremental saves.
+		In WAL mode, the database file is vacuumed instead.
+		"""
+		with self.db_lock:
+			if self.persistence_mode == PersistenceMode.WAL:
+				self.db_conn.execute('VACUUM')
+				self.database.checkpoint(truncate=True)
+				log.flow("Index compacted")
+			else:
+				self._save_snapshot()
+		self.clean()
+
+
 	def cleanup(self):
 		#override
 		# Don't do that during unit tests
@@ -488,7 +810,8 @@ class Index(TimedStorage):
 		if not self._is_closing and self.db_conn:
 			try:
 				self._is_closing = True
-				self.save()  # Call the virtual save method
-				self.db_conn.close()
+				# save() itself is a no-op once closing
+				self._write_to_disk()
+				self.database.close()
 			except Exception as e:
 				log.error(f"Cleanup failed: {e}")
@@ -0,0 +1,148 @@
+import os
+import sqlite3
+from typing import List, Optional, Set
+from urllib.request import pathname2url
+
+from tz_common.logs import log
+
+from .changeJournal import ChangeJournal
+
+
+class LazyLoader:
+	"""
+	Serves rows of a database file on demand, instead of copying the whole file into memory at start.
+
+	The file is attached read-only to the in-memory writer connection. Rows of the paged table are copied into memory
+	on first access of their key, other tables are expected to be small and are copied at once.
+	Keys that were copied, written or deleted in memory are resolved and never read from the file again,
+	so rows deleted in memory don't come back. Copied rows are already on disk, so they are dropped from the change journal.
+
+	All methods except needs() must be called with the owner's write lock held.
+	"""
+
+	SCHEMA = "disk"
+	# Keys per IN (...) query, well under SQLite's limit of bound parameters
+	MAX_QUERY_PARAMETERS = 500
+
+	def __init__(self, conn: sqlite3.Connection, db_path: str, table: str, key_column: str, eager_tables: List[str], journal: Optional[ChangeJournal] = None):
+		self.conn = conn
+		self.db_path = db_path
+		self.table = table
+		self.key_column = key_column
+		self.journal = journal
+		# Keys copied by fault_in(), checked without the lock to skip it for keys that are already in memory
+		self.resolved: Set[str] = set()
+
+		columns = [column[1] for column in conn.execute(f'PRAGMA main.table_info({table})').fetchall()]
+		self.columns = ", ".join(columns)
+
+		conn.execute(f"ATTACH DATABASE ? AS {self.SCHEMA}", (f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro",))
+		conn.execute(f'CREATE TEMP TABLE IF NOT EXISTS lazy_resolved ({key_column} TEXT PRIMARY KEY)')
+		# Conflict clause of the triggering statement, ie. an UPSERT, overrides OR IGNORE, so duplicates are skipped explicitly
+		for event, row in [("INSERT", "NEW"), ("UPDATE", "OLD"), ("DELETE", "OLD")]:
+			conn.execute(f'''
+				CREATE TEMP TRIGGER IF NOT EXISTS lazy_resolve_{event.lower()}
+				AFTER {event} ON main.{table}
+				BEGIN
+					INSERT INTO lazy_resolved ({key_column})
+					SELECT {row}.{key_column} WHERE NOT EXISTS (SELECT 1 FROM lazy_resolved WHERE {key_column} = {row}.{key_column});
+				END
+			''')
+
+		last_seq = self._last_journal_seq()
+		for eager_table in eager_tables:
+			eager_columns = ", ".join(column[1] for column in conn.execute(f'PRAGMA main.table_info({eager_table})').fetchall())
+			conn.execute(f'INSERT OR REPLACE INTO main.{eager_table} ({eager_columns}) SELECT {eager_columns} FROM {self.SCHEMA}.{eager_table}')
+		self._discard_journal(last_seq)
+		conn.commit()
+
+
+	@staticmethod
+	def can_attach(db_path: str, schema_version: int) -> bool:
+		"""
+		File can be attached if it exists and has the current schema, otherwise it has to be loaded and migrated as a whole.
+		"""
+		if not os.path.exists(db_path):
+			return False
+
+		try:
+			disk_conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro", uri=True)
+			try:
+				disk_version = disk_conn.execute('PRAGMA user_version').fetchone()[0]
+			finally:
+				disk_conn.close()
+		except sqlite3.Error as e:
+			log.error(f"Can't read {db_path}: {e}")
+			return False
+
+		if disk_version != schema_version:
+			log.flow(f"{db_path} has schema version {disk_version}, loading it as a whole")
+			return False
+		return True
+
+
+	def needs(self, keys: List[str]) -> bool:
+		return any(key not in self.resolved for key in keys)
+
+
+	def fault_in(self, keys: List[str]):
+		"""
+		Copy rows of keys that were never resolved from the file into memory.
+		"""
+		keys = list(dict.fromkeys(key for key in keys if key not in self.resolved))
+		if not keys:
+			return
+
+		last_seq = self._last_journal_seq()
+		for i in range(0, len(keys), self.MAX_QUERY_PARAMETERS):
+			chunk = keys[i:i + self.MAX_QUERY_PARAMETERS]
+			placeholders = ','.join('?' for _ in chunk)
+			self.conn.execute(f'''
+				INSERT OR IGNORE INTO main.{self.table} ({self.columns})
+				SELECT {self.columns} FROM {self.SCHEMA}.{self.table}
+				WHERE {self.key_column} IN ({placeholders})
+					AND {self.key_column} NOT IN (SELECT {self.key_column} FROM lazy_resolved)
+			''', chunk)
+			# Keys missing on disk are resolved as well
+			self.conn.executemany(f'INSERT OR IGNORE INTO lazy_resolved ({self.key_column}) VALUES (?)', [(key,) for key in chunk])
+		self._discard_journal(last_seq)
+		self.conn.commit()
+		self.resolved.update(keys)
+
+
+	def load_remaining(self) -> int:
+		"""
+		Copy all rows that are not resolved yet and detach the file. The loader can't be used afterwards.
+
+		Returns:
+			Number of copied rows
+		"""
+		last_seq = self._last_journal_seq()
+		self.conn.execute(f'''
+			INSERT OR IGNORE INTO main.{self.table} ({self.columns})
+			SELECT {self.columns} FROM {self.SCHEMA}.{self.table}
+			WHERE {self.key_column} NOT IN (SELECT {self.key_column} FROM lazy_resolved)
+		''')
+		loaded_count = self.conn.execute('SELECT changes()').fetchone()[0]
+		self._discard_journal(last_seq)
+		self.conn.commit()
+		self.detach()
+		return loaded_count
+
+
+	def detach(self):
+		for event in ["insert", "update", "delete"]:
+			self.conn.execute(f'DROP TRIGGER IF EXISTS temp.lazy_resolve_{event}')
+		self.conn.execute('DROP TABLE IF EXISTS temp.lazy_resolved')
+		self.conn.commit()
+		self.conn.execute(f'DETACH DATABASE {self.SCHEMA}')
+		self.resolved.clear()
+
+
+	def _last_journal_seq(self) -> Optional[int]:
+		return self.journal.last_seq() if self.journal is not None else None
+
+
+	def _discard_journal(self, last_seq: Optional[int]):
+		if self.journal is not None:
+			self.journal.discard_after(last_seq)
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+
+from tz_common import CustomUUID
+
+from .blockCache import ObjectType
+from ..exceptions import HTTPError
+
+# Object doesn't exist, or is not shared with the integration
+NEGATIVE_STATUS_CODES = (403, 404)
+
+
+class NegativeCache:
+	"""
+	Remembers Notion objects that the API reported as missing or inaccessible, so that repeated lookups
+	of the same object fail locally instead of spending a rate-limited request.
+
+	Entries are kept per object ID and type, because the same ID may exist as one type and not as another.
+	They expire after a short TTL, as the object can be created or shared with the integration at any time.
+	"""
+
+	def __init__(self, ttl: float = 120, max_entries: int = 1000):
+		self.ttl = ttl
+		self.max_entries = max_entries
+		# (object_id, object_type) -> (expires_at, operation, status_code, details)
+		self.entries: OrderedDict[Tuple[str, str], Tuple[float, str, int, Optional[Dict[str, Any]]]] = OrderedDict()
+		self.lock = threading.Lock()
+
+
+	@staticmethod
+	def _normalize_id(object_id: Union[str, CustomUUID]) -> str:
+		# API client gets IDs both with and without dashes
+		return str(object_id).replace("-", "").lower()
+
+
+	def get(self, object_id: Union[str, CustomUUID], object_type: ObjectType) -> Optional[HTTPError]:
+		"""
+		Returns the recorded error for the object, or None if there is no live entry.
+		"""
+		key = (self._normalize_id(object_id), object_type.value)
+		with self.lock:
+			entry = self.entries.get(key)
+			if entry is None:
+				return None
+
+			expires_at, operation, status_code, details = entry
+			if time.monotonic() > expires_at:
+				del self.entries[key]
+				return None
+
+		return HTTPError(operation, status_code, details=details)
+
+
+	def record(self, object_id: Union[str, CustomUUID], object_type: ObjectType, error: HTTPError) -> bool:
+		"""
+		Records the error if its status code means the object is missing or not shared.
+		Returns True if it was recorded.
+		"""
+		if error.status_code not in NEGATIVE_STATUS_CODES:
+			return False
+
+		key = (self._normalize_id(object_id), object_type.value)
+		with self.lock:
+			self.entries.pop(key, None)
+			self.entries[key] = (time.monotonic() + self.ttl, error.operation, error.status_code, error.details)
+			while len(self.entries) > self.max_entries:
+				self.entries.popitem(last=False)
+		return True
+
+
+	def remove(self, object_id: Union[str, CustomUUID]):
+		"""
+		Forgets the object for all types, once it is known to be accessible.
+		"""
+		normalized_id = self._normalize_id(object_id)
+		with self.lock:
+			for key in [key for key in self.entries if key[0] == normalized_id]:
+				del self.entries[key]
+
+
+	def clear(self):
+		with self.lock:
+			self.entries.clear()
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple
+
+
+def parse_content(content: Any) -> Any:
+	"""
+	Parse JSON string from cache back to dictionary.
+	Returns original content if it is not a string or parsing fails.
+	"""
+	if isinstance(content, str):
+		try:
+			return json.loads(content)
+		except json.JSONDecodeError:
+			return content
+	return content
+
+
+class ParsedCache:
+	"""
+	Size-bounded LRU of already parsed cache content, keyed by cache key and object type.
+	Size of an entry is the length of the serialized content it was parsed from.
+
+	Returned objects are shared between callers and must be treated as read-only.
+	Views derived from them may be dropped together with the entry, see on_evict.
+	"""
+
+	def __init__(self, max_size: int = 16 * 1024 * 1024):
+		self.max_size = max_size
+		self.size = 0
+		# Called with every parsed object that leaves the cache, outside of the lock
+		self.on_evict: Optional[Callable[[Any], None]] = None
+		# (cache_key, object_type) -> (parsed content, size, expires_at or None)
+		self.entries: OrderedDict[Tuple[str, str], Tuple[Any, int, Optional[float]]] = OrderedDict()
+		self.lock = threading.Lock()
+
+
+	def get(self, cache_key: str, object_type: str) -> Optional[Any]:
+		"""
+		Returns parsed content, or None if not present or past its TTL.
+		Expired entries are left for the backing store to delete, which evicts them here as well.
+		"""
+		entry = self.get_allow_stale(cache_key, object_type, 0)
+		return entry[0] if entry is not None else None
+
+
+	def get_allow_stale(self, cache_key: str, object_type: str, grace: float) -> Optional[Tuple[Any, bool]]:
+		"""
+		Returns parsed content and whether it is past its TTL, or None if not present or past its TTL by more than grace seconds.
+		"""
+		key = (cache_key, object_type)
+		with self.lock:
+			entry = self.entries.get(key)
+			if entry is None:
+				return None
+
+			value, _, expires_at = entry
+			now = time.time()
+			if expires_at is not None and now > expires_at + grace:
+				return None
+
+			self.entries.move_to_end(key)
+			return value, expires_at is not None and now > expires_at
+
+
+	def put(self, cache_key: str, object_type: str, value: Any, size: int, expires_at: Optional[float] = None):
+		if size > self.max_size:
+			return
+
+		key = (cache_key, object_type)
+		with self.lock:
+			evicted = self._remove(key)
+			self.entries[key] = (value, size, expires_at)
+			self.size += size
+
+			while self.size > self.max_size:
+				_, (evicted_value, evicted_size, _) = self.entries.popitem(last=False)
+				self.size -= evicted_size
+				evicted.append(evicted_value)
+		self._notify_evicted(evicted)
+
+
+	def evict(self, cache_key: str, object_type: str):
+		with self.lock:
+			evicted = self._remove((cache_key, object_type))
+		self._notify_evicted(evicted)
+
+
+	def clear(self):
+		with self.lock:
+			evicted = [value for value, _, _ in self.entries.values()]
+			self.entries.clear()
+			self.size = 0
+		self._notify_evicted(evicted)
+
+
+	def __len__(self) -> int:
+		return len(self.entries)
+
+
+	def _remove(self, key: Tuple[str, str]) -> List[Any]:
+		entry = self.entries.pop(key, None)
+		if entry is None:
+			return []
+		self.size -= entry[1]
+		return [entry[0]]
+
+
+	def _notify_evicted(self, values: List[Any]):
+		if self.on_evict is not None:
+			for value in values:
+				self.on_evict(value)
@@ -0,0 +1,132 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+class ReadWriteLock:
+	"""
+	Lets any number of threads read at the same time, while a write is exclusive.
+
+	Both modes are reentrant and the writer may also take the read lock.
+	Upgrading a read lock to a write lock is not supported and raises RuntimeError, since two upgrading readers would deadlock.
+	Waiting writers hold off new readers, so that a steady stream of reads can't starve writes.
+
+	Used as a context manager or with acquire() / release(), it behaves like an RLock taken for writing.
+	"""
+
+	def __init__(self):
+		self._condition = threading.Condition(threading.Lock())
+		# Thread id -> depth of read lock
+		self._readers: Dict[int, int] = {}
+		self._writer: Optional[int] = None
+		self._write_depth = 0
+		self._waiting_writers = 0
+
+
+	def acquire_read(self, timeout: float = -1) -> bool:
+		thread_id = threading.get_ident()
+		with self._condition:
+			if self._writer == thread_id or thread_id in self._readers:
+				self._readers[thread_id] = self._readers.get(thread_id, 0) + 1
+				return True
+
+			if not self._wait_for(lambda: self._writer is None and self._waiting_writers == 0, timeout):
+				return False
+			self._readers[thread_id] = 1
+			return True
+
+
+	def release_read(self):
+		thread_id = threading.get_ident()
+		with self._condition:
+			depth = self._readers.get(thread_id)
+			if depth is None:
+				raise RuntimeError("Read lock released by a thread that doesn't hold it")
+			if depth > 1:
+				self._readers[thread_id] = depth - 1
+			else:
+				del self._readers[thread_id]
+				if not self._readers:
+					self._condition.notify_all()
+
+
+	def acquire_write(self, timeout: float = -1) -> bool:
+		thread_id = threading.get_ident()
+		with self._condition:
+			if self._writer == thread_id:
+				self._write_depth += 1
+				return True
+			if thread_id in self._readers:
+				raise RuntimeError("Can't upgrade a read lock to a write lock")
+
+			self._waiting_writers += 1
+			try:
+				if not self._wait_for(lambda: self._writer is None and not self._readers, timeout):
+					return False
+			finally:
+				self._waiting_writers -= 1
+				if self._writer is None and self._waiting_writers == 0:
+					# Readers held off by this writer may proceed if it gave up
+					self._condition.notify_all()
+
+			self._writer = thread_id
+			self._write_depth = 1
+			return True
+
+
+	def release_write(self):
+		with self._condition:
+			if self._writer != threading.get_ident():
+				raise RuntimeError("Write lock released by a thread that doesn't hold it")
+			self._write_depth -= 1
+			if self._write_depth == 0:
+				self._writer = None
+				self._condition.notify_all()
+
+
+	def is_write_owner(self) -> bool:
+		"""
+		Whether the calling thread holds the write lock.
+		"""
+		with self._condition:
+			return self._writer == threading.get_ident()
+
+
+	@contextmanager
+	def read(self) -> Iterator[None]:
+		self.acquire_read()
+		try:
+			yield
+		finally:
+			self.release_read()
+
+
+	@contextmanager
+	def write(self) -> Iterator[None]:
+		self.acquire_write()
+		try:
+			yield
+		finally:
+			self.release_write()
+
+
+	def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+		return self.acquire_write(timeout if blocking else 0)
+
+
+	def release(self):
+		self.release_write()
+
+
+	def __enter__(self):
+		self.acquire_write()
+		return self
+
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.release_write()
+
+
+	def _wait_for(self, predicate, timeout: float) -> bool:
+		# Called with the condition held
+		return self._condition.wait_for(predicate, None if timeout < 0 else timeout)
@@ -0,0 +1,57 @@
+"""
+Versioned schema upgrades for SQLite-backed storages.
+Schema version is kept in PRAGMA user_version, which is copied together with the database by backup(),
+so files saved by older versions are upgraded right after they are loaded.
+
+Each migration is a list of SQL statements. Migrations are append-only: never edit or reorder existing ones.
+"""
+
+import sqlite3
+from typing import List
+
+from tz_common.logs import log
+
+
+Migration = List[str]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+	return conn.execute('PRAGMA main.user_version').fetchone()[0]
+
+
+def apply_migrations(conn: sqlite3.Connection, migrations: List[Migration], storage_name: str) -> bool:
+	"""
+	Apply all migrations newer than the current schema version, each in its own transaction.
+
+	Returns:
+		True if the schema was changed
+	"""
+	current_version = get_schema_version(conn)
+	target_version = len(migrations)
+
+	if current_version > target_version:
+		log.error(f"{storage_name} schema version {current_version} is newer than supported {target_version}")
+		return False
+
+	migrated = False
+	for version in range(current_version, target_version):
+		try:
+			# Another process sharing the file may have migrated it in the meantime
+			conn.execute('BEGIN IMMEDIATE')
+			if get_schema_version(conn) > version:
+				conn.rollback()
+				continue
+			for statement in migrations[version]:
+				conn.execute(statement)
+			# PRAGMA doesn't accept parameters, version is always an int
+			conn.execute(f'PRAGMA main.user_version = {version + 1}')
+			conn.commit()
+		except sqlite3.Error:
+			conn.rollback()
+			log.error(f"{storage_name} schema migration to version {version + 1} failed")
+			raise
+
+		migrated = True
+		log.flow(f"{storage_name} schema migrated to version {version + 1}")
+
+	return migrated
@@ -0,0 +1,76 @@
+import sqlite3
+import threading
+import uuid
+import weakref
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .readWriteLock import ReadWriteLock
+
+
+class SharedMemoryDatabase:
+	"""
+	In-memory SQLite database with a single writer connection and a read-only connection per reading thread.
+
+	Queries go through `read()` under the read lock, so they run in parallel with each other.
+	All writes go through `writer` under the write lock and have to be committed before it is released:
+	connections share one cache, and an open write transaction makes readers fail with "database table is locked".
+	TEMP tables and triggers are private to the writer connection.
+	"""
+
+	def __init__(self, name: str):
+		# Unique name, so that instances never share a database
+		self.uri = f"file:{name}_{uuid.uuid4().hex}?mode=memory&cache=shared"
+		self._open()
+
+
+	def _open(self):
+		self.writer = self._connect()
+		self.lock = ReadWriteLock()
+
+		self._local = threading.local()
+		# Thread id -> (thread, its reader connection), so that connections of finished threads can be closed
+		self._readers: Dict[int, Tuple[weakref.ref, sqlite3.Connection]] = {}
+		self._readers_lock = threading.Lock()
+
+
+	def read(self, sql: str, parameters: Sequence[Any] = ()) -> List[Tuple]:
+		"""
+		Run a query and return all rows. Caller must hold the read or write lock.
+		"""
+		# Writer sees its own changes, and may hold an open transaction that would block other connections
+		conn = self.writer if self.lock.is_write_owner() else self._reader()
+		# Fetching all rows resets the statement, so it doesn't keep the tables locked
+		return conn.execute(sql, parameters).fetchall()
+
+
+	def close(self):
+		with self._readers_lock:
+			for _, conn in self._readers.values():
+				conn.close()
+			self._readers.clear()
+		self.writer.close()
+
+
+	def _connect(self) -> sqlite3.Connection:
+		return sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+
+
+	def _reader(self) -> sqlite3.Connection:
+		conn = getattr(self._local, "conn", None)
+		if conn is not None:
+			return conn
+
+		conn = self._connect()
+		conn.execute('PRAGMA query_only = ON')
+
+		current_thread = threading.current_thread()
+		with self._readers_lock:
+			for thread_id, (thread_ref, reader) in list(self._readers.items()):
+				thread = thread_ref()
+				if thread is None or not thread.is_alive():
+					reader.close()
+					del self._readers[thread_id]
+			self._readers[threading.get_ident()] = (weakref.ref(current_thread), conn)
+
+		self._local.conn = conn
+		return conn
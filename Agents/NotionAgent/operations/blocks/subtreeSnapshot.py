@@ -0,0 +1,52 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from tz_common import CustomUUID
+
+from .blockDict import BlockDict
+from .blockTree import BlockTree
+
+
+class SubtreeSnapshot:
+	"""
+	Content of a block with all its descendants, as assembled by a recursive traversal: flat map of integer IDs
+	to block content, and parent -> children edges to rebuild the BlockTree.
+	"""
+
+	def __init__(self, root: CustomUUID, blocks: Optional[BlockDict] = None, edges: Optional[List[Tuple[CustomUUID, List[CustomUUID]]]] = None):
+		self.root = root
+		self.blocks = blocks if blocks is not None else BlockDict()
+		self.edges = edges if edges is not None else []
+		# Traversal that failed for any block leaves the snapshot incomplete, so it must not be cached
+		self.complete = True
+
+
+	def add_edges(self, parent_uuid: CustomUUID, children_uuids: List[CustomUUID]):
+		self.edges.append((parent_uuid, list(children_uuids)))
+
+
+	def apply_to_tree(self, block_tree: BlockTree):
+		block_tree.add_parent(self.root)
+		for parent_uuid, children_uuids in self.edges:
+			block_tree.add_relationships(parent_uuid, children_uuids)
+
+
+	def to_json(self) -> str:
+		return json.dumps({
+			"root": str(self.root),
+			# JSON object keys are strings, so integer IDs are kept in pairs
+			"blocks": [[int_id, content] for int_id, content in self.blocks.items()],
+			"edges": [[str(parent_uuid), [str(child_uuid) for child_uuid in children_uuids]] for parent_uuid, children_uuids in self.edges],
+		})
+
+
+	@classmethod
+	def from_dict(cls, data: Dict[str, Any]) -> "SubtreeSnapshot":
+		"""
+		Build a snapshot from parsed to_json() output. Block contents are shared with the parsed data and must not be modified.
+		"""
+		blocks = BlockDict()
+		for int_id, content in data["blocks"]:
+			blocks.add_block(int_id, content)
+		edges = [(CustomUUID.from_string(parent), [CustomUUID.from_string(child) for child in children]) for parent, children in data["edges"]]
+		return cls(CustomUUID.from_string(data["root"]), blocks, edges)
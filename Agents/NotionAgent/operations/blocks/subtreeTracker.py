@@ -0,0 +1,97 @@
+import sqlite3
+import threading
+from typing import Optional, Set
+
+from .lazyLoader import LazyLoader
+
+
+class SubtreeTracker:
+	"""
+	Finds materialized subtree snapshots that no longer match the cached objects under their root.
+
+	TEMP triggers report objects whose content was changed or deleted, and parents whose children were linked or unlinked.
+	Snapshots rooted at these objects or any of their ancestors in block_relationships are deleted before the next snapshot is read or stored.
+	Parent of every removed link is reported as well, so ancestors of an object that was unlinked are still found through it.
+	"""
+
+	def __init__(self, conn: sqlite3.Connection, subtree_type: str):
+		self.conn = conn
+		self.subtree_type = subtree_type
+		self.changed_keys: Set[str] = set()
+		self.lock = threading.Lock()
+
+		conn.create_function('mark_subtree_changed', 1, self.mark_changed)
+		# Snapshots themselves and updates of access statistics or freshness don't change any subtree
+		for name, event, key in [
+			("content_update", "UPDATE OF content ON main.block_cache", "OLD.cache_key"),
+			("content_delete", "DELETE ON main.block_cache", "OLD.cache_key"),
+		]:
+			conn.execute(f'''
+				CREATE TEMP TRIGGER IF NOT EXISTS subtree_{name}
+				AFTER {event}
+				WHEN OLD.object_type != '{subtree_type}'
+				BEGIN SELECT mark_subtree_changed({key}); END
+			''')
+		for name, event, key in [
+			("link_insert", "INSERT ON main.block_relationships", "(SELECT cache_key FROM cache_keys WHERE key_id = NEW.parent_id)"),
+			("link_delete", "DELETE ON main.block_relationships", "(SELECT cache_key FROM cache_keys WHERE key_id = OLD.parent_id)"),
+		]:
+			conn.execute(f'''
+				CREATE TEMP TRIGGER IF NOT EXISTS subtree_{name}
+				AFTER {event}
+				BEGIN SELECT mark_subtree_changed({key}); END
+			''')
+		conn.commit()
+
+
+	def mark_changed(self, cache_key: str):
+		with self.lock:
+			self.changed_keys.add(cache_key)
+
+
+	def has_changes(self) -> bool:
+		return bool(self.changed_keys)
+
+
+	def invalidate(self, lazy_loader: Optional[LazyLoader] = None) -> int:
+		"""
+		Delete snapshots affected by changes reported so far. Caller holds the write lock and commits.
+
+		Returns:
+			Number of deleted snapshots
+		"""
+		with self.lock:
+			changed_keys = self.changed_keys
+			self.changed_keys = set()
+		if not changed_keys:
+			return 0
+
+		self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS subtree_changed_keys (cache_key TEXT PRIMARY KEY)')
+		self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS subtree_affected_keys (cache_key TEXT PRIMARY KEY)')
+		self.conn.executemany('INSERT OR IGNORE INTO subtree_changed_keys (cache_key) VALUES (?)', [(key,) for key in changed_keys])
+
+		# UNION discards rows already visited, so cycles in relationships terminate
+		self.conn.execute('''
+			WITH RECURSIVE ancestors(key_id) AS (
+				SELECT k.key_id FROM cache_keys k JOIN subtree_changed_keys c ON c.cache_key = k.cache_key
+				UNION
+				SELECT r.parent_id FROM block_relationships r JOIN ancestors a ON r.child_id = a.key_id
+			)
+			INSERT OR IGNORE INTO subtree_affected_keys (cache_key)
+			SELECT k.cache_key FROM ancestors a JOIN cache_keys k ON k.key_id = a.key_id
+		''')
+		# Changed objects without relationships have no key ID
+		self.conn.execute('INSERT OR IGNORE INTO subtree_affected_keys (cache_key) SELECT cache_key FROM subtree_changed_keys')
+
+		if lazy_loader is not None:
+			# Snapshots still on disk have to be in memory to be deleted for good
+			lazy_loader.fault_in([key for (key,) in self.conn.execute('SELECT cache_key FROM subtree_affected_keys').fetchall()])
+
+		deleted_count = self.conn.execute('''
+			DELETE FROM block_cache
+			WHERE object_type = ? AND cache_key IN (SELECT cache_key FROM subtree_affected_keys)
+		''', (self.subtree_type,)).rowcount
+
+		self.conn.execute('DELETE FROM subtree_changed_keys')
+		self.conn.execute('DELETE FROM subtree_affected_keys')
+		return deleted_count
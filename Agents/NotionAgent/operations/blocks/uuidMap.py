@@ -0,0 +1,60 @@
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from tz_common import CustomUUID
+
+
+class UuidMap:
+	"""
+	In-memory copy of UUID <-> int ID pairs of the index, so that lookups of known UUIDs don't touch SQLite.
+
+	Pairs never change once assigned, so the map is only written through on insert and delete, and a miss is
+	looked up in the database by the owner. Reads take no lock: a single dict lookup is atomic.
+	Returned CustomUUID objects are shared and must not be modified.
+	"""
+
+	def __init__(self):
+		self.to_int: Dict[str, int] = {}
+		self.to_uuid: Dict[int, CustomUUID] = {}
+		self.lock = threading.Lock()
+
+
+	def load(self, rows: Iterable[Tuple[int, str]]):
+		"""Replace the contents with (int_id, uuid) rows."""
+		to_int: Dict[str, int] = {}
+		to_uuid: Dict[int, CustomUUID] = {}
+		for int_id, uuid_str in rows:
+			to_int[uuid_str] = int_id
+			to_uuid[int_id] = CustomUUID(value=uuid_str)
+		with self.lock:
+			self.to_int, self.to_uuid = to_int, to_uuid
+
+
+	def get_int(self, uuid_str: str) -> Optional[int]:
+		return self.to_int.get(uuid_str)
+
+
+	def get_uuid(self, int_id: int) -> Optional[CustomUUID]:
+		return self.to_uuid.get(int_id)
+
+
+	def add(self, int_id: int, uuid_str: str, uuid: Optional[CustomUUID] = None):
+		"""
+		Add a pair, uuid is the CustomUUID of uuid_str if the caller already has one.
+		"""
+		uuid = uuid if uuid is not None else CustomUUID(value=uuid_str)
+		with self.lock:
+			# Reverse entry first, so that an int ID found by UUID always resolves back
+			self.to_uuid[int_id] = uuid
+			self.to_int[uuid_str] = int_id
+
+
+	def remove(self, uuid_str: str):
+		with self.lock:
+			int_id = self.to_int.pop(uuid_str, None)
+			if int_id is not None:
+				self.to_uuid.pop(int_id, None)
+
+
+	def __len__(self) -> int:
+		return len(self.to_int)
@@ -0,0 +1,52 @@
+import threading
+from typing import Dict
+
+
+class VisitCounter:
+	"""
+	Visits of pages not yet written to index_data, so that a visit costs no write.
+	The owner takes the pending counts and adds them to the database in one batch.
+	"""
+
+	def __init__(self):
+		self.pending: Dict[int, int] = {}
+		self.lock = threading.Lock()
+
+
+	def add(self, int_id: int, count: int = 1) -> int:
+		"""
+		Returns number of pages with pending visits.
+		"""
+		with self.lock:
+			self.pending[int_id] = self.pending.get(int_id, 0) + count
+			return len(self.pending)
+
+
+	def take(self) -> Dict[int, int]:
+		"""
+		Returns int ID -> number of visits pending since the previous call.
+		"""
+		with self.lock:
+			pending, self.pending = self.pending, {}
+			return pending
+
+
+	def pending_snapshot(self) -> Dict[int, int]:
+		"""
+		Returns a copy of int ID -> number of pending visits, leaving them pending.
+		"""
+		with self.lock:
+			return dict(self.pending)
+
+
+	def restore(self, visits: Dict[int, int]):
+		"""
+		Put back visits that failed to be written.
+		"""
+		with self.lock:
+			for int_id, count in visits.items():
+				self.pending[int_id] = self.pending.get(int_id, 0) + count
+
+
+	def __len__(self) -> int:
+		return len(self.pending)
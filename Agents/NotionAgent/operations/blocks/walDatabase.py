@@ -0,0 +1,41 @@
+import sqlite3
+
+from .sharedMemoryDatabase import SharedMemoryDatabase
+
+
+class WalDatabase(SharedMemoryDatabase):
+	"""
+	SQLite database file opened directly in WAL mode, with the same writer / per-thread reader connections as SharedMemoryDatabase.
+	Every commit is durable, so nothing has to be loaded at start or copied to disk on save.
+	Pages are read through a memory map, so hot data is served from the OS page cache and RAM doesn't grow with the file.
+	"""
+
+	MMAP_SIZE = 256 * 1024 * 1024
+	# Page cache per connection, negative value is in KiB
+	CACHE_SIZE_KB = 8 * 1024
+	BUSY_TIMEOUT_S = 5
+
+	def __init__(self, path: str):
+		self.path = path
+		self._open()
+		self.writer.execute('PRAGMA journal_mode = WAL')
+		# Commits survive a process crash, only an OS crash may lose the last ones
+		self.writer.execute('PRAGMA synchronous = NORMAL')
+		self.writer.execute('PRAGMA temp_store = MEMORY')
+		# Other processes may write to the same file. A transaction that started as a read can't be upgraded
+		# once they committed, so write transactions take the write lock up front and wait for it up to the busy timeout.
+		self.writer.isolation_level = 'IMMEDIATE'
+
+
+	def checkpoint(self, truncate: bool = False):
+		"""
+		Copy committed pages from the WAL file back to the database file. Caller holds the write lock.
+		"""
+		self.writer.execute(f'PRAGMA wal_checkpoint({"TRUNCATE" if truncate else "PASSIVE"})').fetchall()
+
+
+	def _connect(self) -> sqlite3.Connection:
+		conn = sqlite3.connect(self.path, check_same_thread=False, timeout=self.BUSY_TIMEOUT_S)
+		conn.execute(f'PRAGMA mmap_size = {self.MMAP_SIZE}')
+		conn.execute(f'PRAGMA cache_size = -{self.CACHE_SIZE_KB}')
+		return conn
@@ -48,11 +48,21 @@ class APIError(NotionServiceError):
 class HTTPError(APIError):
 	"""Raised when HTTP requests fail with specific status codes."""
 	
-	def __init__(self, operation: str, status_code: int, original_error: Optional[Exception] = None):
+	def __init__(self, operation: str, status_code: int, original_error: Optional[Exception] = None, details: Optional[dict] = None):
 		self.status_code = status_code
+		# Error body returned by the API, if any
+		self.details = details
 		super().__init__(operation, original_error)
 
 
+	def __str__(self) -> str:
+		# Status tells the agent whether the object is missing or not shared with the integration
+		message = f"HTTP {self.status_code} during {self.operation}"
+		if self.details:
+			message += f": {self.details}"
+		return message
+
+
 class ObjectTypeVerificationError(NotionServiceError):
 	"""Raised when object type verification fails."""
 	
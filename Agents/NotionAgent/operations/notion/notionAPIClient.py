@@ -5,7 +5,9 @@ from tz_common import CustomUUID
 from tz_common.logs import log
 
 from .asyncClientManager import AsyncClientManager
+from ..blocks.blockCache import ObjectType
 from ..blocks.blockHolder import BlockHolder
+from ..blocks.negativeCache import NegativeCache
 from ..exceptions import HTTPError
 
 
@@ -15,9 +17,10 @@ class NotionAPIClient:
 	Responsible for making API calls and handling HTTP-level concerns.
 	"""
 
-	def __init__(self, notion_token: str, block_holder: BlockHolder):
+	def __init__(self, notion_token: str, block_holder: BlockHolder, negative_cache: Optional[NegativeCache] = None):
 		self.notion_token = notion_token
 		self.block_holder = block_holder
+		self.negative_cache = negative_cache
 		self.headers = {
 			"Authorization": f"Bearer {self.notion_token}",
 			"Notion-Version": "2022-06-28"
@@ -25,10 +28,37 @@ class NotionAPIClient:
 		self.page_size = 10
 
 
-	def _handle_api_error(self, response, method_name: str) -> None:
+	def _handle_api_error(self, response, method_name: str,
+						  object_id: Optional[Union[str, CustomUUID]] = None, object_type: Optional[ObjectType] = None) -> None:
 		error_dict = self.block_holder.clean_error_message(response.json())
 		log.error(response.status_code, error_dict)
-		raise HTTPError(method_name, response.status_code)
+		error = HTTPError(method_name, response.status_code, details=error_dict)
+		if self.negative_cache is not None and object_id is not None:
+			self.negative_cache.record(object_id, object_type, error)
+		raise error
+
+
+	def _raise_if_unavailable(self, object_id: Union[str, CustomUUID], object_type: ObjectType) -> None:
+		"""
+		Fail without a request if the object was recently reported as missing or not shared.
+		"""
+		if self.negative_cache is None:
+			return
+		error = self.negative_cache.get(object_id, object_type)
+		if error is not None:
+			log.debug(f"Skipping request for unavailable {object_type.value} {object_id}: {error.status_code}")
+			raise error
+
+
+	def _forget_unavailable(self, raw_data: Dict[str, Any]) -> None:
+		"""
+		Objects returned in results are accessible now, even if they were not before.
+		"""
+		if self.negative_cache is None:
+			return
+		for item in raw_data.get("results", []):
+			if "id" in item:
+				self.negative_cache.remove(item["id"])
 
 
 	async def get_page_raw(self, page_id: CustomUUID) -> Dict[str, Any]:
@@ -42,13 +72,14 @@ class NotionAPIClient:
 			Raw page data from API
 		"""
 		url = f"https://api.notion.com/v1/pages/{str(page_id)}"
+		self._raise_if_unavailable(page_id, ObjectType.PAGE)
 		
 		await AsyncClientManager.wait_for_next_request()
 		client = await AsyncClientManager.get_client()
 		response = await client.get(url, headers=self.headers, timeout=30.0)
 		
 		if response.status_code != 200:
-			self._handle_api_error(response, "get_page_raw")
+			self._handle_api_error(response, "get_page_raw", page_id, ObjectType.PAGE)
 		
 		return response.json()
 
@@ -64,13 +95,37 @@ class NotionAPIClient:
 			Raw database data from API
 		"""
 		url = f"https://api.notion.com/v1/databases/{str(database_id)}"
+		self._raise_if_unavailable(database_id, ObjectType.DATABASE)
+		
+		await AsyncClientManager.wait_for_next_request()
+		client = await AsyncClientManager.get_client()
+		response = await client.get(url, headers=self.headers, timeout=30.0)
+		
+		if response.status_code != 200:
+			self._handle_api_error(response, "get_database_raw", database_id, ObjectType.DATABASE)
+		
+		return response.json()
+
+
+	async def get_block_raw(self, block_id: CustomUUID) -> Dict[str, Any]:
+		"""
+		Fetch raw data of a single block, without its children, from Notion API.
+		
+		Args:
+			block_id: UUID of the block to fetch
+			
+		Returns:
+			Raw block data from API
+		"""
+		url = f"https://api.notion.com/v1/blocks/{str(block_id)}"
+		self._raise_if_unavailable(block_id, ObjectType.BLOCK)
 		
 		await AsyncClientManager.wait_for_next_request()
 		client = await AsyncClientManager.get_client()
 		response = await client.get(url, headers=self.headers, timeout=30.0)
 		
 		if response.status_code != 200:
-			self._handle_api_error(response, "get_database_raw")
+			self._handle_api_error(response, "get_block_raw", block_id, ObjectType.BLOCK)
 		
 		return response.json()
 
@@ -90,13 +145,14 @@ class NotionAPIClient:
 		if start_cursor is not None:
 			sc_formatted_uuid = start_cursor.to_formatted()
 			url += f"&start_cursor={sc_formatted_uuid}"
+		self._raise_if_unavailable(block_id, ObjectType.BLOCK)
 		
 		await AsyncClientManager.wait_for_next_request()
 		client = await AsyncClientManager.get_client()
 		response = await client.get(url, headers=self.headers, timeout=30.0)
 		
 		if response.status_code != 200:
-			self._handle_api_error(response, "get_block_children_raw")
+			self._handle_api_error(response, "get_block_children_raw", block_id, ObjectType.BLOCK)
 		
 		return response.json()
 
@@ -139,7 +195,9 @@ class NotionAPIClient:
 		if response.status_code != 200:
 			self._handle_api_error(response, "search_raw")
 		
-		return response.json()
+		raw_data = response.json()
+		self._forget_unavailable(raw_data)
+		return raw_data
 
 
 	async def query_database_raw(self, database_id: CustomUUID, filter_obj: Optional[Dict[str, Any]] = None,
@@ -163,15 +221,18 @@ class NotionAPIClient:
 			payload["filter"] = filter_obj
 		if start_cursor is not None:
 			payload["start_cursor"] = start_cursor.to_formatted()
+		self._raise_if_unavailable(database_id, ObjectType.DATABASE)
 
 		await AsyncClientManager.wait_for_next_request()
 		client = await AsyncClientManager.get_client()
 		response = await client.post(url, headers=self.headers, json=payload)
 
 		if response.status_code != 200:
-			self._handle_api_error(response, "query_database_raw")
+			self._handle_api_error(response, "query_database_raw", database_id, ObjectType.DATABASE)
 		
-		return response.json()
+		raw_data = response.json()
+		self._forget_unavailable(raw_data)
+		return raw_data
 
 
 	def parse_filter(self, filter_input: Optional[Union[dict, str]]) -> Optional[Dict[str, Any]]:
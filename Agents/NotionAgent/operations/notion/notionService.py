@@ -15,6 +15,7 @@ from ..blocks.blockTree import BlockTree
 from ..blocks.blockHolder import BlockHolder
 from ..blocks.blockDict import BlockDict
 from ..blocks.blockManager import BlockManager
+from ..blocks.subtreeSnapshot import SubtreeSnapshot
 from ..exceptions import (
 	NotionServiceError, InvalidUUIDError, BlockTreeRequiredError,
 	CacheRetrievalError, APIError, ObjectTypeVerificationError
@@ -34,7 +35,9 @@ class NotionService:
 				 url_index: UrlIndex,
 				 block_holder: BlockHolder,
 				 block_manager: BlockManager,
-				 landing_page_id: Optional[CustomUUID] = None):
+				 landing_page_id: Optional[CustomUUID] = None,
+				 local_search_count: int = 0,
+				 subtree_snapshot_ttl: int = 0):
 		"""
 		Initialize the NotionService with required dependencies.
 		
@@ -46,6 +49,10 @@ class NotionService:
 			block_holder: Block processing and filtering
 			block_manager: Block management operations
 			landing_page_id: Default page ID when none specified
+			local_search_count: Opt-in: number of cached pages and databases matched by title that search returns without
+				an API call. Such results ignore sort and miss pages not cached yet. 0 always calls the API.
+			subtree_snapshot_ttl: Opt-in: seconds for which a recursive read of a block is served again from a snapshot,
+				without fetching any children. Edits made in Notion meanwhile are not seen. 0 always fetches the children.
 		"""
 		self.api_client = api_client
 		self.cache_orchestrator = cache_orchestrator
@@ -54,6 +61,8 @@ class NotionService:
 		self.block_holder = block_holder
 		self.block_manager = block_manager
 		self.landing_page_id = landing_page_id
+		self.local_search_count = local_search_count
+		self.subtree_snapshot_ttl = subtree_snapshot_ttl
 
 
 	async def get_notion_page_details(self, 
@@ -136,33 +145,23 @@ class NotionService:
 		# Get children UUIDs from cache orchestrator
 		children_custom_uuids = self.cache_orchestrator.get_children_uuids(parent_uuid_obj)
 		
-		# Convert UUIDs to integer IDs
-		children_int_ids_map = {}
-		if children_custom_uuids:
-			conversion_result = self.index.to_int(children_custom_uuids)
-			if isinstance(conversion_result, dict):
-				children_int_ids_map = conversion_result
-			else:
-				log.error(f"Expected dict from self.index.to_int for list, got {type(conversion_result)}")
-
-		children_int_ids_list = list(children_int_ids_map.values())
-
-		# Get cached content for each child (no recursive fetching)
+		# Convert UUIDs to integer IDs and get cached content of all children at once (no recursive fetching)
 		children_content_dict = {}
-		for int_id in children_int_ids_list:
-			# Get the UUID for this int_id
-			child_uuid = self.index.get_uuid(int_id)
-			if child_uuid:
-				# Get cached content using the cache orchestrator method
-				parsed_content = self.cache_orchestrator.get_cached_block_content(child_uuid)
+		if children_custom_uuids:
+			children_int_ids_map, _ = self.index.map_uuids(children_custom_uuids)
+			children_content = self.cache_orchestrator.get_cached_blocks_content(children_custom_uuids)
+
+			for child_uuid in children_custom_uuids:
+				int_id = children_int_ids_map.get(child_uuid)
+				if int_id is None:
+					log.debug(f"Child {child_uuid} is not in the index")
+					continue
+				parsed_content = children_content.get(child_uuid)
 				if parsed_content:
 					children_content_dict[int_id] = parsed_content
 				else:
 					log.debug(f"No cached content found for child {int_id} (UUID: {child_uuid})")
 					children_content_dict[int_id] = {}
-			else:
-				log.error(f"Could not find UUID for int_id {int_id}")
-				children_content_dict[int_id] = {}
 
 		if block_tree is not None and children_custom_uuids:
 			block_tree.add_relationships(parent_uuid_obj, children_custom_uuids)
@@ -178,7 +177,8 @@ class NotionService:
 								   start_cursor: Optional[Union[int, str, CustomUUID]],
 								   all_blocks: BlockDict,
 								   visited_nodes: set,
-								   block_tree: Optional[BlockTree]) -> list:
+								   block_tree: Optional[BlockTree],
+								   snapshot: Optional[SubtreeSnapshot] = None) -> list:
 		"""
 		Private method to process a batch of blocks asynchronously.
 		
@@ -188,6 +188,7 @@ class NotionService:
 			all_blocks: BlockDict to accumulate results
 			visited_nodes: Set of already visited UUIDs
 			block_tree: Optional block tree for relationship tracking
+			snapshot: Optional subtree snapshot to record relationships in
 			
 		Returns:
 			List of new (uuid, is_root) tuples to add to queue for next iteration
@@ -200,8 +201,11 @@ class NotionService:
 				sc_uuid_obj = self.index.resolve_to_uuid(cursor_for_fetch) if cursor_for_fetch else None
 				start_cursor_str = sc_uuid_obj.to_formatted() if sc_uuid_obj else None
 
-				# Directly call the API client
-				raw_children_data = await self.api_client.get_block_children_raw(str(current_uuid), start_cursor_str)
+				# Call the API client, or join the same request made by a concurrent traversal
+				async def fetch_children():
+					return await self.api_client.get_block_children_raw(str(current_uuid), start_cursor_str)
+
+				raw_children_data = await self.cache_orchestrator.fetch_block_children(current_uuid, fetch_children, start_cursor_str)
 				
 				# Process the raw response to get children
 				children_list = raw_children_data.get("results", [])
@@ -211,13 +215,16 @@ class NotionService:
 				# Process and store the batch of children
 				children_uuids = self.block_manager.process_children_batch(children_list, current_uuid)
 				
-				# Collect new children for the queue
+				# Collect new children for the queue, reading their content and IDs in batches
 				new_queue_items = []
-				for child_uuid in children_uuids:
-					if child_uuid not in visited_nodes:
-						child_content = self.cache_orchestrator.get_cached_block_content(child_uuid)
+				unvisited_uuids = list(dict.fromkeys(child_uuid for child_uuid in children_uuids if child_uuid not in visited_nodes))
+				if unvisited_uuids:
+					children_content = self.cache_orchestrator.get_cached_blocks_content(unvisited_uuids)
+					children_int_ids, _ = self.index.map_uuids(unvisited_uuids)
+					for child_uuid in unvisited_uuids:
+						child_content = children_content.get(child_uuid)
 						if child_content:
-							child_int_id = self.index.to_int(child_uuid)
+							child_int_id = children_int_ids.get(child_uuid)
 							if child_int_id:
 								all_blocks.add_block(child_int_id, child_content)
 								visited_nodes.add(child_uuid)
@@ -228,11 +235,15 @@ class NotionService:
 				# Update block tree relationships
 				if block_tree:
 					block_tree.add_relationships(current_uuid, children_uuids)
+				if snapshot is not None:
+					snapshot.add_edges(current_uuid, children_uuids)
 				
 				return new_queue_items
 
 			except Exception as e:
 				log.error(f"Error fetching or processing children for block {current_uuid}: {e}")
+				if snapshot is not None:
+					snapshot.complete = False
 				# Return empty list to continue processing other blocks
 				return []
 
@@ -249,6 +260,8 @@ class NotionService:
 				new_queue_items.extend(result)
 			elif isinstance(result, Exception):
 				log.error(f"Exception in batch processing: {result}")
+				if snapshot is not None:
+					snapshot.complete = False
 		
 		return new_queue_items
 
@@ -276,8 +289,18 @@ class NotionService:
 		if uuid_obj is None:
 			raise InvalidUUIDError(str(block_id))
 
+		# If enabled, a repeated read of the whole subtree is served at once, unless anything under the root was refetched since
+		use_snapshot = start_cursor is None and self.subtree_snapshot_ttl > 0
+		if use_snapshot:
+			cached_snapshot = self.cache_orchestrator.get_cached_subtree(uuid_obj)
+			if cached_snapshot is not None:
+				cached_snapshot.apply_to_tree(block_tree)
+				log.flow(f"Served {len(cached_snapshot.blocks)} blocks under {uuid_obj} from subtree snapshot")
+				return cached_snapshot.blocks
+
 		# Initialize result BlockDict and the processing queue
 		all_blocks = BlockDict()
+		snapshot = SubtreeSnapshot(uuid_obj, all_blocks) if use_snapshot else None
 		queue = deque([(uuid_obj, True)]) # (uuid, is_root)
 		visited_nodes = {uuid_obj}
 
@@ -308,13 +331,15 @@ class NotionService:
 			
 			# Process the entire batch asynchronously
 			new_queue_items = await self._process_block_batch(
-				current_batch, start_cursor, all_blocks, visited_nodes, block_tree
+				current_batch, start_cursor, all_blocks, visited_nodes, block_tree, snapshot
 			)
 			
 			# Add new items to the queue for the next iteration
 			queue.extend(new_queue_items)
 		
 		log.flow(f"Completed recursive block fetching. Total blocks retrieved: {len(all_blocks.to_dict())}")
+		if snapshot is not None and snapshot.complete:
+			self.cache_orchestrator.cache_subtree(snapshot, self.subtree_snapshot_ttl)
 		return all_blocks
 
 
@@ -351,22 +376,29 @@ class NotionService:
 		if cached_result is not None:
 			return cached_result
 
-		try:
-			# Fetch from API
+		# Then, if enabled, titles of cached pages and databases, which need no API call. Later pages of results come from the API only.
+		if start_cursor_uuid is None and self.local_search_count > 0:
+			local_result = self.cache_orchestrator.get_cached_title_matches(query, filter_type, self.local_search_count)
+			if local_result is not None:
+				log.flow(f"Found {len(local_result)} known pages matching the query")
+				return local_result
+
+		async def fetch_search_results():
 			raw_results = await self.api_client.search_raw(query, filter_type, start_cursor_str, sort)
-			
-			# Process and cache results
-			ttl = 30 * 24 * 60 * 60  # 30 days
-			result = await self.cache_orchestrator.cache_search_results(
-				query, raw_results, filter_type, start_cursor_uuid, ttl
-			)
-			
+
 			if len(raw_results.get("results", [])) > 0:
 				log.flow(f"Found {len(raw_results['results'])} search results")
 			else:
 				log.flow("No search results found for this query")
 
-			return result
+			return raw_results
+
+		try:
+			# Fetch from API, or join the same search in flight, and cache results
+			ttl = 30 * 24 * 60 * 60  # 30 days
+			return await self.cache_orchestrator.fetch_search_results(
+				query, fetch_search_results, filter_type, start_cursor_uuid, ttl
+			)
 
 		except Exception as e:
 			raise APIError("search_notion", e)
@@ -423,16 +455,14 @@ class NotionService:
 		if cached_result is not None:
 			return cached_result
 
+		async def fetch_query_results():
+			return await self.api_client.query_database_raw(str(db_uuid), filter_obj, start_cursor_str)
+
 		try:
-			# Fetch from API
-			raw_results = await self.api_client.query_database_raw(str(db_uuid), filter_obj, start_cursor_str)
-			
-			# Process and cache results
-			result = await self.cache_orchestrator.cache_database_query_results(
-				db_uuid, raw_results, cache_filter_key, start_cursor_uuid
+			# Fetch from API, or join the same query in flight, and cache results
+			return await self.cache_orchestrator.fetch_database_query_results(
+				db_uuid, fetch_query_results, cache_filter_key, start_cursor_uuid
 			)
-			
-			return result
 
 		except Exception as e:
 			raise APIError("query_database", e) 
\ No newline at end of file
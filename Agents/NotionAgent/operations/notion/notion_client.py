@@ -1,6 +1,6 @@
 from dotenv import load_dotenv
 import os
-from typing import Optional, Union
+from typing import Dict, Optional, Union
 
 from tz_common import CustomUUID
 from tz_common.logs import log, LogLevel
@@ -8,12 +8,15 @@ from tz_common.logs import log, LogLevel
 from .asyncClientManager import AsyncClientManager
 from ..blocks.index import Index
 from ..urlIndex import UrlIndex
-from ..blocks.blockCache import BlockCache
+from ..blocks.blockCache import BlockCache, ObjectType
 from ..blocks.blockTree import BlockTree
 from ..blocks.blockHolder import BlockHolder
 from ..blocks.blockDict import BlockDict
 from ..blocks.blockManager import BlockManager
-from ..blocks.cacheOrchestrator import CacheOrchestrator
+from ..blocks.filteredViewCache import FilteredViewCache
+from ..blocks.cacheOrchestrator import CacheOrchestrator, StalePolicy, parse_stale_policies
+from ..blocks.changeJournal import PersistenceMode
+from ..blocks.negativeCache import NegativeCache
 from .notionAPIClient import NotionAPIClient
 from .notionService import NotionService
 
@@ -22,6 +25,22 @@ log.set_log_level(LogLevel.FLOW)
 
 NOTION_TOKEN = os.getenv("NOTION_TOKEN")
 NOTION_LANDING_PAGE_ID = os.getenv("NOTION_LANDING_PAGE_ID")
+# "incremental", "snapshot" or "wal"
+NOTION_CACHE_PERSISTENCE = os.getenv("NOTION_CACHE_PERSISTENCE", PersistenceMode.INCREMENTAL.value)
+# Load cached objects from disk on first access instead of at start
+NOTION_CACHE_LAZY_LOAD = os.getenv("NOTION_CACHE_LAZY_LOAD", "false").lower() == "true"
+# Several processes, ie. REST server workers, work on the same cache files. Requires "wal" persistence.
+NOTION_CACHE_SHARED = os.getenv("NOTION_CACHE_SHARED", "false").lower() == "true"
+# Seconds for which recursive reads of a block are served from a snapshot without refetching its children, 0 to disable
+NOTION_SUBTREE_SNAPSHOT_TTL = int(os.getenv("NOTION_SUBTREE_SNAPSHOT_TTL", "0"))
+# Number of cached pages and databases matched by title that search returns without calling the API, 0 to disable
+NOTION_LOCAL_SEARCH_COUNT = int(os.getenv("NOTION_LOCAL_SEARCH_COUNT", "0"))
+# Object types served stale while they are refetched, as "object_type:ttl:grace" separated by commas, ie. "page:600:86400"
+NOTION_STALE_POLICIES = os.getenv("NOTION_STALE_POLICIES", "")
+# Seconds a read of a stale object waits for the fresh copy before serving the stale one
+NOTION_REVALIDATION_TIMEOUT = float(os.getenv("NOTION_REVALIDATION_TIMEOUT", "1.0"))
+# Number of favourites and most visited pages loaded in the background with lazy loading
+PREWARM_COUNT = 20
 
 class NotionClient:
 	"""
@@ -33,7 +52,11 @@ class NotionClient:
 				 notion_token=NOTION_TOKEN,
 				 landing_page_id=NOTION_LANDING_PAGE_ID,
 				 load_from_disk=True,
-				 run_on_start=True):
+				 run_on_start=True,
+				 persistence_mode: PersistenceMode = PersistenceMode(NOTION_CACHE_PERSISTENCE),
+				 lazy_load: bool = NOTION_CACHE_LAZY_LOAD,
+				 shared: bool = NOTION_CACHE_SHARED,
+				 stale_policies: Optional[Dict[ObjectType, StalePolicy]] = None):
 		
 		raw_landing_page_id = landing_page_id
 		if raw_landing_page_id:
@@ -42,17 +65,27 @@ class NotionClient:
 			self.landing_page_id = None
 		
 		self.notion_token = notion_token
+		if stale_policies is None:
+			stale_policies = parse_stale_policies(NOTION_STALE_POLICIES)
 
 		# Initialize core components
-		self.index = Index(load_from_disk=load_from_disk, run_on_start=run_on_start)
-		self.cache = BlockCache(load_from_disk=load_from_disk, run_on_start=run_on_start)
+		self.index = Index(load_from_disk=load_from_disk, run_on_start=run_on_start, persistence_mode=persistence_mode)
+		self.cache = BlockCache(load_from_disk=load_from_disk, run_on_start=run_on_start, persistence_mode=persistence_mode, lazy_load=lazy_load, shared=shared)
+		if lazy_load:
+			self.cache.prewarm(self.index.get_favourites(PREWARM_COUNT) + self.index.get_most_visited(PREWARM_COUNT))
 		self.url_index = UrlIndex()
 		self.block_holder = BlockHolder(self.url_index)
 		self.block_manager = BlockManager(self.index, self.cache, self.block_holder)
+		# Filtered views live only as long as the parsed content they were made from
+		self.filtered_views = FilteredViewCache(self.block_holder)
+		self.cache.parsed_cache.on_evict = self.filtered_views.discard
+		# Shared, so that objects missing for the API client are skipped by the orchestrator as well
+		self.negative_cache = NegativeCache()
 		
 		# Initialize service layer components
-		self.api_client = NotionAPIClient(self.notion_token, self.block_holder)
-		self.cache_orchestrator = CacheOrchestrator(self.cache, self.block_manager, self.index)
+		self.api_client = NotionAPIClient(self.notion_token, self.block_holder, negative_cache=self.negative_cache)
+		self.cache_orchestrator = CacheOrchestrator(self.cache, self.block_manager, self.index,
+			negative_cache=self.negative_cache, stale_policies=stale_policies, revalidation_timeout=NOTION_REVALIDATION_TIMEOUT)
 		
 		# Initialize the main service
 		self.service = NotionService(
@@ -62,7 +95,9 @@ class NotionClient:
 			url_index=self.url_index,
 			block_holder=self.block_holder,
 			block_manager=self.block_manager,
-			landing_page_id=self.landing_page_id
+			landing_page_id=self.landing_page_id,
+			local_search_count=NOTION_LOCAL_SEARCH_COUNT,
+			subtree_snapshot_ttl=NOTION_SUBTREE_SNAPSHOT_TTL
 		)
 
 	async def __aenter__(self):
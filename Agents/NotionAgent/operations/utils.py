@@ -13,6 +13,14 @@ class Utils:
 		return datetime.strptime(date, "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc).timestamp()
 
 
+	@staticmethod
+	def convert_isoformat_to_epoch_ms(date: str) -> int:
+		parsed = datetime.fromisoformat(date.replace("Z", "+00:00"))
+		if parsed.tzinfo is None:
+			parsed = parsed.replace(tzinfo=timezone.utc)
+		return round(parsed.timestamp() * 1000)
+
+
 	@staticmethod
 	def extract_notion_id(url):
 		if url is None:
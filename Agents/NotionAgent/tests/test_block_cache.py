@@ -1,5 +1,7 @@
+import threading
 import time
 import unittest
+import uuid
 
 from tz_common import CustomUUID
 
@@ -100,6 +102,48 @@ class TestBlockCache(unittest.TestCase):
 		self.assertIsNone(self.cache.get_block(TEST_CHILD_BLOCK_UUID_1))
 		self.assertIsNone(self.cache.get_block(TEST_CHILD_BLOCK_UUID_2))
 
+	def test_invalidation_stops_at_child_page(self):
+		# Child page is listed as a block of its parent, and also cached as a page with its own content
+		self.cache.add_page(TEST_PAGE_UUID, "page_content")
+		self.cache.add_block(TEST_BLOCK_UUID, "child_page_block", parent_uuid=TEST_PAGE_UUID, parent_type=ObjectType.PAGE)
+		self.cache.add_page(TEST_BLOCK_UUID, "child_page_content")
+		self.cache.add_block(TEST_CHILD_BLOCK_UUID_1, "child_page_paragraph", parent_uuid=TEST_BLOCK_UUID, parent_type=ObjectType.PAGE)
+
+		self.cache.invalidate_page_if_expired(TEST_PAGE_UUID, "2999-01-01T00:00:00.000Z")
+
+		self.assertIsNone(self.cache.get_page(TEST_PAGE_UUID))
+		self.assertIsNone(self.cache.get_block(TEST_BLOCK_UUID))
+		self.assertEqual(self.cache.get_page(TEST_BLOCK_UUID), "child_page_content")
+		self.assertEqual(self.cache.get_block(TEST_CHILD_BLOCK_UUID_1), "child_page_paragraph")
+		self.assertEqual(len(self.cache.get_children_uuids(TEST_BLOCK_UUID)), 1)
+		self.assertEqual(len(self.cache.get_children_uuids(TEST_PAGE_UUID)), 0)
+
+	def test_invalidation_with_relationship_cycle(self):
+		self.cache.add_block(TEST_UUID_1, "content1")
+		self.cache.add_block(TEST_UUID_2, "content2", parent_uuid=TEST_UUID_1)
+		self.cache.add_parent_child_relationship(TEST_UUID_2, TEST_UUID_1, ObjectType.BLOCK)
+
+		self.assertTrue(self.cache.invalidate_block_if_expired(TEST_UUID_1, "2999-01-01T00:00:00.000Z"))
+
+		self.assertIsNone(self.cache.get_block(TEST_UUID_1))
+		self.assertIsNone(self.cache.get_block(TEST_UUID_2))
+		self.cache.cursor.execute('SELECT COUNT(*) FROM block_relationships')
+		self.assertEqual(self.cache.cursor.fetchone()[0], 0)
+
+	def test_invalidation_of_deeply_nested_blocks(self):
+		# Deeper than the default Python recursion limit
+		chain = [str(uuid.uuid4()) for _ in range(1500)]
+		self.cache.add_page(TEST_PAGE_UUID, "page_content")
+		self.cache.add_blocks_bulk([(chain[0], "content")], parent_uuid=TEST_PAGE_UUID, parent_type=ObjectType.PAGE, mark_children_fetched=True)
+		for parent, child in zip(chain, chain[1:]):
+			self.cache.add_blocks_bulk([(child, "content")], parent_uuid=parent, mark_children_fetched=True)
+
+		self.cache.invalidate_page_if_expired(TEST_PAGE_UUID, "2999-01-01T00:00:00.000Z")
+
+		for table in ['block_cache', 'block_relationships', 'children_fetched_for_block']:
+			self.cache.cursor.execute(f'SELECT COUNT(*) FROM {table}')
+			self.assertEqual(self.cache.cursor.fetchone()[0], 0, table)
+
 	def test_invalidate_page_if_expired(self):
 		# Use the same timestamp format as _add_block_internal
 		current_time = Utils.get_current_time_isoformat()
@@ -146,6 +190,84 @@ class TestBlockCache(unittest.TestCase):
 		self.assertIn(CustomUUID.from_string(child_uuid1).value, children_str)
 		self.assertIn(CustomUUID.from_string(child_uuid2).value, children_str)
 
+	def test_add_blocks_bulk(self):
+		blocks = [(TEST_CHILD_BLOCK_UUID_1, "child_content_1"), (TEST_CHILD_BLOCK_UUID_2, "child_content_2")]
+		self.cache.add_blocks_bulk(blocks, parent_uuid=TEST_PAGE_UUID, parent_type=ObjectType.PAGE, mark_children_fetched=True)
+
+		self.assertEqual(self.cache.get_block(TEST_CHILD_BLOCK_UUID_1), "child_content_1")
+		self.assertEqual(self.cache.get_block(TEST_CHILD_BLOCK_UUID_2), "child_content_2")
+
+		parent_key = self.cache.create_cache_key(TEST_PAGE_UUID, ObjectType.PAGE)
+		self.assertTrue(self.cache.get_children_fetched_for_block(parent_key))
+
+		children_str = [str(c) for c in self.cache.get_children_uuids(TEST_PAGE_UUID)]
+		self.assertEqual(len(children_str), 2)
+		self.assertIn(CustomUUID.from_string(TEST_CHILD_BLOCK_UUID_1).value, children_str)
+		self.assertIn(CustomUUID.from_string(TEST_CHILD_BLOCK_UUID_2).value, children_str)
+
+	def test_add_relationships_bulk(self):
+		search_key = self.cache.create_search_results_cache_key("query")
+		child_key = self.cache.create_cache_key(TEST_PAGE_UUID, ObjectType.PAGE)
+
+		# Duplicates are ignored
+		self.cache.add_relationships_bulk([(search_key, child_key), (search_key, child_key)])
+
+		self.cache.cursor.execute(f'SELECT COUNT(*) FROM block_relationships WHERE parent_id = {BlockCache.KEY_ID_SQL}', (search_key,))
+		self.assertEqual(self.cache.cursor.fetchone()[0], 1)
+
+	def test_get_parsed_reuses_parsed_object(self):
+		self.cache.add_page(TEST_PAGE_UUID, '{"object": "page", "title": "Test"}')
+
+		first = self.cache.get_page_parsed(TEST_PAGE_UUID)
+		second = self.cache.get_page_parsed(TEST_PAGE_UUID)
+
+		self.assertEqual(first, {"object": "page", "title": "Test"})
+		self.assertIs(first, second)
+		self.assertEqual(self.cache.get_metrics()["hits"], 2)
+
+	def test_get_blocks_parsed_reads_in_batch(self):
+		self.cache.add_block(TEST_UUID_1, '{"value": 1}')
+		self.cache.add_block(TEST_UUID_2, '{"value": 2}')
+		self.cache.add_block(TEST_UUID_3, '{"value": 3}', ttl=1)
+		self.cache.cursor.execute('UPDATE block_cache SET expires_at_ms = 0 WHERE cache_key = ?', (self.cache.create_cache_key(TEST_UUID_3, ObjectType.BLOCK),))
+		self.cache.conn.commit()
+		self.cache.parsed_cache.clear()
+		first = self.cache.get_block_parsed(TEST_UUID_1)
+
+		uuids = [CustomUUID.from_string(uuid) for uuid in [TEST_UUID_1, TEST_UUID_2, TEST_UUID_3, TEST_BLOCK_UUID]]
+		blocks = self.cache.get_blocks_parsed(uuids)
+
+		self.assertEqual(blocks, {uuids[0]: {"value": 1}, uuids[1]: {"value": 2}})
+		self.assertIs(blocks[uuids[0]], first)
+		self.assertIs(self.cache.get_block_parsed(TEST_UUID_2), blocks[uuids[1]])
+		# Expired row is dropped like on a single read
+		self.assertIsNone(self.cache.get_block(TEST_UUID_3))
+		metrics = self.cache.get_metrics()
+		self.assertEqual(metrics["hits:block"], 4)
+		self.assertEqual(metrics["misses_expired:block"], 1)
+		self.assertEqual(metrics["misses_not_found:block"], 2)
+
+	def test_parsed_cache_evicted_on_write_and_invalidation(self):
+		self.cache.add_block(TEST_BLOCK_UUID, '{"version": 1}')
+		self.assertEqual(self.cache.get_block_parsed(TEST_BLOCK_UUID), {"version": 1})
+
+		self.cache.add_block(TEST_BLOCK_UUID, '{"version": 2}')
+		self.assertEqual(self.cache.get_block_parsed(TEST_BLOCK_UUID), {"version": 2})
+
+		self.cache.invalidate_block_if_expired(TEST_BLOCK_UUID, "9999-01-01T00:00:00.000000Z")
+		self.assertEqual(len(self.cache.parsed_cache), 0)
+		self.assertIsNone(self.cache.get_block_parsed(TEST_BLOCK_UUID))
+
+	def test_parsed_cache_respects_ttl(self):
+		self.cache.add_block(TEST_UUID_1, '{"value": 1}', ttl=1)
+		self.assertEqual(self.cache.get_block_parsed(TEST_UUID_1), {"value": 1})
+
+		time.sleep(2)
+
+		self.assertIsNone(self.cache.get_block_parsed(TEST_UUID_1))
+		self.assertEqual(len(self.cache.parsed_cache), 0)
+		self.assertEqual(self.cache.get_metrics()["misses_expired"], 1)
+
 	def test_cache_metrics_hit(self):
 		# Add a block to the cache
 		self.cache.add_block(TEST_UUID_1, "test_content")
@@ -236,6 +358,258 @@ class TestBlockCache(unittest.TestCase):
 		self.assertEqual(metrics["misses_expired"], 2)
 		self.assertEqual(metrics["misses_not_found"], 1)
 
+	def test_cache_metrics_per_object_type(self):
+		self.cache.add_page(TEST_PAGE_UUID, "page_content")
+		self.cache.get_page(TEST_PAGE_UUID)
+		self.cache.get_block(TEST_BLOCK_UUID)
+
+		metrics = self.cache.get_metrics()
+		self.assertEqual(metrics["hits:page"], 1)
+		self.assertEqual(metrics["misses_not_found:block"], 1)
+		self.assertEqual(metrics["latency_ms"]["get"]["count"], 2)
+		self.assertEqual(metrics["latency_ms"]["put"]["count"], 1)
+
+	def test_cache_metrics_reads_do_not_write(self):
+		self.cache.add_block(TEST_UUID_1, "test_content")
+		self.cache.clean()
+
+		self.cache.get_block(TEST_UUID_1)
+		self.cache.get_block(TEST_UUID_2)
+
+		self.assertFalse(self.cache.is_dirty())
+		self.cache.cursor.execute("SELECT count FROM cache_metrics WHERE metric_type = 'hits'")
+		self.assertEqual(self.cache.cursor.fetchone()[0], 0)
+
+		# Counters are folded into the table on save
+		self.cache._flush_metrics()
+		self.cache.cursor.execute("SELECT count FROM cache_metrics WHERE metric_type = 'hits'")
+		self.assertEqual(self.cache.cursor.fetchone()[0], 1)
+		self.assertEqual(self.cache.get_metrics()["hits"], 1)
+
+	def test_access_is_tracked_without_writes(self):
+		self.cache.add_block(TEST_UUID_1, "content1")
+		self.cache.clean()
+
+		self.cache.get_block(TEST_UUID_1)
+		self.cache.get_block_parsed(TEST_UUID_1)
+		self.assertFalse(self.cache.is_dirty())
+
+		self.cache._flush_access()
+		self.cache.cursor.execute('SELECT access_count, last_access_ms >= timestamp_ms FROM block_cache')
+		self.assertEqual(self.cache.cursor.fetchone(), (2, 1))
+
+	def test_evict_to_budget_keeps_recently_used(self):
+		self.cache.size_budgets[ObjectType.BLOCK] = 25
+		self.cache.add_block(TEST_UUID_1, "0123456789")
+		self.cache.add_block(TEST_UUID_2, "0123456789")
+		self.cache.add_page(TEST_PAGE_UUID, "0123456789" * 10)
+		self.cache.cursor.execute('UPDATE block_cache SET last_access_ms = 0')
+		self.cache.conn.commit()
+
+		# Fits the budget, nothing to evict
+		self.assertEqual(self.cache.evict_to_budget(), 0)
+
+		self.cache.get_block(TEST_UUID_1)
+		self.cache.add_block(TEST_UUID_3, "0123456789")
+
+		self.assertEqual(self.cache.evict_to_budget(), 1)
+		self.assertIsNone(self.cache.get_block(TEST_UUID_2))
+		self.assertIsNotNone(self.cache.get_block(TEST_UUID_1))
+		self.assertIsNotNone(self.cache.get_block(TEST_UUID_3))
+		# Other object types have their own budgets
+		self.assertIsNotNone(self.cache.get_page(TEST_PAGE_UUID))
+
+	def test_eviction_removes_dependent_rows(self):
+		self.cache.size_budgets[ObjectType.BLOCK] = 15
+		self.cache.add_page(TEST_PAGE_UUID, "page_content")
+		self.cache.add_blocks_bulk([(TEST_CHILD_BLOCK_UUID_1, "0123456789")], parent_uuid=TEST_PAGE_UUID, parent_type=ObjectType.PAGE, mark_children_fetched=True)
+		self.cache.add_blocks_bulk([(TEST_CHILD_BLOCK_UUID_2, "0123456789")], parent_uuid=TEST_CHILD_BLOCK_UUID_1, mark_children_fetched=True)
+		self.cache.get_block(TEST_CHILD_BLOCK_UUID_2)
+
+		self.assertEqual(self.cache.evict_to_budget(), 1)
+
+		page_key = self.cache.create_cache_key(TEST_PAGE_UUID, ObjectType.PAGE)
+		child_key = self.cache.create_cache_key(TEST_CHILD_BLOCK_UUID_1, ObjectType.BLOCK)
+		self.assertIsNone(self.cache.get_block(TEST_CHILD_BLOCK_UUID_1))
+		# Parent has to fetch its children again
+		self.assertFalse(self.cache.get_children_fetched_for_block(page_key))
+		self.assertFalse(self.cache.get_children_fetched_for_block(child_key))
+		self.cache.cursor.execute('SELECT COUNT(*) FROM block_relationships')
+		self.assertEqual(self.cache.cursor.fetchone()[0], 0)
+
+	def test_sweep_expired_removes_rows_in_bulk(self):
+		self.cache.add_block(TEST_PAGE_UUID, "page_block")
+		self.cache.add_blocks_bulk([(TEST_UUID_1, "content1"), (TEST_UUID_2, "content2")], ttl=3600, parent_uuid=TEST_PAGE_UUID, mark_children_fetched=True)
+		self.cache.add_block(TEST_UUID_3, "content3", ttl=3600)
+		page_key = self.cache.create_cache_key(TEST_PAGE_UUID, ObjectType.BLOCK)
+		child_keys = [self.cache.create_cache_key(uuid_str, ObjectType.BLOCK) for uuid_str in [TEST_UUID_1, TEST_UUID_2]]
+
+		# Move expiry of the bulk-added children to the past
+		self.cache.cursor.execute('UPDATE block_cache SET expires_at_ms = 0 WHERE cache_key IN (?, ?)', child_keys)
+		self.cache.conn.commit()
+
+		self.assertEqual(self.cache.sweep_expired(), 2)
+		self.assertEqual(self.cache.sweep_expired(), 0)
+
+		self.assertIsNone(self.cache.get_block(TEST_UUID_1))
+		self.assertEqual(self.cache.get_block(TEST_UUID_3), "content3")
+		self.assertEqual(self.cache.get_block(TEST_PAGE_UUID), "page_block")
+		self.assertFalse(self.cache.get_children_fetched_for_block(page_key))
+		# Swept objects are removed, not counted as misses
+		self.assertEqual(self.cache.get_metrics()["misses_expired"], 0)
+		# Relationships were swept with the children, so their key IDs are released
+		self.cache.cursor.execute('SELECT cache_key FROM cache_keys')
+		self.assertEqual({key for (key,) in self.cache.cursor.fetchall()}, set())
+
+	def expire_page(self, uuid_str: str, expired_for_ms: int):
+		cache_key = self.cache.create_cache_key(uuid_str, ObjectType.PAGE)
+		self.cache.cursor.execute('UPDATE block_cache SET expires_at_ms = ? WHERE cache_key = ?', (int(time.time() * 1000) - expired_for_ms, cache_key))
+		self.cache.conn.commit()
+		self.cache.parsed_cache.clear()
+
+	def test_stale_policy_sets_default_ttl(self):
+		self.cache.set_stale_policy(ObjectType.PAGE, ttl=60, grace=3600)
+		self.cache.add_page(TEST_PAGE_UUID, '{"object": "page"}')
+		self.cache.add_page(TEST_UUID_1, '{"object": "page"}', ttl=7200)
+		self.cache.add_block(TEST_UUID_2, "block")
+
+		self.cache.cursor.execute('SELECT object_type, ttl FROM block_cache ORDER BY ttl')
+		self.assertEqual(self.cache.cursor.fetchall(), [(ObjectType.BLOCK.value, None), (ObjectType.PAGE.value, 60), (ObjectType.PAGE.value, 7200)])
+
+	def test_stale_content_is_served_within_grace(self):
+		self.cache.set_stale_policy(ObjectType.PAGE, ttl=60, grace=3600)
+		self.cache.add_page(TEST_PAGE_UUID, '{"object": "page"}')
+
+		self.assertEqual(self.cache.get_parsed_allow_stale(TEST_PAGE_UUID, ObjectType.PAGE), ({"object": "page"}, False))
+
+		self.expire_page(TEST_PAGE_UUID, 1000)
+		# Plain reads treat it as expired, but keep it
+		self.assertIsNone(self.cache.get_page_parsed(TEST_PAGE_UUID))
+		self.assertEqual(self.cache.get_parsed_allow_stale(TEST_PAGE_UUID, ObjectType.PAGE), ({"object": "page"}, True))
+		# Served from the parsed copy as well
+		self.assertEqual(self.cache.get_parsed_allow_stale(TEST_PAGE_UUID, ObjectType.PAGE), ({"object": "page"}, True))
+		self.assertEqual(self.cache.sweep_expired(), 0)
+		self.assertEqual(self.cache.get_metrics()["stale_hits"], 2)
+
+	def test_stale_content_past_grace_is_dropped(self):
+		self.cache.set_stale_policy(ObjectType.PAGE, ttl=60, grace=10)
+		self.cache.add_page(TEST_PAGE_UUID, '{"object": "page"}')
+		self.cache.add_page(TEST_UUID_1, '{"object": "page"}')
+
+		self.expire_page(TEST_PAGE_UUID, 11000)
+		self.expire_page(TEST_UUID_1, 11000)
+
+		self.assertEqual(self.cache.get_parsed_allow_stale(TEST_PAGE_UUID, ObjectType.PAGE), (None, False))
+		self.assertEqual(self.cache.sweep_expired(), 1)
+		self.assertIsNone(self.cache.get_page(TEST_UUID_1))
+
+	def test_unchanged_content_extends_stale_policy_ttl(self):
+		self.cache.set_stale_policy(ObjectType.PAGE, ttl=60, grace=3600)
+		self.cache.add_page(TEST_PAGE_UUID, '{"object": "page"}')
+		self.expire_page(TEST_PAGE_UUID, 1000)
+
+		self.cache.add_page(TEST_PAGE_UUID, '{"object": "page"}')
+
+		self.assertEqual(self.cache.get_parsed_allow_stale(TEST_PAGE_UUID, ObjectType.PAGE), ({"object": "page"}, False))
+
+	def test_check_if_expired_accepts_iso_variants(self):
+		self.cache.add_block(TEST_UUID_1, "content1")
+		cache_key = self.cache.create_cache_key(TEST_UUID_1, ObjectType.BLOCK)
+
+		for last_update_time in ["2999-01-01T00:00:00.000Z", "2999-01-01T00:00:00Z", "2999-01-01T00:00:00+00:00"]:
+			self.assertTrue(self.cache.check_if_expired(cache_key, ObjectType.BLOCK, last_update_time), last_update_time)
+		for last_update_time in ["2000-01-01T00:00:00.000Z", "2000-01-01T00:00:00Z", "2000-01-01T02:00:00+02:00"]:
+			self.assertFalse(self.cache.check_if_expired(cache_key, ObjectType.BLOCK, last_update_time), last_update_time)
+
+	def test_get_blocks_updated_since(self):
+		self.cache.add_block(TEST_UUID_1, "content1")
+		cache_key = self.cache.create_cache_key(TEST_UUID_1, ObjectType.BLOCK)
+		self.assertEqual([row[0] for row in self.cache.get_blocks_updated_since("2000-01-01T00:00:00Z")], [cache_key])
+		self.assertEqual(self.cache.get_blocks_updated_since("2999-01-01T00:00:00.000Z"), [])
+
+	def test_concurrent_reads_and_writes(self):
+		keys = [str(uuid.uuid4()) for _ in range(50)]
+		self.cache.add_blocks_bulk([(key, "content") for key in keys])
+		errors = []
+
+		def reader():
+			try:
+				for _ in range(5):
+					for key in keys:
+						self.assertIsNotNone(self.cache.get_block(key))
+						self.cache.get_block_parsed(key)
+			except Exception as e:
+				errors.append(e)
+
+		def writer():
+			try:
+				for key in keys:
+					self.cache.add_block(key, "updated")
+			except Exception as e:
+				errors.append(e)
+
+		threads = [threading.Thread(target=reader) for _ in range(4)] + [threading.Thread(target=writer)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+
+		self.assertEqual(errors, [])
+		self.assertEqual(self.cache.get_block(keys[-1]), "updated")
+
+	def test_unchanged_content_is_not_rewritten(self):
+		self.cache.add_block(TEST_UUID_1, '{"value": 1}')
+		parsed = self.cache.get_block_parsed(TEST_UUID_1)
+		self.cache.clean()
+
+		self.cache.add_block(TEST_UUID_1, '{"value": 1}')
+		self.cache.add_blocks_bulk([(TEST_UUID_1, '{"value": 1}')])
+
+		self.assertFalse(self.cache.is_dirty())
+		# Parsed copy is still valid
+		self.assertIs(self.cache.get_block_parsed(TEST_UUID_1), parsed)
+		self.assertEqual(self.cache.get_metrics()["unchanged_writes:block"], 2)
+
+		self.cache.add_block(TEST_UUID_1, '{"value": 2}')
+		self.assertTrue(self.cache.is_dirty())
+		self.assertEqual(self.cache.get_block_parsed(TEST_UUID_1), {"value": 2})
+
+	def test_unchanged_content_extends_ttl(self):
+		self.cache.add_block(TEST_UUID_1, "content1", ttl=60)
+		cache_key = self.cache.create_cache_key(TEST_UUID_1, ObjectType.BLOCK)
+		self.cache.cursor.execute('UPDATE block_cache SET expires_at_ms = 1 WHERE cache_key = ?', (cache_key,))
+		self.cache.conn.commit()
+		self.cache.clean()
+
+		self.cache.add_block(TEST_UUID_1, "content1", ttl=60)
+
+		self.assertFalse(self.cache.is_dirty())
+		self.assertEqual(self.cache.get_block(TEST_UUID_1), "content1")
+
+	def test_bulk_add_stores_only_changed_blocks(self):
+		self.cache.add_blocks_bulk([(TEST_UUID_1, "content1"), (TEST_UUID_2, "content2")], parent_uuid=TEST_PAGE_UUID, mark_children_fetched=True)
+		self.cache.clean()
+
+		self.cache.add_blocks_bulk([(TEST_UUID_1, "content1"), (TEST_UUID_2, "content2")], parent_uuid=TEST_PAGE_UUID, mark_children_fetched=True)
+		self.assertFalse(self.cache.is_dirty())
+
+		self.cache.add_blocks_bulk([(TEST_UUID_1, "content1"), (TEST_UUID_2, "changed")], parent_uuid=TEST_PAGE_UUID, mark_children_fetched=True)
+		self.assertTrue(self.cache.is_dirty())
+		self.assertEqual(self.cache.get_block(TEST_UUID_2), "changed")
+		self.assertEqual(self.cache.get_metrics()["unchanged_writes"], 3)
+
+	def test_large_content_is_compressed(self):
+		content = '{"results": [' + ", ".join(['{"object": "block", "plain_text": "repeated text"}'] * 100) + ']}'
+		self.cache.add_block(TEST_UUID_1, content)
+
+		self.cache.cursor.execute('SELECT typeof(content), size FROM block_cache')
+		stored_type, size = self.cache.cursor.fetchone()
+		self.assertEqual(stored_type, "blob")
+		self.assertLess(size, len(content))
+
+		self.assertEqual(self.cache.get_block(TEST_UUID_1), content)
+		self.assertEqual(self.cache.get_block_parsed(TEST_UUID_1)["results"][0]["plain_text"], "repeated text")
+
 	def test_database_caching_with_object_type(self):
 		"""Test that databases are cached with correct object type, separate from blocks"""
 		
@@ -155,6 +155,18 @@ class TestBlockHolder(unittest.TestCase):
 		self.assertEqual(result["content"], "test content")
 		self.assertEqual(result["short_id"], "abc123")
 
+	def test_extract_title(self):
+		page = {"object": "page", "properties": {
+			"Status": {"type": "select", "select": None},
+			"Name": {"type": "title", "title": [{"plain_text": "Project "}, {"text": {"content": "Alpha"}}]},
+		}}
+		database = {"object": "database", "title": [{"plain_text": "Tasks"}]}
+
+		self.assertEqual(BlockHolder.extract_title(page), "Project Alpha")
+		self.assertEqual(BlockHolder.extract_title(database), "Tasks")
+		self.assertIsNone(BlockHolder.extract_title({"object": "database", "title": []}))
+		self.assertIsNone(BlockHolder.extract_title({"object": "block", "title": [{"plain_text": "Block"}]}))
+
 	def test_apply_timestamp_filters(self):
 		message = self._create_nested_message()
 		
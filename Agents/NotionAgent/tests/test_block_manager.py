@@ -3,6 +3,7 @@ import sys
 import os
 import copy
 import json
+from unittest.mock import patch
 
 # Update the import path to include the project root
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -20,6 +21,7 @@ class TestBlockManager(unittest.TestCase):
 	# Test data constants
 	TEST_UUID_1 = "12345678-1234-1234-1234-123456789abc"
 	TEST_UUID_2 = "87654321-4321-4321-4321-210987654321"
+	TEST_UUID_3 = "11111111-2222-3333-4444-555555555555"
 	TEST_TIMESTAMP = "2023-01-01T00:00:00Z"
 	
 	# Common field values
@@ -171,6 +173,20 @@ class TestBlockManager(unittest.TestCase):
 		self.assertEqual(first_result["icon"], "page-icon")  # Icon preserved in cache
 
 
+	def test_titles_are_searchable(self):
+		title = {"title": {"type": "title", "title": [{"plain_text": "Project Alpha"}]}}
+		int_id = self.block_manager.process_and_store_block(self._create_page_data(properties=title), ObjectType.PAGE)
+		self.assertEqual(self.index.search_titles("alpha"), [int_id])
+
+		# Name given by the user is kept when the page is renamed in Notion
+		self.index.set_name(int_id, "My project")
+		renamed = {"title": {"type": "title", "title": [{"plain_text": "Project Beta"}]}}
+		self.block_manager.process_and_store_search_results("beta", self._create_search_results(properties=renamed))
+		self.assertEqual(self.index.get_name(int_id), "My project")
+		self.assertEqual(self.index.search_titles("beta"), [int_id])
+		self.assertEqual(self.index.search_titles("alpha"), [])
+		self.assertEqual(self.index.search_titles("my project"), [int_id])
+
 	def test_process_children_response_returns_unfiltered_data(self):
 		"""Test that process_children_response returns unfiltered data (filtering moved to agentTools)."""
 		parent_uuid = CustomUUID.from_string(self.TEST_UUID_1)
@@ -207,5 +223,40 @@ class TestBlockManager(unittest.TestCase):
 		self.assertEqual(cached_data["bold"], True)  # Style annotation preserved
 
 
+	def test_process_children_batch_stores_relationships(self):
+		"""Test that a children batch is stored together with relationships and the fetched flag."""
+		parent_uuid = CustomUUID.from_string(self.TEST_UUID_1)
+		children_data = [
+			{"id": self.TEST_UUID_2, **self.PARAGRAPH_BLOCK_TEMPLATE},
+			{"id": self.TEST_UUID_3, **self.PARAGRAPH_BLOCK_TEMPLATE}
+		]
+
+		children_uuids = self.block_manager.process_children_batch(children_data, parent_uuid, ObjectType.BLOCK)
+
+		self.assertEqual(len(children_uuids), 2)
+		self.assertEqual(set(self.cache.get_children_uuids(parent_uuid)), set(children_uuids))
+		parent_key = self.cache.create_cache_key(str(parent_uuid), ObjectType.BLOCK)
+		self.assertTrue(self.cache.get_children_fetched_for_block(parent_key))
+
+		for child_uuid in children_uuids:
+			cached_data = self.block_manager.parse_cache_content(self.cache.get_block(child_uuid))
+			self.assertEqual(cached_data["id"], self.index.to_int(child_uuid))
+
+
+	def test_process_children_batch_registers_uuids_once(self):
+		"""Test that UUIDs of all children in a batch are added to the index in one call."""
+		parent_uuid = CustomUUID.from_string(self.TEST_UUID_1)
+		children_data = [
+			{"id": self.TEST_UUID_2, **self.PARAGRAPH_BLOCK_TEMPLATE},
+			{"id": self.TEST_UUID_3, **self.PARAGRAPH_BLOCK_TEMPLATE}
+		]
+
+		with patch.object(self.index, "add_uuids", wraps=self.index.add_uuids) as add_uuids:
+			children_uuids = self.block_manager.process_children_batch(children_data, parent_uuid, ObjectType.BLOCK)
+
+		add_uuids.assert_called_once()
+		self.assertEqual(set(add_uuids.call_args.args[0]), set(children_uuids))
+
+
 if __name__ == '__main__':
 	unittest.main() 
\ No newline at end of file
@@ -1,15 +1,18 @@
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
 
 from tz_common import CustomUUID
-from operations.blocks.cacheOrchestrator import CacheOrchestrator
+from operations.blocks.cacheOrchestrator import CacheOrchestrator, StalePolicy, parse_stale_policies
 from operations.blocks.blockCache import BlockCache, ObjectType
 from operations.blocks.blockManager import BlockManager
 from operations.blocks.blockDict import BlockDict
 from operations.blocks.index import Index
 from operations.urlIndex import UrlIndex
 from operations.blocks.blockHolder import BlockHolder
+from operations.blocks.negativeCache import NegativeCache
+from operations.exceptions import HTTPError
 
 
 # Test Constants
@@ -29,6 +32,10 @@ TEST_CACHE_KEY = "test-cache-key"
 TEST_TTL = 3600
 
 
+async def never_returns():
+	await asyncio.Event().wait()
+
+
 @pytest.fixture
 def mock_cache():
 	"""Create a mock BlockCache for testing."""
@@ -112,12 +119,10 @@ class TestCacheOrchestrator:
 	async def test_get_or_fetch_page_cache_hit(self, cache_orchestrator, mock_cache, mock_block_manager, mock_index, sample_uuid):
 		"""Test get_or_fetch_page when data is in cache."""
 		# Setup
-		cached_content = '{"object": "page", "title": "Cached Page"}'
 		parsed_data = {"object": "page", "title": "Cached Page"}
 		expected_int_id = 456
 		
-		mock_cache.get_page.return_value = cached_content
-		mock_block_manager.parse_cache_content.return_value = parsed_data
+		mock_cache.get_page_parsed.return_value = parsed_data
 		mock_index.to_int.return_value = expected_int_id
 		
 		# Mock fetcher function (should not be called)
@@ -130,8 +135,7 @@ class TestCacheOrchestrator:
 		assert isinstance(result, BlockDict)
 		assert expected_int_id in result.blocks  # Verify proper integer ID is used
 		assert result.blocks[expected_int_id] == parsed_data
-		mock_cache.get_page.assert_called_once_with(sample_uuid)
-		mock_block_manager.parse_cache_content.assert_called_once_with(cached_content)
+		mock_cache.get_page_parsed.assert_called_once_with(sample_uuid)
 		mock_index.to_int.assert_called_once_with(sample_uuid)
 		fetcher_func.assert_not_called()
 
@@ -140,8 +144,7 @@ class TestCacheOrchestrator:
 	async def test_get_or_fetch_page_cache_miss(self, cache_orchestrator, mock_cache, mock_block_manager, sample_uuid, sample_page_data):
 		"""Test get_or_fetch_page when data is not in cache."""
 		# Setup
-		mock_cache.get_page.side_effect = [None, '{"object": "page", "title": "Fetched Page"}']  # First call returns None, second returns cached data
-		mock_block_manager.parse_cache_content.return_value = {"object": "page", "title": "Fetched Page"}
+		mock_cache.get_page_parsed.side_effect = [None, {"object": "page", "title": "Fetched Page"}]  # First call returns None, second returns cached data
 		mock_block_manager.process_and_store_block.return_value = 123
 		
 		# Mock fetcher function
@@ -160,12 +163,10 @@ class TestCacheOrchestrator:
 	async def test_get_or_fetch_database_cache_hit(self, cache_orchestrator, mock_cache, mock_block_manager, mock_index, sample_uuid):
 		"""Test get_or_fetch_database when data is in cache."""
 		# Setup
-		cached_content = '{"object": "database", "title": "Cached Database"}'
 		parsed_data = {"object": "database", "title": "Cached Database"}
 		expected_int_id = 789
 		
-		mock_cache.get_database.return_value = cached_content
-		mock_block_manager.parse_cache_content.return_value = parsed_data
+		mock_cache.get_database_parsed.return_value = parsed_data
 		mock_index.to_int.return_value = expected_int_id
 		
 		# Mock fetcher function (should not be called)
@@ -178,8 +179,7 @@ class TestCacheOrchestrator:
 		assert isinstance(result, BlockDict)
 		assert expected_int_id in result.blocks  # Verify proper integer ID is used
 		assert result.blocks[expected_int_id] == parsed_data
-		mock_cache.get_database.assert_called_once_with(sample_uuid)
-		mock_block_manager.parse_cache_content.assert_called_once_with(cached_content)
+		mock_cache.get_database_parsed.assert_called_once_with(sample_uuid)
 		mock_index.to_int.assert_called_once_with(sample_uuid)
 		fetcher_func.assert_not_called()
 
@@ -188,7 +188,7 @@ class TestCacheOrchestrator:
 	async def test_get_or_fetch_block_cache_miss(self, cache_orchestrator, mock_cache, mock_block_manager, sample_uuid, sample_block_data):
 		"""Test get_or_fetch_block when data is not in cache."""
 		# Setup
-		mock_cache.get_block.return_value = None
+		mock_cache.get_block_parsed.return_value = None
 		mock_block_manager.process_children_response.return_value = BlockDict()
 		
 		# Mock fetcher function
@@ -210,32 +210,51 @@ class TestCacheOrchestrator:
 		# Setup
 		start_cursor = CustomUUID.from_string(TEST_UUID_MAIN)
 		
-		cached_content = '{"results": [{"id": "result1", "object": "page"}]}'
 		parsed_data = {"results": [{"id": "result1", "object": "page"}]}
 		
-		mock_cache.get_search_results.return_value = cached_content
-		mock_block_manager.parse_cache_content.return_value = parsed_data
+		mock_cache.get_search_results_parsed.return_value = parsed_data
 		
 		# Execute
 		result = cache_orchestrator.get_cached_search_results(TEST_QUERY, TEST_FILTER_PAGE, start_cursor)
 		
 		# Verify
 		assert isinstance(result, BlockDict)
-		mock_cache.get_search_results.assert_called_once_with(TEST_QUERY, TEST_FILTER_PAGE, start_cursor)
-		mock_block_manager.parse_cache_content.assert_called_once_with(cached_content)
+		mock_cache.get_search_results_parsed.assert_called_once_with(TEST_QUERY, TEST_FILTER_PAGE, start_cursor)
 
 
 	def test_get_cached_search_results_miss(self, cache_orchestrator, mock_cache):
 		"""Test get_cached_search_results when results are not cached."""
 		# Setup
-		mock_cache.get_search_results.return_value = None
+		mock_cache.get_search_results_parsed.return_value = None
 		
 		# Execute
 		result = cache_orchestrator.get_cached_search_results(TEST_QUERY)
 		
 		# Verify
 		assert result is None
-		mock_cache.get_search_results.assert_called_once_with(TEST_QUERY, None, None)
+		mock_cache.get_search_results_parsed.assert_called_once_with(TEST_QUERY, None, None)
+
+
+	def test_get_cached_title_matches(self, cache_orchestrator, mock_cache, mock_index):
+		"""Test get_cached_title_matches returns cached pages and databases matching by title."""
+		# Setup
+		uuids = {1: CustomUUID.from_string(TEST_UUID_MAIN), 2: CustomUUID.from_string(TEST_UUID_CHILD1), 3: CustomUUID.from_string(TEST_UUID_CHILD2)}
+		mock_index.search_titles.return_value = [3, 1, 2]
+		mock_index.get_uuid.side_effect = uuids.get
+		mock_cache.get_page_parsed.side_effect = lambda uuid: {"object": "page"} if uuid == uuids[3] else None
+		mock_cache.get_database_parsed.side_effect = lambda uuid: {"object": "database"} if uuid == uuids[1] else None
+
+		# Execute
+		result = cache_orchestrator.get_cached_title_matches(TEST_QUERY)
+		pages = cache_orchestrator.get_cached_title_matches(TEST_QUERY, TEST_FILTER_PAGE)
+
+		# Verify
+		assert list(result.items()) == [(3, {"object": "page"}), (1, {"object": "database"})]
+		assert list(pages.keys()) == [3]
+		mock_index.search_titles.assert_called_with(TEST_QUERY, 10)
+
+		mock_index.search_titles.return_value = [2]
+		assert cache_orchestrator.get_cached_title_matches(TEST_QUERY) is None
 
 
 	@pytest.mark.asyncio
@@ -272,19 +291,16 @@ class TestCacheOrchestrator:
 		# Setup
 		start_cursor = CustomUUID.from_string(TEST_UUID_MAIN)
 		
-		cached_content = '{"results": [{"id": "page1", "object": "page"}]}'
 		parsed_data = {"results": [{"id": "page1", "object": "page"}]}
 		
-		mock_cache.get_database_query_results.return_value = cached_content
-		mock_block_manager.parse_cache_content.return_value = parsed_data
+		mock_cache.get_database_query_results_parsed.return_value = parsed_data
 		
 		# Execute
 		result = cache_orchestrator.get_cached_database_query_results(sample_uuid, TEST_FILTER_STATUS_DONE, start_cursor)
 		
 		# Verify
 		assert isinstance(result, BlockDict)
-		mock_cache.get_database_query_results.assert_called_once_with(sample_uuid, TEST_FILTER_STATUS_DONE, start_cursor)
-		mock_block_manager.parse_cache_content.assert_called_once_with(cached_content)
+		mock_cache.get_database_query_results_parsed.assert_called_once_with(sample_uuid, TEST_FILTER_STATUS_DONE, start_cursor)
 
 
 	@pytest.mark.asyncio
@@ -392,7 +408,7 @@ class TestCacheOrchestrator:
 	async def test_get_or_fetch_page_error_handling(self, cache_orchestrator, mock_cache, sample_uuid):
 		"""Test error handling in get_or_fetch_page."""
 		# Setup
-		mock_cache.get_page.return_value = None
+		mock_cache.get_page_parsed.return_value = None
 		fetcher_func = AsyncMock(side_effect=Exception("API Error"))
 		
 		# Execute
@@ -407,7 +423,7 @@ class TestCacheOrchestrator:
 	async def test_get_or_fetch_database_error_handling(self, cache_orchestrator, mock_cache, sample_uuid):
 		"""Test error handling in get_or_fetch_database."""
 		# Setup
-		mock_cache.get_database.return_value = None
+		mock_cache.get_database_parsed.return_value = None
 		fetcher_func = AsyncMock(side_effect=Exception("API Error"))
 		
 		# Execute
@@ -422,7 +438,7 @@ class TestCacheOrchestrator:
 	async def test_get_or_fetch_block_error_handling(self, cache_orchestrator, mock_cache, sample_uuid):
 		"""Test error handling in get_or_fetch_block."""
 		# Setup
-		mock_cache.get_block.return_value = None
+		mock_cache.get_block_parsed.return_value = None
 		fetcher_func = AsyncMock(side_effect=Exception("API Error"))
 		
 		# Execute
@@ -437,11 +453,9 @@ class TestCacheOrchestrator:
 	async def test_get_or_fetch_page_uuid_conversion_failure(self, cache_orchestrator, mock_cache, mock_block_manager, mock_index, sample_uuid):
 		"""Test get_or_fetch_page when UUID to int conversion fails."""
 		# Setup
-		cached_content = '{"object": "page", "title": "Cached Page"}'
 		parsed_data = {"object": "page", "title": "Cached Page"}
 		
-		mock_cache.get_page.return_value = cached_content
-		mock_block_manager.parse_cache_content.return_value = parsed_data
+		mock_cache.get_page_parsed.return_value = parsed_data
 		mock_index.to_int.return_value = None  # Simulate conversion failure
 		
 		# Mock fetcher function (should not be called)
@@ -452,8 +466,7 @@ class TestCacheOrchestrator:
 		
 		# Verify
 		assert result is None
-		mock_cache.get_page.assert_called_once_with(sample_uuid)
-		mock_block_manager.parse_cache_content.assert_called_once_with(cached_content)
+		mock_cache.get_page_parsed.assert_called_once_with(sample_uuid)
 		mock_index.to_int.assert_called_once_with(sample_uuid)
 		fetcher_func.assert_not_called()
 
@@ -462,11 +475,9 @@ class TestCacheOrchestrator:
 	async def test_get_or_fetch_database_uuid_conversion_failure(self, cache_orchestrator, mock_cache, mock_block_manager, mock_index, sample_uuid):
 		"""Test get_or_fetch_database when UUID to int conversion fails."""
 		# Setup
-		cached_content = '{"object": "database", "title": "Cached Database"}'
 		parsed_data = {"object": "database", "title": "Cached Database"}
 		
-		mock_cache.get_database.return_value = cached_content
-		mock_block_manager.parse_cache_content.return_value = parsed_data
+		mock_cache.get_database_parsed.return_value = parsed_data
 		mock_index.to_int.return_value = None  # Simulate conversion failure
 		
 		# Mock fetcher function (should not be called)
@@ -477,8 +488,7 @@ class TestCacheOrchestrator:
 		
 		# Verify
 		assert result is None
-		mock_cache.get_database.assert_called_once_with(sample_uuid)
-		mock_block_manager.parse_cache_content.assert_called_once_with(cached_content)
+		mock_cache.get_database_parsed.assert_called_once_with(sample_uuid)
 		mock_index.to_int.assert_called_once_with(sample_uuid)
 		fetcher_func.assert_not_called()
 
@@ -487,11 +497,9 @@ class TestCacheOrchestrator:
 	async def test_get_or_fetch_block_uuid_conversion_failure(self, cache_orchestrator, mock_cache, mock_block_manager, mock_index, sample_uuid):
 		"""Test get_or_fetch_block when UUID to int conversion fails."""
 		# Setup
-		cached_content = '{"object": "block", "type": "paragraph"}'
 		parsed_data = {"object": "block", "type": "paragraph"}
 		
-		mock_cache.get_block.return_value = cached_content
-		mock_block_manager.parse_cache_content.return_value = parsed_data
+		mock_cache.get_block_parsed.return_value = parsed_data
 		mock_index.to_int.return_value = None  # Simulate conversion failure
 		
 		# Mock fetcher function (should not be called)
@@ -502,7 +510,281 @@ class TestCacheOrchestrator:
 		
 		# Verify
 		assert result is None
-		mock_cache.get_block.assert_called_once_with(sample_uuid)
-		mock_block_manager.parse_cache_content.assert_called_once_with(cached_content)
+		mock_cache.get_block_parsed.assert_called_once_with(sample_uuid)
 		mock_index.to_int.assert_called_once_with(sample_uuid)
-		fetcher_func.assert_not_called() 
\ No newline at end of file
+		fetcher_func.assert_not_called() 
+
+
+	@pytest.mark.asyncio
+	async def test_get_or_fetch_page_skips_unavailable_object(self, mock_cache, mock_block_manager, mock_index, sample_uuid):
+		"""Test that a page recently reported as missing is not fetched again, and its error is raised."""
+		# Setup
+		negative_cache = NegativeCache()
+		negative_cache.record(sample_uuid, ObjectType.PAGE, HTTPError("get_page_raw", 403, details={"code": "restricted_resource"}))
+		cache_orchestrator = CacheOrchestrator(mock_cache, mock_block_manager, mock_index, negative_cache=negative_cache)
+		mock_cache.get_page_parsed.return_value = None
+		fetcher_func = AsyncMock()
+		
+		# Execute
+		with pytest.raises(HTTPError) as exc_info:
+			await cache_orchestrator.get_or_fetch_page(sample_uuid, fetcher_func)
+		
+		# Verify
+		assert exc_info.value.status_code == 403
+		assert exc_info.value.details == {"code": "restricted_resource"}
+		fetcher_func.assert_not_called()
+
+
+	@pytest.mark.asyncio
+	async def test_get_or_fetch_block_fetches_object_missing_as_other_type(self, mock_cache, mock_block_manager, mock_index, sample_uuid, sample_block_data):
+		"""Test that an object missing as a database can still be fetched as a block."""
+		# Setup
+		negative_cache = NegativeCache()
+		negative_cache.record(sample_uuid, ObjectType.DATABASE, HTTPError("query_database_raw", 404))
+		cache_orchestrator = CacheOrchestrator(mock_cache, mock_block_manager, mock_index, negative_cache=negative_cache)
+		mock_cache.get_block_parsed.return_value = None
+		fetcher_func = AsyncMock(return_value=sample_block_data)
+		
+		# Execute
+		await cache_orchestrator.get_or_fetch_block(sample_uuid, fetcher_func)
+		
+		# Verify
+		fetcher_func.assert_called_once()
+
+
+	@pytest.mark.asyncio
+	async def test_get_or_fetch_page_revalidates_stale_entry(self, mock_cache, mock_block_manager, mock_index, sample_uuid, sample_page_data):
+		"""Test that a stale page refetched within the timeout is served fresh."""
+		# Setup
+		cache_orchestrator = CacheOrchestrator(mock_cache, mock_block_manager, mock_index, stale_policies={ObjectType.PAGE: StalePolicy(ttl=60, grace=3600)})
+		fresh_page_data = dict(sample_page_data, last_edited_time="2023-01-02T12:00:00.000Z")
+		mock_cache.get_parsed_allow_stale.return_value = (sample_page_data, True)
+		mock_cache.get_page_parsed.return_value = fresh_page_data
+		fetcher_func = AsyncMock(return_value=fresh_page_data)
+		
+		# Execute
+		result = await cache_orchestrator.get_or_fetch_page(sample_uuid, fetcher_func)
+		
+		# Verify
+		mock_cache.set_stale_policy.assert_called_once_with(ObjectType.PAGE, 60, 3600)
+		assert not result.is_stale(123)
+		assert result[123] == fresh_page_data
+		fetcher_func.assert_called_once()
+		mock_block_manager.process_and_store_block.assert_called_once_with(fresh_page_data, ObjectType.PAGE)
+		assert cache_orchestrator._revalidations == {}
+
+
+	@pytest.mark.asyncio
+	async def test_get_or_fetch_page_serves_stale_when_refetch_is_slow(self, mock_cache, mock_block_manager, mock_index, sample_uuid, sample_page_data):
+		"""Test that a stale page is served flagged when the refetch times out, which is shared by concurrent reads."""
+		# Setup
+		cache_orchestrator = CacheOrchestrator(mock_cache, mock_block_manager, mock_index,
+											   stale_policies={ObjectType.PAGE: StalePolicy(ttl=60, grace=3600)}, revalidation_timeout=0.01)
+		mock_cache.get_parsed_allow_stale.return_value = (sample_page_data, True)
+		fetcher_func = AsyncMock(side_effect=never_returns)
+		
+		# Execute
+		first, second = await asyncio.gather(
+			cache_orchestrator.get_or_fetch_page(sample_uuid, fetcher_func),
+			cache_orchestrator.get_or_fetch_page(sample_uuid, fetcher_func)
+		)
+		
+		# Verify
+		assert first.is_stale(123)
+		assert second.is_stale(123)
+		mock_cache.get_page_parsed.assert_not_called()
+		fetcher_func.assert_called_once()
+		mock_block_manager.process_and_store_block.assert_not_called()
+		# Cancelled refetch is not left behind
+		assert cache_orchestrator._revalidations == {}
+
+
+	@pytest.mark.asyncio
+	async def test_get_or_fetch_block_revalidates_block_itself(self, mock_cache, mock_block_manager, mock_index, sample_uuid):
+		"""Test that a stale block is refreshed by fetching the block, not its children."""
+		# Setup
+		cache_orchestrator = CacheOrchestrator(mock_cache, mock_block_manager, mock_index, stale_policies={ObjectType.BLOCK: StalePolicy(ttl=60, grace=3600)})
+		stale_block = {"id": TEST_UUID_MAIN, "object": "block", "type": "paragraph"}
+		fresh_block = dict(stale_block, last_edited_time=TEST_TIMESTAMP)
+		mock_cache.get_parsed_allow_stale.return_value = (stale_block, True)
+		mock_cache.get_block_parsed.return_value = fresh_block
+		fetcher_func = AsyncMock()
+		block_fetcher_func = AsyncMock(return_value=fresh_block)
+		
+		# Execute
+		result = await cache_orchestrator.get_or_fetch_block(sample_uuid, fetcher_func, block_fetcher_func)
+		
+		# Verify
+		assert result[123] == fresh_block
+		assert not result.is_stale(123)
+		fetcher_func.assert_not_called()
+		mock_block_manager.process_children_response.assert_not_called()
+		mock_block_manager.process_and_store_block.assert_called_once_with(fresh_block, ObjectType.BLOCK)
+		mock_cache.invalidate_block_if_expired.assert_called_once_with(sample_uuid, TEST_TIMESTAMP)
+
+
+	@pytest.mark.asyncio
+	async def test_get_or_fetch_block_without_block_fetcher_ignores_stale_copy(self, mock_cache, mock_block_manager, mock_index, sample_uuid, sample_block_data):
+		"""Test that a stale block which can't be revalidated is not served."""
+		# Setup
+		cache_orchestrator = CacheOrchestrator(mock_cache, mock_block_manager, mock_index, stale_policies={ObjectType.BLOCK: StalePolicy(ttl=60, grace=3600)})
+		mock_cache.get_block_parsed.return_value = None
+		mock_block_manager.process_children_response.return_value = BlockDict()
+		fetcher_func = AsyncMock(return_value=sample_block_data)
+		
+		# Execute
+		await cache_orchestrator.get_or_fetch_block(sample_uuid, fetcher_func)
+		
+		# Verify
+		mock_cache.get_parsed_allow_stale.assert_not_called()
+		fetcher_func.assert_called_once()
+
+
+	def test_parse_stale_policies(self):
+		"""Test parsing stale policies from an environment variable."""
+		assert parse_stale_policies("") == {}
+		assert parse_stale_policies("page:600:86400, database:60:3600") == {
+			ObjectType.PAGE: StalePolicy(ttl=600, grace=86400),
+			ObjectType.DATABASE: StalePolicy(ttl=60, grace=3600)
+		}
+
+
+	def test_stale_page_is_revalidated_across_event_loops(self, mock_cache, mock_block_manager, mock_index, sample_uuid, sample_page_data):
+		"""Test revalidation when every call runs in its own event loop, closed afterwards, as tool calls do."""
+		# Setup
+		cache_orchestrator = CacheOrchestrator(mock_cache, mock_block_manager, mock_index,
+											   stale_policies={ObjectType.PAGE: StalePolicy(ttl=60, grace=3600)}, revalidation_timeout=0.01)
+		mock_cache.get_parsed_allow_stale.return_value = (sample_page_data, True)
+		mock_cache.get_page_parsed.return_value = sample_page_data
+		slow_fetch = AsyncMock(side_effect=never_returns)
+		fast_fetch = AsyncMock(return_value=sample_page_data)
+		
+		# Execute
+		results = []
+		for fetcher_func in [slow_fetch, fast_fetch]:
+			loop = asyncio.new_event_loop()
+			try:
+				results.append(loop.run_until_complete(cache_orchestrator.get_or_fetch_page(sample_uuid, fetcher_func)))
+				assert all(task.done() for task in asyncio.all_tasks(loop))
+			finally:
+				loop.close()
+		
+		# Verify
+		assert results[0].is_stale(123)
+		assert not results[1].is_stale(123)
+		slow_fetch.assert_called_once()
+		fast_fetch.assert_called_once()
+		mock_block_manager.process_and_store_block.assert_called_once_with(sample_page_data, ObjectType.PAGE)
+		assert cache_orchestrator._revalidations == {}
+
+
+	@pytest.mark.asyncio
+	async def test_get_or_fetch_page_fresh_entry_is_not_revalidated(self, mock_cache, mock_block_manager, mock_index, sample_uuid, sample_page_data):
+		"""Test that a fresh page under a stale policy is served without refetching."""
+		# Setup
+		cache_orchestrator = CacheOrchestrator(mock_cache, mock_block_manager, mock_index, stale_policies={ObjectType.PAGE: StalePolicy(ttl=60, grace=3600)})
+		mock_cache.get_parsed_allow_stale.return_value = (sample_page_data, False)
+		fetcher_func = AsyncMock()
+		
+		# Execute
+		result = await cache_orchestrator.get_or_fetch_page(sample_uuid, fetcher_func)
+		
+		# Verify
+		assert not result.is_stale(123)
+		fetcher_func.assert_not_called()
+		assert cache_orchestrator._revalidations == {}
+
+
+	@pytest.mark.asyncio
+	async def test_concurrent_page_misses_share_one_fetch(self, cache_orchestrator, mock_cache, mock_block_manager, sample_uuid, sample_page_data):
+		"""Test that concurrent misses of the same page spend a single API request."""
+		# Setup
+		mock_cache.get_page_parsed.side_effect = [None, None, sample_page_data, sample_page_data]
+		mock_block_manager.process_and_store_block.return_value = 123
+		release = asyncio.Event()
+		async def slow_fetch():
+			await release.wait()
+			return sample_page_data
+		fetcher_func = AsyncMock(side_effect=slow_fetch)
+		
+		# Execute
+		first = asyncio.create_task(cache_orchestrator.get_or_fetch_page(sample_uuid, fetcher_func))
+		second = asyncio.create_task(cache_orchestrator.get_or_fetch_page(sample_uuid, fetcher_func))
+		await asyncio.sleep(0)
+		release.set()
+		results = await asyncio.gather(first, second)
+		
+		# Verify
+		fetcher_func.assert_called_once()
+		mock_block_manager.process_and_store_block.assert_called_once_with(sample_page_data, ObjectType.PAGE)
+		assert [result[123] for result in results] == [sample_page_data, sample_page_data]
+		assert results[0] is not results[1]
+		assert cache_orchestrator._in_flight == {}
+
+
+	@pytest.mark.asyncio
+	async def test_concurrent_searches_share_one_fetch(self, cache_orchestrator, mock_cache, mock_block_manager):
+		"""Test that the same search is requested once, while a different one is not joined."""
+		# Setup
+		mock_cache.create_search_results_cache_key.side_effect = lambda query, filter_str=None, start_cursor=None: f"{query}:{filter_str}"
+		block_dict = BlockDict()
+		block_dict.add_block(1, {"id": TEST_UUID_SEARCH_RESULT})
+		mock_block_manager.process_and_store_search_results.return_value = block_dict
+		fetcher_func = AsyncMock(return_value={"results": []})
+		
+		# Execute
+		results = await asyncio.gather(
+			cache_orchestrator.fetch_search_results(TEST_QUERY, fetcher_func, TEST_FILTER_PAGE),
+			cache_orchestrator.fetch_search_results(TEST_QUERY, fetcher_func, TEST_FILTER_PAGE),
+			cache_orchestrator.fetch_search_results(TEST_QUERY, fetcher_func, None),
+		)
+		
+		# Verify
+		assert fetcher_func.call_count == 2
+		assert mock_block_manager.process_and_store_search_results.call_count == 2
+		assert all(result[1] == {"id": TEST_UUID_SEARCH_RESULT} for result in results)
+
+
+	@pytest.mark.asyncio
+	async def test_single_flight_error_reaches_all_callers(self, cache_orchestrator, mock_cache):
+		"""Test that a failed shared fetch fails every caller and is not remembered."""
+		# Setup
+		mock_cache.create_database_query_results_cache_key.return_value = TEST_CACHE_KEY
+		fetcher_func = AsyncMock(side_effect=HTTPError("query_database_raw", 500))
+		
+		# Execute
+		results = await asyncio.gather(
+			cache_orchestrator.fetch_database_query_results(CustomUUID.from_string(TEST_UUID_MAIN), fetcher_func),
+			cache_orchestrator.fetch_database_query_results(CustomUUID.from_string(TEST_UUID_MAIN), fetcher_func),
+			return_exceptions=True
+		)
+		
+		# Verify
+		fetcher_func.assert_called_once()
+		assert all(isinstance(result, HTTPError) for result in results)
+		assert cache_orchestrator._in_flight == {}
+
+
+	@pytest.mark.asyncio
+	async def test_cancelled_caller_does_not_cancel_shared_fetch(self, cache_orchestrator):
+		"""Test that cancelling one caller leaves the fetch running for the others."""
+		# Setup
+		release = asyncio.Event()
+		async def slow_fetch():
+			await release.wait()
+			return {"results": []}
+		fetcher_func = AsyncMock(side_effect=slow_fetch)
+		block_uuid = CustomUUID.from_string(TEST_UUID_MAIN)
+		
+		# Execute
+		first = asyncio.create_task(cache_orchestrator.fetch_block_children(block_uuid, fetcher_func))
+		second = asyncio.create_task(cache_orchestrator.fetch_block_children(block_uuid, fetcher_func))
+		await asyncio.sleep(0)
+		first.cancel()
+		release.set()
+		result = await second
+		
+		# Verify
+		assert first.cancelled()
+		assert result == {"results": []}
+		fetcher_func.assert_called_once()
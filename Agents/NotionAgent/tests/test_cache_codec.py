@@ -0,0 +1,52 @@
+import unittest
+
+from operations.blocks.cacheCodec import CacheCodec, Compression, zstandard
+
+TEST_SMALL_CONTENT = '{"object": "block"}'
+TEST_LARGE_CONTENT = '{"results": [' + ", ".join(['{"object": "block", "plain_text": "repeated text"}'] * 100) + ']}'
+
+
+class TestCacheCodec(unittest.TestCase):
+
+	def test_small_content_stays_raw(self):
+		codec = CacheCodec(compression=Compression.ZLIB)
+		self.assertEqual(codec.encode(TEST_SMALL_CONTENT), TEST_SMALL_CONTENT)
+
+	def test_zlib_round_trip(self):
+		codec = CacheCodec(compression=Compression.ZLIB)
+		stored = codec.encode(TEST_LARGE_CONTENT)
+
+		self.assertIsInstance(stored, bytes)
+		self.assertEqual(stored[:1], b"z")
+		self.assertLess(len(stored), len(TEST_LARGE_CONTENT))
+		self.assertEqual(codec.decode(stored), TEST_LARGE_CONTENT)
+
+	@unittest.skipIf(zstandard is None, "zstandard not installed")
+	def test_zstd_round_trip(self):
+		codec = CacheCodec(compression=Compression.ZSTD)
+		stored = codec.encode(TEST_LARGE_CONTENT)
+
+		self.assertEqual(stored[:1], b"s")
+		self.assertEqual(codec.decode(stored), TEST_LARGE_CONTENT)
+		# Any codec reads any known format
+		self.assertEqual(CacheCodec(compression=Compression.ZLIB).decode(stored), TEST_LARGE_CONTENT)
+
+	def test_uncompressed_codec_reads_compressed_rows(self):
+		stored = CacheCodec(compression=Compression.ZLIB).encode(TEST_LARGE_CONTENT)
+		codec = CacheCodec(compression=Compression.NONE)
+
+		self.assertEqual(codec.encode(TEST_LARGE_CONTENT), TEST_LARGE_CONTENT)
+		self.assertEqual(codec.decode(stored), TEST_LARGE_CONTENT)
+
+	def test_incompressible_content_stays_raw(self):
+		# Too short to gain anything from compression headers
+		content = "q7Zp2xK9mWv4"
+		self.assertEqual(CacheCodec(compression=Compression.ZLIB, threshold=0).encode(content), content)
+
+	def test_unknown_tag_raises(self):
+		with self.assertRaises(ValueError):
+			CacheCodec().decode(b"?payload")
+
+
+if __name__ == '__main__':
+	unittest.main()
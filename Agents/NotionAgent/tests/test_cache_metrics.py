@@ -0,0 +1,46 @@
+import unittest
+
+from operations.blocks.cacheMetrics import CacheMetrics
+
+
+class TestCacheMetrics(unittest.TestCase):
+
+	def setUp(self):
+		self.metrics = CacheMetrics()
+
+	def test_increment_counts_total_and_object_type(self):
+		self.metrics.increment("hits", "page")
+		self.metrics.increment("hits", "block")
+		self.metrics.increment("hits")
+
+		pending = self.metrics.get_pending()
+		self.assertEqual(pending["hits"], 3)
+		self.assertEqual(pending["hits:page"], 1)
+		self.assertEqual(pending["hits:block"], 1)
+
+	def test_take_and_restore_pending(self):
+		self.metrics.increment("misses_expired")
+
+		taken = self.metrics.take_pending()
+		self.assertEqual(taken, {"misses_expired": 1})
+		self.assertEqual(self.metrics.get_pending(), {})
+
+		self.metrics.increment("misses_expired")
+		self.metrics.restore_pending(taken)
+		self.assertEqual(self.metrics.get_pending(), {"misses_expired": 2})
+
+	def test_latency_histogram(self):
+		self.metrics.record_latency("get", 0.00001)  # 0.01 ms
+		self.metrics.record_latency("get", 0.002)  # 2 ms
+		self.metrics.record_latency("put", 1.0)  # 1 s
+
+		histograms = self.metrics.get_latency_histograms()
+		self.assertEqual(histograms["get"]["count"], 2)
+		self.assertEqual(histograms["get"]["buckets"]["0.05"], 1)
+		self.assertEqual(histograms["get"]["buckets"]["2.5"], 1)
+		self.assertEqual(histograms["put"]["buckets"]["+Inf"], 1)
+		self.assertAlmostEqual(histograms["put"]["total_ms"], 1000.0)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+
+from tz_common import CustomUUID
+
+from operations.blocks.blockCache import BlockCache, ObjectType
+from operations.blocks.changeJournal import PersistenceMode
+from operations.blocks.index import Index
+
+TEST_UUID_PAGE = "a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"
+TEST_UUID_CHILD = "0c7cb43c-09a6-45a8-9320-573189f0f8f4"
+TEST_UUID_OTHER = "123e4567-e89b-12d3-a456-426614174000"
+
+
+class TestChangeFeed(unittest.TestCase):
+	"""
+	Separate storage instances on one file stand for separate processes: they share nothing but the file.
+	"""
+
+	def setUp(self):
+		self.temp_dir = tempfile.TemporaryDirectory()
+		self.cache_path = os.path.join(self.temp_dir.name, 'block_cache.db')
+		self.index_path = os.path.join(self.temp_dir.name, 'index.db')
+		self.storages = []
+
+	def tearDown(self):
+		for storage in self.storages:
+			storage.stop_periodic_save()
+			storage.database.close()
+		self.temp_dir.cleanup()
+
+	def make_cache(self) -> BlockCache:
+		cache = BlockCache(db_path=self.cache_path, run_on_start=False, persistence_mode=PersistenceMode.WAL, shared=True)
+		cache.change_feed.poll_interval = 0
+		self.storages.append(cache)
+		return cache
+
+	def make_index(self) -> Index:
+		index = Index(db_path=self.index_path, run_on_start=False, persistence_mode=PersistenceMode.WAL)
+		self.storages.append(index)
+		return index
+
+	def test_shared_cache_requires_wal(self):
+		with self.assertRaises(ValueError):
+			BlockCache(db_path=':memory:', run_on_start=False, shared=True)
+
+	def test_changes_of_other_process_evict_parsed_copy(self):
+		reader, writer = self.make_cache(), self.make_cache()
+		writer.add_block(TEST_UUID_CHILD, '{"text": "old"}')
+		self.assertEqual(reader.get_block_parsed(CustomUUID.from_string(TEST_UUID_CHILD)), {"text": "old"})
+
+		writer.add_block(TEST_UUID_CHILD, '{"text": "new"}')
+		self.assertEqual(reader.get_block_parsed(CustomUUID.from_string(TEST_UUID_CHILD)), {"text": "new"})
+
+		writer.invalidate_block_if_expired(CustomUUID.from_string(TEST_UUID_CHILD), "2100-01-01T00:00:00.000Z")
+		self.assertIsNone(reader.get_block_parsed(CustomUUID.from_string(TEST_UUID_CHILD)))
+
+	def test_own_changes_are_not_reported(self):
+		cache = self.make_cache()
+		cache.add_block(TEST_UUID_CHILD, '{"text": "old"}')
+		self.assertEqual(cache.change_feed.poll(), [])
+
+		other = self.make_cache()
+		other.add_block(TEST_UUID_OTHER, '{"text": "other"}')
+		self.assertEqual(cache.change_feed.poll(), [(str(CustomUUID.from_string(TEST_UUID_OTHER)), ObjectType.BLOCK.value)])
+
+	def test_changes_of_other_process_invalidate_subtree_snapshots(self):
+		reader, writer = self.make_cache(), self.make_cache()
+		page_uuid = CustomUUID.from_string(TEST_UUID_PAGE)
+		writer.add_page(TEST_UUID_PAGE, '{"object": "page"}')
+		writer.add_block(TEST_UUID_CHILD, '{"text": "child"}', parent_uuid=TEST_UUID_PAGE, parent_type=ObjectType.PAGE)
+		reader.add_subtree(page_uuid, '{"root": "%s", "blocks": [], "edges": []}' % TEST_UUID_PAGE)
+		self.assertIsNotNone(reader.get_subtree_parsed(page_uuid))
+
+		writer.add_block(TEST_UUID_CHILD, '{"text": "child, edited"}')
+		self.assertIsNone(reader.get_subtree_parsed(page_uuid))
+
+	def test_missed_changes_drop_everything(self):
+		reader, writer = self.make_cache(), self.make_cache()
+		page_uuid = CustomUUID.from_string(TEST_UUID_PAGE)
+		writer.add_block(TEST_UUID_CHILD, '{"text": "old"}')
+		reader.add_subtree(page_uuid, '{"root": "%s", "blocks": [], "edges": []}' % TEST_UUID_PAGE)
+		reader.get_block_parsed(CustomUUID.from_string(TEST_UUID_CHILD))
+		self.assertEqual(len(reader.parsed_cache), 1)
+
+		# Reader didn't poll before the change was pruned
+		writer.add_block(TEST_UUID_OTHER, '{"text": "other"}')
+		writer.change_feed.RETENTION_S = -1
+		with writer.lock:
+			self.assertGreater(writer.change_feed.prune(), 0)
+			writer.conn.commit()
+
+		reader._sync_shared_changes()
+		self.assertEqual(len(reader.parsed_cache), 0)
+		self.assertIsNone(reader.get_subtree_parsed(page_uuid))
+
+	def test_int_ids_are_allocated_once_for_all_processes(self):
+		first, second = self.make_index(), self.make_index()
+		page_uuid = CustomUUID.from_string(TEST_UUID_PAGE)
+		child_uuid = CustomUUID.from_string(TEST_UUID_CHILD)
+
+		page_id = first.add_uuid(page_uuid)
+		self.assertEqual(second.add_uuid(page_uuid), page_id)
+		child_id = second.add_uuid(child_uuid)
+		self.assertNotEqual(child_id, page_id)
+		self.assertEqual(first.get_uuid(child_id), child_uuid)
+
+	def test_uuid_added_concurrently_returns_its_id(self):
+		first, second = self.make_index(), self.make_index()
+		page_uuid = CustomUUID.from_string(TEST_UUID_PAGE)
+		second.add_uuid(CustomUUID.from_string(TEST_UUID_OTHER))
+		page_id = second.add_uuid(page_uuid)
+
+		# UUID is added by the other process between the check and the insert
+		read = first.database.read
+		first.database.read = lambda sql, parameters=(): [] if sql.startswith('SELECT int_id') else read(sql, parameters)
+		self.assertEqual(first.add_uuid(page_uuid), page_id)
+
+
+if __name__ == '__main__':
+	unittest.main()
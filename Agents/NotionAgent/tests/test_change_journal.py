@@ -0,0 +1,149 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from tz_common import CustomUUID
+
+from operations.blocks.blockCache import BlockCache, ObjectType
+from operations.blocks.changeJournal import ChangeJournal
+from operations.blocks.index import Index
+
+TEST_UUID_1 = "a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"
+TEST_UUID_2 = "0c7cb43c-09a6-45a8-9320-573189f0f8f4"
+TEST_UUID_3 = "3d5b7a21-3056-4ea8-9dc0-301778710c55"
+
+
+class TestChangeJournal(unittest.TestCase):
+
+	def setUp(self):
+		self.temp_dir = tempfile.TemporaryDirectory()
+		self.cache_path = os.path.join(self.temp_dir.name, 'block_cache.db')
+		self.index_path = os.path.join(self.temp_dir.name, 'index.db')
+		self.storages = []
+
+
+	def tearDown(self):
+		for storage in self.storages:
+			storage.stop_periodic_save()
+		self.temp_dir.cleanup()
+
+
+	def make_cache(self, load_from_disk: bool) -> BlockCache:
+		cache = BlockCache(db_path=self.cache_path, load_from_disk=load_from_disk, run_on_start=False)
+		self.storages.append(cache)
+		return cache
+
+
+	def make_index(self, load_from_disk: bool) -> Index:
+		index = Index(db_path=self.index_path, load_from_disk=load_from_disk, run_on_start=False)
+		self.storages.append(index)
+		return index
+
+
+	def count_disk_rows(self, db_path: str, table: str) -> int:
+		disk_conn = sqlite3.connect(db_path)
+		count = disk_conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+		disk_conn.close()
+		return count
+
+
+	def test_first_save_is_snapshot(self):
+		cache = self.make_cache(load_from_disk=False)
+		self.assertTrue(cache.journal.snapshot_required)
+
+		cache.add_block(TEST_UUID_1, "content_1")
+		cache.save()
+
+		self.assertFalse(cache.journal.snapshot_required)
+		self.assertEqual(cache.journal.pending_changes(), 0)
+		self.assertEqual(self.count_disk_rows(self.cache_path, 'block_cache'), 1)
+
+
+	def test_incremental_save_writes_only_changed_rows(self):
+		cache = self.make_cache(load_from_disk=False)
+		cache.add_block(TEST_UUID_1, "content_1")
+		cache.save()
+
+		# A row that exists only on disk survives an incremental save, but not a snapshot
+		disk_conn = sqlite3.connect(self.cache_path)
+		with disk_conn:
+			disk_conn.execute("INSERT INTO block_cache (cache_key, object_type, content) VALUES ('sentinel', 'block', 'x')")
+		disk_conn.close()
+
+		cache.add_block(TEST_UUID_2, "content_2")
+		self.assertGreater(cache.journal.pending_changes(), 0)
+		cache.save()
+
+		self.assertEqual(cache.journal.pending_changes(), 0)
+		self.assertEqual(self.count_disk_rows(self.cache_path, 'block_cache'), 3)
+
+		cache.compact()
+		self.assertEqual(self.count_disk_rows(self.cache_path, 'block_cache'), 2)
+
+
+	def test_reload_reflects_updates_and_deletions(self):
+		cache = self.make_cache(load_from_disk=False)
+		cache.add_block(TEST_UUID_1, "content_1")
+		cache.add_block(TEST_UUID_2, "content_2")
+		cache.add_parent_child_relationship(TEST_UUID_1, TEST_UUID_2, ObjectType.BLOCK)
+		cache.save()
+
+		cache.add_block(TEST_UUID_1, "content_1_updated")
+		cache.invalidate_block_if_expired(TEST_UUID_2, "9999-01-01T00:00:00.000000+00:00")
+		cache.add_block(TEST_UUID_3, "content_3")
+		cache.save()
+
+		reloaded = self.make_cache(load_from_disk=True)
+		self.assertFalse(reloaded.journal.snapshot_required)
+		self.assertEqual(reloaded.get_block(TEST_UUID_1), "content_1_updated")
+		self.assertIsNone(reloaded.get_block(TEST_UUID_2))
+		self.assertEqual(reloaded.get_block(TEST_UUID_3), "content_3")
+		self.assertEqual(self.count_disk_rows(self.cache_path, 'block_relationships'), 0)
+
+
+	def test_index_incremental_save(self):
+		index = self.make_index(load_from_disk=False)
+		uuid_1 = CustomUUID.from_string(TEST_UUID_1)
+		uuid_2 = CustomUUID.from_string(TEST_UUID_2)
+		int_id = index.add_uuid(uuid_1, name="First")
+		index.add_notion_url_or_uuid_to_favourites(TEST_UUID_1, True)
+		index.save()
+
+		index.add_uuid(uuid_2)
+		index.visit_int(int_id)
+		index.add_notion_url_or_uuid_to_favourites(TEST_UUID_1, False)
+		index.save()
+
+		reloaded = self.make_index(load_from_disk=True)
+		self.assertEqual(reloaded.to_int(uuid_1), int_id)
+		self.assertIsNotNone(reloaded.to_int(uuid_2))
+		self.assertIn(f"{int_id}: First - visits: 1", reloaded.get_most_popular(1))
+		self.assertEqual(reloaded.get_favourites(), [])
+
+
+	def test_index_cleanup_keeps_pending_visits(self):
+		index = self.make_index(load_from_disk=False)
+		int_id = index.add_uuid(CustomUUID.from_string(TEST_UUID_1), name="First")
+		index.save()
+		index.visit_int(int_id)
+		index.visit_int(int_id)
+
+		index.save_enabled = True
+		index.cleanup()
+
+		reloaded = self.make_index(load_from_disk=True)
+		self.assertIn(f"{int_id}: First - visits: 2", reloaded.get_most_popular(1))
+
+
+	def test_table_without_key_is_rejected(self):
+		conn = sqlite3.connect(':memory:')
+		conn.execute('CREATE TABLE no_key (value TEXT)')
+
+		with self.assertRaises(ValueError):
+			ChangeJournal(conn, ['no_key'])
+		conn.close()
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -3,6 +3,7 @@ import asyncio
 import os
 import sys
 from typing import List, Union
+from unittest.mock import Mock
 
 # Update the import path to include the project root
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -118,5 +119,120 @@ class TestFavourites(unittest.TestCase):
 			self.assertIn(self.to_formatted_uuid(favourite), test_uuids)
 
 
+
+	def test_get_most_visited(self):
+		test_uuids = [CustomUUID.from_string(f"123e4567-e89b-12d3-a456-42661417400{i}") for i in range(3)]
+		for uuid in test_uuids:
+			self.index.add_uuid(uuid, "Page")
+		self.index.visit_uuid(test_uuids[2])
+		self.index.visit_uuid(test_uuids[2])
+		self.index.visit_uuid(test_uuids[1])
+
+		most_visited = self.index.get_most_visited(count=5)
+		self.assertEqual([str(uuid) for uuid in most_visited], [str(test_uuids[2]), str(test_uuids[1])])
+
+	def test_map_uuids(self):
+		test_uuids = [CustomUUID.from_string(f"123e4567-e89b-12d3-a456-42661417400{i}") for i in range(3)]
+		int_ids = [self.index.add_uuid(uuid, "Page") for uuid in test_uuids[:2]]
+
+		to_int, to_uuid = self.index.map_uuids(test_uuids + [test_uuids[0]])
+		self.assertEqual(to_int, {test_uuids[0]: int_ids[0], test_uuids[1]: int_ids[1]})
+		self.assertEqual(to_uuid, {int_ids[0]: test_uuids[0], int_ids[1]: test_uuids[1]})
+		self.assertEqual(self.index.to_int(test_uuids), to_int)
+
+	def test_add_uuids(self):
+		test_uuids = [CustomUUID.from_string(f"123e4567-e89b-12d3-a456-42661417400{i}") for i in range(3)]
+		known_id = self.index.add_uuid(test_uuids[0], "Known")
+
+		commits = []
+		commit = self.index.db_conn.commit
+		self.index.db_conn = Mock(wraps=self.index.db_conn)
+		self.index.db_conn.commit.side_effect = lambda: commits.append(1) or commit()
+		int_ids = self.index.add_uuids(test_uuids + [test_uuids[1]], names=["First", "Second", "Third", "Second again"])
+		self.assertEqual(len(commits), 1)
+
+		self.assertEqual(int_ids[test_uuids[0]], known_id)
+		self.assertEqual(len(int_ids), 3)
+		self.assertEqual(len(set(int_ids.values())), 3)
+		for uuid in test_uuids:
+			self.assertEqual(self.index.to_int(uuid), int_ids[uuid])
+		self.assertEqual(self.index.get_name(known_id), "Known")
+		self.assertEqual(self.index.get_name(int_ids[test_uuids[1]]), "Second")
+		self.assertEqual(self.index.add_uuids([]), {})
+
+	def test_add_uuids_existing_in_database(self):
+		uuid = CustomUUID.from_string("123e4567-e89b-12d3-a456-426614174000")
+		# Added by another process, unknown to this one
+		self.index.cursor.execute('INSERT INTO index_data (uuid, name) VALUES (?, ?)', (str(uuid), "Other"))
+		self.index.db_conn.commit()
+		int_id = self.index.cursor.lastrowid
+
+		self.assertEqual(self.index.add_uuids([uuid]), {uuid: int_id})
+		self.assertEqual(self.index.get_uuid(int_id), uuid)
+
+	def test_visits_are_written_in_batches(self):
+		int_id = self.index.add_uuid(CustomUUID.from_string("123e4567-e89b-12d3-a456-426614174000"), "Page")
+		self.index.visit_int(int_id)
+		self.index.visit_int(int_id)
+		row = self.index.cursor.execute('SELECT visit_count FROM index_data WHERE int_id = ?', (int_id,)).fetchone()
+		self.assertEqual(row[0], 0)
+
+		self.assertEqual(self.index.flush_visits(), 1)
+		self.assertEqual(self.index.flush_visits(), 0)
+		self.assertEqual(self.index.get_visit_count(int_id), 2)
+
+		self.index.visit_int(int_id)
+		self.assertEqual(self.index.get_visit_count(int_id), 3)
+
+	def test_favourites_follow_visits_without_queries(self):
+		test_uuids = [CustomUUID.from_string(f"123e4567-e89b-12d3-a456-42661417400{i}") for i in range(3)]
+		int_ids = [self.index.add_notion_url_or_uuid_to_favourites(uuid, True, title=f"Page {i}") for i, uuid in enumerate(test_uuids)]
+		self.index.visit_int(int_ids[1])
+		self.index.get_favourites_with_names()
+
+		cursor = self.index.cursor
+		self.index.cursor = Mock(wraps=cursor)
+		self.index.visit_int(int_ids[2])
+		self.index.visit_int(int_ids[2])
+		self.assertEqual(self.index.get_favourites_with_names(2), [(int_ids[2], "Page 2"), (int_ids[1], "Page 1")])
+		self.assertEqual(self.index.get_favourites(1), [test_uuids[2]])
+		self.index.cursor.execute.assert_not_called()
+		self.index.cursor = cursor
+
+		self.index.set_name(int_ids[0], "Renamed")
+		self.index.set_favourite(test_uuids[2], False)
+		self.assertEqual(self.index.get_favourites_with_names(), [(int_ids[1], "Page 1"), (int_ids[0], "Renamed")])
+
+	def test_search_titles(self):
+		names = ["Project Alpha", "Alpha release notes", "Weekly plan", "Weekly plan", "AI"]
+		test_uuids = [CustomUUID.from_string(f"123e4567-e89b-12d3-a456-42661417400{i}") for i in range(len(names))]
+		int_ids = self.index.add_uuids(test_uuids, names=names)
+		ids = [int_ids[uuid] for uuid in test_uuids]
+
+		self.assertEqual(set(self.index.search_titles("alpha")), {ids[0], ids[1]})
+		self.assertEqual(self.index.search_titles("pha proj"), [ids[0]])
+		self.assertEqual(self.index.search_titles("ai"), [ids[4]])
+		self.assertEqual(self.index.search_titles('"alpha" OR'), [])
+		self.assertEqual(self.index.search_titles("  "), [])
+
+		# More visited pages come first among equal matches
+		self.index.visit_int(ids[3])
+		self.index.flush_visits()
+		self.assertEqual(self.index.search_titles("plan"), [ids[3], ids[2]])
+
+		self.index.set_titles({ids[0]: "Project Beta"})
+		self.index.delete_uuid(test_uuids[1])
+		self.assertEqual(self.index.get_name(ids[0]), "Project Alpha")
+		self.assertEqual(self.index.search_titles("alpha"), [ids[0]])
+		self.assertEqual(self.index.search_titles("beta"), [ids[0]])
+
+	def test_favourite_indexed_later_is_ranked(self):
+		uuid = CustomUUID.from_string("123e4567-e89b-12d3-a456-426614174000")
+		self.index.set_favourite(uuid, True)
+		self.assertEqual(self.index.get_favourites(), [])
+
+		self.index.add_uuids([uuid], names=["Page"])
+		self.assertEqual(self.index.get_favourites(), [uuid])
+
 if __name__ == '__main__':
 	unittest.main()
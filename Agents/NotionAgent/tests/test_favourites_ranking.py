@@ -0,0 +1,73 @@
+import unittest
+
+from operations.blocks.favouritesRanking import FavouritesRanking
+from operations.blocks.visitCounter import VisitCounter
+
+TEST_UUID_1 = "a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"
+TEST_UUID_2 = "0c7cb43c-09a6-45a8-9320-573189f0f8f4"
+TEST_UUID_3 = "123e4567-e89b-12d3-a456-426614174000"
+
+
+class TestFavouritesRanking(unittest.TestCase):
+
+	def setUp(self):
+		self.ranking = FavouritesRanking()
+		self.ranking.load([
+			(1, TEST_UUID_1, "First", 5),
+			(2, TEST_UUID_2, "Second", 3),
+			(3, TEST_UUID_3, "Third", 3),
+		], [])
+
+	def ranked_ids(self):
+		return [int_id for int_id, _, _ in self.ranking.top(10)]
+
+	def test_loaded_ranking_is_ordered_by_visits(self):
+		self.assertEqual(self.ranked_ids(), [1, 2, 3])
+		self.assertEqual(self.ranking.top(1), [(1, TEST_UUID_1, "First")])
+
+	def test_visit_moves_favourite_forward(self):
+		self.ranking.visit(3)
+		self.assertEqual(self.ranked_ids(), [1, 3, 2])
+
+		self.ranking.visit(3, 2)
+		self.assertEqual(self.ranked_ids(), [3, 1, 2])
+
+		# Visits of pages which are not favourites are ignored
+		self.ranking.visit(4, 100)
+		self.assertEqual(self.ranked_ids(), [3, 1, 2])
+
+	def test_stale_ranking_is_not_served(self):
+		self.ranking.invalidate()
+		self.assertIsNone(self.ranking.top(10))
+
+	def test_indexing_unranked_favourite_marks_ranking_stale(self):
+		self.ranking.load([(1, TEST_UUID_1, "First", 0)], [TEST_UUID_2])
+		self.ranking.indexed(TEST_UUID_3)
+		self.assertIsNotNone(self.ranking.top(10))
+
+		self.ranking.indexed(TEST_UUID_2)
+		self.assertIsNone(self.ranking.top(10))
+
+
+class TestVisitCounter(unittest.TestCase):
+
+	def test_take_and_restore(self):
+		counter = VisitCounter()
+		counter.add(1)
+		self.assertEqual(counter.add(1), 1)
+		self.assertEqual(counter.add(2), 2)
+
+		self.assertEqual(counter.pending_snapshot(), {1: 2, 2: 1})
+		self.assertEqual(len(counter), 2)
+
+		visits = counter.take()
+		self.assertEqual(visits, {1: 2, 2: 1})
+		self.assertEqual(len(counter), 0)
+
+		counter.add(1)
+		counter.restore(visits)
+		self.assertEqual(counter.take(), {1: 3, 2: 1})
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,113 @@
+import json
+import unittest
+
+from tz_common import JsonConverter
+
+from operations.blocks.blockCache import BlockCache
+from operations.blocks.blockHolder import BlockHolder, FilteringOptions
+from operations.blocks.filteredViewCache import FilteredViewCache
+from operations.urlIndex import UrlIndex
+
+TEST_UUID = "a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"
+TEST_CONTENT = {
+	"object": "block",
+	"id": TEST_UUID,
+	"type": "paragraph",
+	"created_time": "2023-01-01T00:00:00Z",
+	"archived": False,
+	"paragraph": {"rich_text": [{"text": {"content": "Hello world"}, "plain_text": "Hello world", "annotations": {"bold": False}}]},
+}
+
+
+class CountingBlockHolder(BlockHolder):
+
+	def __init__(self, url_index):
+		super().__init__(url_index)
+		self.filter_count = 0
+
+	def apply_filters(self, obj, filter_options):
+		self.filter_count += 1
+		return super().apply_filters(obj, filter_options)
+
+
+class TestFilteredViewCache(unittest.TestCase):
+
+	def setUp(self):
+		self.block_holder = CountingBlockHolder(UrlIndex())
+		self.views = FilteredViewCache(self.block_holder)
+
+	def test_view_matches_filtered_content(self):
+		content = json.loads(json.dumps(TEST_CONTENT))
+		view = self.views.get(content, [FilteringOptions.AGENT_OPTIMIZED])
+
+		expected = BlockHolder(UrlIndex()).apply_filters(json.loads(json.dumps(TEST_CONTENT)), [FilteringOptions.AGENT_OPTIMIZED])
+		self.assertEqual(view.content, expected)
+		self.assertEqual(view.serialized, JsonConverter().remove_spaces(expected))
+		# Raw content is left unfiltered
+		self.assertEqual(content, TEST_CONTENT)
+
+	def test_repeated_reads_are_filtered_once(self):
+		content = json.loads(json.dumps(TEST_CONTENT))
+		first = self.views.get(content, [FilteringOptions.AGENT_OPTIMIZED])
+		second = self.views.get(content, [FilteringOptions.AGENT_OPTIMIZED])
+
+		self.assertIs(first, second)
+		self.assertEqual(self.block_holder.filter_count, 1)
+
+	def test_profiles_are_separate(self):
+		content = json.loads(json.dumps(TEST_CONTENT))
+		self.views.get(content, [FilteringOptions.AGENT_OPTIMIZED])
+		self.views.get(content, [FilteringOptions.TIMESTAMPS])
+
+		self.assertEqual(len(self.views), 2)
+		self.assertEqual(self.block_holder.filter_count, 2)
+
+	def test_discard_drops_views_of_results(self):
+		result = json.loads(json.dumps(TEST_CONTENT))
+		response = {"object": "list", "results": [result]}
+		self.views.get(result, [FilteringOptions.AGENT_OPTIMIZED])
+
+		self.views.discard(response)
+		self.assertEqual(len(self.views), 0)
+		self.assertEqual(self.views.size, 0)
+		self.assertEqual(self.views.keys_by_source, {})
+
+	def test_oldest_views_are_evicted(self):
+		self.views.max_size = 1
+		self.views.get(json.loads(json.dumps(TEST_CONTENT)), [FilteringOptions.AGENT_OPTIMIZED])
+		self.assertEqual(len(self.views), 0)
+
+	def test_view_count_is_limited(self):
+		self.views.max_entries = 2
+		contents = [json.loads(json.dumps(TEST_CONTENT)) for _ in range(3)]
+		for content in contents:
+			self.views.get(content, [FilteringOptions.AGENT_OPTIMIZED])
+
+		self.assertEqual(len(self.views), 2)
+		# Oldest view and the reference to its source are gone
+		self.assertNotIn(id(contents[0]), self.views.keys_by_source)
+		self.assertEqual([source for source, _ in self.views.entries.values()], contents[1:])
+
+	def test_changed_content_gets_new_view(self):
+		cache = BlockCache(db_path=':memory:', run_on_start=False)
+		cache.parsed_cache.on_evict = self.views.discard
+		try:
+			cache.add_block(TEST_UUID, json.dumps(TEST_CONTENT))
+			old_view = self.views.get(cache.get_block_parsed(TEST_UUID), [FilteringOptions.AGENT_OPTIMIZED])
+			self.assertEqual(len(self.views), 1)
+
+			edited = dict(TEST_CONTENT, paragraph={"rich_text": [{"text": {"content": "Edited"}, "plain_text": "Edited", "annotations": {"bold": False}}]})
+			cache.add_block(TEST_UUID, json.dumps(edited))
+			# View of replaced content is dropped with it
+			self.assertEqual(len(self.views), 0)
+
+			new_view = self.views.get(cache.get_block_parsed(TEST_UUID), [FilteringOptions.AGENT_OPTIMIZED])
+			self.assertIn("Edited", new_view.serialized)
+			self.assertNotEqual(old_view.serialized, new_view.serialized)
+		finally:
+			cache.stop_periodic_save()
+			cache.database.close()
+
+
+if __name__ == '__main__':
+	unittest.main()
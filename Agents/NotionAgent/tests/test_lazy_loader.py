@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+
+from tz_common import CustomUUID
+
+from operations.blocks.blockCache import BlockCache, ObjectType
+
+TEST_UUID_PARENT = "a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"
+TEST_UUID_CHILD_1 = "0c7cb43c-09a6-45a8-9320-573189f0f8f4"
+TEST_UUID_CHILD_2 = "123e4567-e89b-12d3-a456-426614174000"
+TEST_UUID_OTHER = "456e7890-e89b-12d3-a456-426614174001"
+TEST_UUID_NEW = "789e1234-e89b-12d3-a456-426614174002"
+TEST_TIMESTAMP_FUTURE = "2100-01-01T00:00:00.000Z"
+
+
+class TestLazyLoader(unittest.TestCase):
+
+	def setUp(self):
+		self.temp_dir = tempfile.TemporaryDirectory()
+		self.db_path = os.path.join(self.temp_dir.name, 'block_cache.db')
+		self.caches = []
+
+		seed = self.make_cache(load_from_disk=False)
+		seed.add_page(TEST_UUID_PARENT, "parent")
+		seed.add_blocks_bulk([(TEST_UUID_CHILD_1, "child_1"), (TEST_UUID_CHILD_2, "child_2")], parent_uuid=TEST_UUID_PARENT, parent_type=ObjectType.PAGE)
+		seed.add_block(TEST_UUID_OTHER, "other")
+		seed.get_block(TEST_UUID_OTHER)
+		seed.save()
+
+	def tearDown(self):
+		for cache in self.caches:
+			cache.stop_periodic_save()
+			cache.database.close()
+		self.temp_dir.cleanup()
+
+	def make_cache(self, load_from_disk: bool = True, lazy_load: bool = False) -> BlockCache:
+		cache = BlockCache(db_path=self.db_path, load_from_disk=load_from_disk, run_on_start=False, lazy_load=lazy_load)
+		self.caches.append(cache)
+		return cache
+
+	def count_in_memory(self, cache: BlockCache) -> int:
+		return cache.conn.execute('SELECT COUNT(*) FROM main.block_cache').fetchone()[0]
+
+	def test_objects_are_loaded_on_first_access(self):
+		cache = self.make_cache(lazy_load=True)
+		self.assertIsNotNone(cache.lazy_loader)
+		self.assertEqual(self.count_in_memory(cache), 0)
+
+		self.assertEqual(cache.get_block(TEST_UUID_OTHER), "other")
+		self.assertEqual(cache.get_page_parsed(TEST_UUID_PARENT), "parent")
+		self.assertEqual(self.count_in_memory(cache), 2)
+		self.assertIsNone(cache.get_block(TEST_UUID_NEW))
+
+	def test_batched_read_loads_objects(self):
+		cache = self.make_cache(lazy_load=True)
+		uuids = [CustomUUID.from_string(TEST_UUID_CHILD_1), CustomUUID.from_string(TEST_UUID_CHILD_2), CustomUUID.from_string(TEST_UUID_NEW)]
+
+		self.assertEqual(cache.get_blocks_parsed(uuids), {uuids[0]: "child_1", uuids[1]: "child_2"})
+		self.assertEqual(self.count_in_memory(cache), 2)
+
+	def test_subtree_snapshot_on_disk_is_invalidated(self):
+		seed = self.make_cache()
+		seed.add_subtree(TEST_UUID_PARENT, '{"root": "parent"}')
+		seed.save()
+
+		cache = self.make_cache(lazy_load=True)
+		cache.add_block(TEST_UUID_CHILD_1, "child_1, edited")
+
+		self.assertIsNone(cache.get_subtree_parsed(TEST_UUID_PARENT))
+		cache.save()
+		self.assertIsNone(self.make_cache(lazy_load=True).get_subtree_parsed(TEST_UUID_PARENT))
+
+	def test_relationships_and_metrics_are_copied_at_once(self):
+		cache = self.make_cache(lazy_load=True)
+
+		children = [str(child) for child in cache.get_children_uuids(TEST_UUID_PARENT)]
+		self.assertCountEqual(children, [str(CustomUUID.from_string(TEST_UUID_CHILD_1)), str(CustomUUID.from_string(TEST_UUID_CHILD_2))])
+		self.assertEqual(cache.get_metrics()["hits"], 1)
+
+	def test_copied_objects_are_not_saved_again(self):
+		cache = self.make_cache(lazy_load=True)
+		cache.get_block(TEST_UUID_OTHER)
+
+		self.assertEqual(cache.journal.pending_changes(), 0)
+		self.assertFalse(cache.is_dirty())
+
+	def test_invalidated_objects_do_not_come_back(self):
+		cache = self.make_cache(lazy_load=True)
+
+		cache.invalidate_page_if_expired(TEST_UUID_PARENT, TEST_TIMESTAMP_FUTURE)
+
+		self.assertIsNone(cache.get_page(TEST_UUID_PARENT))
+		self.assertIsNone(cache.get_block(TEST_UUID_CHILD_1))
+		self.assertIsNone(cache.get_block(TEST_UUID_CHILD_2))
+
+	def test_changes_are_saved_without_loading_everything(self):
+		cache = self.make_cache(lazy_load=True)
+		cache.add_block(TEST_UUID_NEW, "new")
+		cache.add_block(TEST_UUID_OTHER, "other changed")
+		cache.save()
+		self.assertIsNotNone(cache.lazy_loader)
+
+		reopened = self.make_cache()
+		self.assertEqual(reopened.get_block(TEST_UUID_NEW), "new")
+		self.assertEqual(reopened.get_block(TEST_UUID_OTHER), "other changed")
+		self.assertEqual(reopened.get_block(TEST_UUID_CHILD_1), "child_1")
+
+	def test_compaction_loads_remaining_objects_first(self):
+		cache = self.make_cache(lazy_load=True)
+		cache.get_block(TEST_UUID_OTHER)
+		cache.compact()
+
+		self.assertIsNone(cache.lazy_loader)
+		self.assertEqual(self.count_in_memory(cache), 4)
+		reopened = self.make_cache()
+		self.assertEqual(reopened.get_block(TEST_UUID_CHILD_2), "child_2")
+
+	def test_prewarm_loads_objects_with_children(self):
+		cache = self.make_cache(lazy_load=True)
+
+		cache.prewarm([CustomUUID.from_string(TEST_UUID_PARENT)])
+		cache._prewarmer.join()
+
+		self.assertEqual(self.count_in_memory(cache), 3)
+
+	def test_missing_file_starts_empty(self):
+		self.db_path = os.path.join(self.temp_dir.name, 'missing.db')
+		cache = self.make_cache(lazy_load=True)
+
+		self.assertIsNone(cache.lazy_loader)
+		cache.add_block(TEST_UUID_NEW, "new")
+		self.assertEqual(cache.get_block(TEST_UUID_NEW), "new")
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,72 @@
+import time
+import unittest
+from unittest.mock import patch
+
+from tz_common import CustomUUID
+
+from operations.blocks.blockCache import ObjectType
+from operations.blocks.negativeCache import NegativeCache
+from operations.exceptions import HTTPError
+
+TEST_UUID_1 = "a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"
+TEST_UUID_2 = "0c7cb43c-09a6-45a8-9320-573189f0f8f4"
+
+
+class TestNegativeCache(unittest.TestCase):
+
+	def setUp(self):
+		self.cache = NegativeCache(ttl=60, max_entries=2)
+
+	def test_returns_recorded_error(self):
+		self.cache.record(TEST_UUID_1, ObjectType.PAGE, HTTPError("get_page_raw", 404, details={"code": "object_not_found"}))
+
+		error = self.cache.get(TEST_UUID_1, ObjectType.PAGE)
+
+		self.assertIsInstance(error, HTTPError)
+		self.assertEqual(error.operation, "get_page_raw")
+		self.assertEqual(error.status_code, 404)
+		self.assertEqual(error.details, {"code": "object_not_found"})
+
+	def test_entries_are_per_type(self):
+		self.cache.record(TEST_UUID_1, ObjectType.DATABASE, HTTPError("query_database_raw", 404))
+
+		self.assertIsNone(self.cache.get(TEST_UUID_1, ObjectType.BLOCK))
+
+	def test_ids_are_normalized(self):
+		self.cache.record(CustomUUID.from_string(TEST_UUID_1), ObjectType.PAGE, HTTPError("get_page_raw", 403))
+
+		self.assertIsNotNone(self.cache.get(TEST_UUID_1.replace("-", "").upper(), ObjectType.PAGE))
+
+	def test_only_missing_or_unshared_objects_are_recorded(self):
+		self.assertFalse(self.cache.record(TEST_UUID_1, ObjectType.PAGE, HTTPError("get_page_raw", 500)))
+		self.assertFalse(self.cache.record(TEST_UUID_1, ObjectType.PAGE, HTTPError("get_page_raw", 429)))
+
+		self.assertIsNone(self.cache.get(TEST_UUID_1, ObjectType.PAGE))
+
+	def test_entries_expire(self):
+		self.cache.record(TEST_UUID_1, ObjectType.PAGE, HTTPError("get_page_raw", 404))
+
+		with patch('operations.blocks.negativeCache.time.monotonic', return_value=time.monotonic() + 61):
+			self.assertIsNone(self.cache.get(TEST_UUID_1, ObjectType.PAGE))
+		self.assertEqual(len(self.cache.entries), 0)
+
+	def test_remove_forgets_all_types(self):
+		self.cache.record(TEST_UUID_1, ObjectType.PAGE, HTTPError("get_page_raw", 404))
+		self.cache.record(TEST_UUID_1, ObjectType.BLOCK, HTTPError("get_block_children_raw", 404))
+
+		self.cache.remove(TEST_UUID_1)
+
+		self.assertIsNone(self.cache.get(TEST_UUID_1, ObjectType.PAGE))
+		self.assertIsNone(self.cache.get(TEST_UUID_1, ObjectType.BLOCK))
+
+	def test_oldest_entries_are_dropped_over_limit(self):
+		self.cache.record(TEST_UUID_1, ObjectType.PAGE, HTTPError("get_page_raw", 404))
+		self.cache.record(TEST_UUID_2, ObjectType.PAGE, HTTPError("get_page_raw", 404))
+		self.cache.record(TEST_UUID_2, ObjectType.BLOCK, HTTPError("get_block_children_raw", 404))
+
+		self.assertIsNone(self.cache.get(TEST_UUID_1, ObjectType.PAGE))
+		self.assertIsNotNone(self.cache.get(TEST_UUID_2, ObjectType.PAGE))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -6,6 +6,7 @@ from dotenv import load_dotenv
 
 from operations.notion.notionAPIClient import NotionAPIClient
 from operations.blocks.blockHolder import BlockHolder
+from operations.blocks.negativeCache import NegativeCache
 from operations.urlIndex import UrlIndex
 from operations.exceptions import HTTPError
 from tz_common import CustomUUID
@@ -92,6 +93,33 @@ async def test_get_page_raw_error(mock_block_holder):
 		assert exc_info.value.operation == "get_page_raw"
 
 
+@pytest.mark.asyncio
+async def test_get_block_raw_success(mock_block_holder):
+	"""Test retrieval of a single block without its children."""
+	token = "test_token"
+	client = NotionAPIClient(token, mock_block_holder)
+	
+	mock_response = AsyncMock()
+	mock_response.status_code = 200
+	mock_response.json = lambda: {"id": "block-id", "object": "block"}
+	
+	with patch('operations.notion.notionAPIClient.AsyncClientManager.wait_for_next_request'), \
+		 patch('operations.notion.notionAPIClient.AsyncClientManager.get_client') as mock_get_client:
+		
+		mock_client = AsyncMock()
+		mock_client.get.return_value = mock_response
+		mock_get_client.return_value = mock_client
+		
+		result = await client.get_block_raw("block-id")
+		
+		assert result == {"id": "block-id", "object": "block"}
+		mock_client.get.assert_called_once_with(
+			"https://api.notion.com/v1/blocks/block-id",
+			headers=client.headers,
+			timeout=30.0
+		)
+
+
 @pytest.mark.asyncio
 async def test_get_block_children_raw_with_cursor(mock_block_holder):
 	"""Test block children retrieval with pagination cursor."""
@@ -195,6 +223,62 @@ async def test_initialization_only(mock_block_holder):
 	assert client.notion_token == token
 
 
+@pytest.mark.asyncio
+async def test_missing_page_is_answered_locally(mock_block_holder):
+	"""Test that a repeated request for a missing page fails with the original error without reaching the API."""
+	client = NotionAPIClient("test_token", mock_block_holder, negative_cache=NegativeCache())
+	
+	mock_response = AsyncMock()
+	mock_response.status_code = 404
+	mock_response.json = lambda: {"code": "object_not_found", "message": "Page not found"}
+	mock_block_holder.clean_error_message.side_effect = lambda message: message
+	
+	with patch('operations.notion.notionAPIClient.AsyncClientManager.wait_for_next_request'), \
+		 patch('operations.notion.notionAPIClient.AsyncClientManager.get_client') as mock_get_client:
+		
+		mock_client = AsyncMock()
+		mock_client.get.return_value = mock_response
+		mock_get_client.return_value = mock_client
+		
+		with pytest.raises(HTTPError):
+			await client.get_page_raw("missing-page-id")
+		with pytest.raises(HTTPError) as exc_info:
+			await client.get_page_raw("missing-page-id")
+		
+		assert exc_info.value.status_code == 404
+		assert exc_info.value.operation == "get_page_raw"
+		assert exc_info.value.details["code"] == "object_not_found"
+		mock_client.get.assert_called_once()
+		
+		# Same ID is still requested as another object type
+		with pytest.raises(HTTPError):
+			await client.get_block_children_raw("missing-page-id")
+		assert mock_client.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_server_error_is_not_cached(mock_block_holder):
+	"""Test that errors other than 404 and 403 are retried."""
+	client = NotionAPIClient("test_token", mock_block_holder, negative_cache=NegativeCache())
+	
+	mock_response = AsyncMock()
+	mock_response.status_code = 500
+	mock_response.json = lambda: {"message": "Internal error"}
+	
+	with patch('operations.notion.notionAPIClient.AsyncClientManager.wait_for_next_request'), \
+		 patch('operations.notion.notionAPIClient.AsyncClientManager.get_client') as mock_get_client:
+		
+		mock_client = AsyncMock()
+		mock_client.get.return_value = mock_response
+		mock_get_client.return_value = mock_client
+		
+		for _ in range(2):
+			with pytest.raises(HTTPError):
+				await client.get_database_raw("database-id")
+		
+		assert mock_client.get.call_count == 2
+
+
 # Integration test (only runs if NOTION_TOKEN is available)
 @pytest.mark.asyncio
 async def test_real_api_call(api_client):
@@ -10,9 +10,10 @@ from ..operations.blocks.cacheOrchestrator import CacheOrchestrator
 from ..operations.blocks.blockDict import BlockDict
 from ..operations.blocks.blockCache import ObjectType
 from ..operations.blocks.blockTree import BlockTree
+from ..operations.blocks.subtreeSnapshot import SubtreeSnapshot
 from ..operations.exceptions import (
 	InvalidUUIDError, BlockTreeRequiredError, CacheRetrievalError, 
-	APIError, ObjectTypeVerificationError
+	APIError, ObjectTypeVerificationError, HTTPError
 )
 
 
@@ -80,7 +81,28 @@ class TestNotionService:
 	@pytest.fixture
 	def mock_cache_orchestrator(self):
 		"""Create mock cache orchestrator."""
-		return MagicMock(spec=CacheOrchestrator)
+		mock = MagicMock(spec=CacheOrchestrator)
+		mock.get_cached_subtree.return_value = None
+		mock.get_cached_title_matches.return_value = None
+
+		# Single-flight fetches run the fetcher and store results like the real orchestrator
+		async def fetch_block_children(block_id, fetcher_func, start_cursor=None):
+			return await fetcher_func()
+
+		async def fetch_search_results(query, fetcher_func, filter_str=None, start_cursor=None, ttl=None):
+			return await mock.cache_search_results(query, await fetcher_func(), filter_str, start_cursor, ttl)
+
+		async def fetch_database_query_results(database_id, fetcher_func, filter_str=None, start_cursor=None):
+			return await mock.cache_database_query_results(database_id, await fetcher_func(), filter_str, start_cursor)
+
+		mock.fetch_block_children.side_effect = fetch_block_children
+		def get_cached_blocks_content(uuids):
+			contents = {uuid: mock.get_cached_block_content(uuid) for uuid in uuids}
+			return {uuid: content for uuid, content in contents.items() if content}
+		mock.get_cached_blocks_content.side_effect = get_cached_blocks_content
+		mock.fetch_search_results.side_effect = fetch_search_results
+		mock.fetch_database_query_results.side_effect = fetch_database_query_results
+		return mock
 
 	@pytest.fixture
 	def mock_index(self):
@@ -126,6 +148,11 @@ class TestNotionService:
 		mock.resolve_to_uuid.side_effect = resolve_to_uuid_side_effect
 		mock.resolve_to_int.return_value = TEST_INT_ID_PAGE
 		mock.to_int.side_effect = to_int_side_effect
+		def map_uuids_side_effect(uuids):
+			to_int = {uuid: to_int_side_effect(uuid) for uuid in uuids}
+			to_int = {uuid: int_id for uuid, int_id in to_int.items() if int_id is not None}
+			return to_int, {int_id: uuid for uuid, int_id in to_int.items()}
+		mock.map_uuids.side_effect = map_uuids_side_effect
 		mock.get_uuid.side_effect = lambda x: CustomUUID.from_string(TEST_UUID_CHILD1) if x == TEST_INT_ID_CHILD1 else CustomUUID.from_string(TEST_UUID_CHILD2)
 		return mock
 
@@ -209,6 +236,21 @@ class TestNotionService:
 		assert exc_info.value.resource_type == "page"
 		assert exc_info.value.resource_id == TEST_UUID_PAGE
 
+	@pytest.mark.asyncio
+	async def test_get_notion_page_details_unavailable_page(self, notion_service, mock_cache_orchestrator):
+		"""Test that a page known to be missing raises the recorded HTTP error rather than a cache miss."""
+		# Setup
+		details = {"code": "object_not_found", "message": "Could not find page"}
+		mock_cache_orchestrator.get_or_fetch_page.side_effect = HTTPError("get_page_raw", 404, details=details)
+
+		# Execute & Verify
+		with pytest.raises(HTTPError) as exc_info:
+			await notion_service.get_notion_page_details(page_id=TEST_UUID_PAGE)
+		
+		assert exc_info.value.status_code == 404
+		assert exc_info.value.details == details
+		assert str(exc_info.value) == f"HTTP 404 during get_page_raw: {details}"
+
 	@pytest.mark.asyncio
 	async def test_get_notion_page_details_exception_handling(self, notion_service, mock_cache_orchestrator):
 		"""Test exception handling in get_notion_page_details."""
@@ -312,6 +354,91 @@ class TestNotionService:
 		assert TEST_INT_ID_CHILD2 in result_dict
 		block_tree.add_parent.assert_called_once()
 
+	@pytest.mark.asyncio
+	async def test_get_block_content_caches_subtree_snapshot(self, notion_service, mock_cache_orchestrator, mock_api_client, mock_dependencies):
+		"""Test that a complete traversal is stored as a subtree snapshot."""
+		# Setup
+		block_tree = BlockTree()
+		root_block_result = BlockDict()
+		root_block_result.add_block(TEST_INT_ID_BLOCK, TEST_BLOCK_DATA)
+		async def mock_get_notion_page_details(page_id=None, database_id=None):
+			return root_block_result
+		notion_service.get_notion_page_details = mock_get_notion_page_details
+		mock_api_client.get_block_children_raw.return_value = {"results": [{"id": TEST_UUID_CHILD1}], "has_more": False}
+		mock_dependencies['block_manager'].process_children_batch.return_value = [CustomUUID.from_string(TEST_UUID_CHILD1)]
+		mock_cache_orchestrator.get_cached_block_content.return_value = {"object": "block", "has_children": False}
+		notion_service.subtree_snapshot_ttl = 600
+
+		# Execute
+		result = await notion_service.get_block_content(TEST_UUID_BLOCK, block_tree=block_tree)
+
+		# Verify
+		mock_cache_orchestrator.cache_subtree.assert_called_once()
+		assert mock_cache_orchestrator.cache_subtree.call_args[0][1] == 600
+		snapshot = mock_cache_orchestrator.cache_subtree.call_args[0][0]
+		assert str(snapshot.root) == str(CustomUUID.from_string(TEST_UUID_BLOCK))
+		assert snapshot.blocks.to_dict() == result.to_dict()
+		assert [(str(parent), [str(child) for child in children]) for parent, children in snapshot.edges] == [(str(CustomUUID.from_string(TEST_UUID_BLOCK)), [str(CustomUUID.from_string(TEST_UUID_CHILD1))])]
+
+	@pytest.mark.asyncio
+	async def test_get_block_content_snapshots_are_opt_in(self, notion_service, mock_cache_orchestrator, mock_api_client):
+		"""Test that by default children are always fetched and no snapshot is read or stored."""
+		# Setup
+		root_block_result = BlockDict()
+		root_block_result.add_block(TEST_INT_ID_BLOCK, TEST_BLOCK_DATA)
+		async def mock_get_notion_page_details(page_id=None, database_id=None):
+			return root_block_result
+		notion_service.get_notion_page_details = mock_get_notion_page_details
+		mock_api_client.get_block_children_raw.return_value = {"results": [], "has_more": False}
+
+		# Execute
+		await notion_service.get_block_content(TEST_UUID_BLOCK, block_tree=BlockTree())
+
+		# Verify
+		mock_cache_orchestrator.get_cached_subtree.assert_not_called()
+		mock_cache_orchestrator.cache_subtree.assert_not_called()
+		mock_api_client.get_block_children_raw.assert_called_once()
+
+	@pytest.mark.asyncio
+	async def test_get_block_content_incomplete_traversal_is_not_cached(self, notion_service, mock_cache_orchestrator, mock_api_client):
+		"""Test that a traversal with a failed block is not stored as a snapshot."""
+		# Setup
+		root_block_result = BlockDict()
+		root_block_result.add_block(TEST_INT_ID_BLOCK, TEST_BLOCK_DATA)
+		async def mock_get_notion_page_details(page_id=None, database_id=None):
+			return root_block_result
+		notion_service.get_notion_page_details = mock_get_notion_page_details
+		mock_api_client.get_block_children_raw.side_effect = Exception("API error")
+		notion_service.subtree_snapshot_ttl = 600
+
+		# Execute
+		await notion_service.get_block_content(TEST_UUID_BLOCK, block_tree=BlockTree())
+
+		# Verify
+		mock_cache_orchestrator.cache_subtree.assert_not_called()
+
+	@pytest.mark.asyncio
+	async def test_get_block_content_served_from_subtree_snapshot(self, notion_service, mock_cache_orchestrator, mock_api_client):
+		"""Test that a cached subtree snapshot is returned without any fetch."""
+		# Setup
+		root_uuid = CustomUUID.from_string(TEST_UUID_BLOCK)
+		child_uuid = CustomUUID.from_string(TEST_UUID_CHILD1)
+		snapshot = SubtreeSnapshot(root_uuid, BlockDict(blocks={TEST_INT_ID_BLOCK: TEST_BLOCK_DATA, TEST_INT_ID_CHILD1: {"object": "block"}}))
+		snapshot.add_edges(root_uuid, [child_uuid])
+		mock_cache_orchestrator.get_cached_subtree.return_value = snapshot
+		notion_service.subtree_snapshot_ttl = 600
+		block_tree = BlockTree()
+
+		# Execute
+		result = await notion_service.get_block_content(TEST_UUID_BLOCK, block_tree=block_tree)
+
+		# Verify
+		assert result.to_dict() == {TEST_INT_ID_BLOCK: TEST_BLOCK_DATA, TEST_INT_ID_CHILD1: {"object": "block"}}
+		assert block_tree.children[root_uuid] == [child_uuid]
+		mock_api_client.get_block_children_raw.assert_not_called()
+		mock_cache_orchestrator.get_or_fetch_page.assert_not_called()
+		mock_cache_orchestrator.cache_subtree.assert_not_called()
+
 	@pytest.mark.asyncio
 	async def test_get_block_content_with_no_children(self, notion_service, mock_cache_orchestrator, mock_api_client):
 		"""Test get_block_content when block has no children."""
@@ -419,6 +546,33 @@ class TestNotionService:
 		assert result == expected_result
 		mock_api_client.search_raw.assert_called_once()
 		mock_cache_orchestrator.cache_search_results.assert_called_once()
+		# Local title search is opt-in
+		mock_cache_orchestrator.get_cached_title_matches.assert_not_called()
+
+	@pytest.mark.asyncio
+	async def test_search_notion_known_titles(self, notion_service, mock_cache_orchestrator, mock_api_client):
+		"""Test search answered from titles of cached pages without an API call."""
+		# Setup
+		mock_cache_orchestrator.get_cached_search_results.return_value = None
+		expected_result = BlockDict()
+		expected_result.add_block(TEST_INT_ID_PAGE, TEST_PAGE_DATA)
+		mock_cache_orchestrator.get_cached_title_matches.return_value = expected_result
+		notion_service.local_search_count = 10
+
+		# Execute
+		result = await notion_service.search_notion(TEST_QUERY, TEST_FILTER_TYPE)
+
+		# Verify
+		assert result == expected_result
+		mock_cache_orchestrator.get_cached_title_matches.assert_called_once_with(TEST_QUERY, TEST_FILTER_TYPE, notion_service.local_search_count)
+		mock_api_client.search_raw.assert_not_called()
+
+		# Later pages of results are not matched locally
+		mock_api_client.search_raw.return_value = TEST_SEARCH_RESULTS
+		mock_cache_orchestrator.cache_search_results.return_value = expected_result
+		await notion_service.search_notion(TEST_QUERY, start_cursor=TEST_UUID_CURSOR)
+		mock_cache_orchestrator.get_cached_title_matches.assert_called_once()
+		mock_api_client.search_raw.assert_called_once()
 
 	@pytest.mark.asyncio
 	async def test_search_notion_with_cursor(self, notion_service, mock_cache_orchestrator, mock_index, mock_api_client):
@@ -0,0 +1,81 @@
+import time
+import unittest
+
+from operations.blocks.parsedCache import ParsedCache, parse_content
+
+TEST_KEY_1 = "a0eebc999c0b4ef8bb6d6bb9bd380a11"
+TEST_KEY_2 = "0c7cb43c09a645a89320573189f0f8f4"
+TEST_KEY_3 = "3d5b7a2130564ea89dc0301778710c55"
+TEST_OBJECT_TYPE = "block"
+
+
+class TestParsedCache(unittest.TestCase):
+
+	def test_parse_content(self):
+		self.assertEqual(parse_content('{"a": 1}'), {"a": 1})
+		self.assertEqual(parse_content("not json"), "not json")
+		self.assertEqual(parse_content({"a": 1}), {"a": 1})
+
+	def test_least_recently_used_entry_is_evicted(self):
+		cache = ParsedCache(max_size=20)
+		cache.put(TEST_KEY_1, TEST_OBJECT_TYPE, {"n": 1}, 10)
+		cache.put(TEST_KEY_2, TEST_OBJECT_TYPE, {"n": 2}, 10)
+
+		# Touch the first entry, so that the second one is the oldest
+		self.assertEqual(cache.get(TEST_KEY_1, TEST_OBJECT_TYPE), {"n": 1})
+		cache.put(TEST_KEY_3, TEST_OBJECT_TYPE, {"n": 3}, 10)
+
+		self.assertIsNone(cache.get(TEST_KEY_2, TEST_OBJECT_TYPE))
+		self.assertEqual(cache.get(TEST_KEY_1, TEST_OBJECT_TYPE), {"n": 1})
+		self.assertEqual(cache.get(TEST_KEY_3, TEST_OBJECT_TYPE), {"n": 3})
+		self.assertEqual(cache.size, 20)
+
+	def test_oversized_entry_is_not_stored(self):
+		cache = ParsedCache(max_size=10)
+		cache.put(TEST_KEY_1, TEST_OBJECT_TYPE, {"n": 1}, 11)
+		self.assertEqual(len(cache), 0)
+
+	def test_object_types_are_separate(self):
+		cache = ParsedCache()
+		cache.put(TEST_KEY_1, "page", {"object": "page"}, 1)
+		cache.put(TEST_KEY_1, "database", {"object": "database"}, 1)
+
+		cache.evict(TEST_KEY_1, "page")
+
+		self.assertIsNone(cache.get(TEST_KEY_1, "page"))
+		self.assertEqual(cache.get(TEST_KEY_1, "database"), {"object": "database"})
+
+	def test_expired_entry_is_not_returned(self):
+		cache = ParsedCache()
+		cache.put(TEST_KEY_1, TEST_OBJECT_TYPE, {"n": 1}, 1, expires_at=time.time() - 1)
+		cache.put(TEST_KEY_2, TEST_OBJECT_TYPE, {"n": 2}, 1, expires_at=time.time() + 3600)
+
+		self.assertIsNone(cache.get(TEST_KEY_1, TEST_OBJECT_TYPE))
+		self.assertEqual(cache.get(TEST_KEY_2, TEST_OBJECT_TYPE), {"n": 2})
+
+
+	def test_stale_entry_is_returned_within_grace(self):
+		cache = ParsedCache()
+		cache.put(TEST_KEY_1, TEST_OBJECT_TYPE, {"n": 1}, 10, expires_at=time.time() - 5)
+
+		self.assertIsNone(cache.get(TEST_KEY_1, TEST_OBJECT_TYPE))
+		self.assertEqual(cache.get_allow_stale(TEST_KEY_1, TEST_OBJECT_TYPE, 10), ({"n": 1}, True))
+		self.assertIsNone(cache.get_allow_stale(TEST_KEY_1, TEST_OBJECT_TYPE, 1))
+
+	def test_on_evict_receives_removed_values(self):
+		cache = ParsedCache(max_size=20)
+		evicted = []
+		cache.on_evict = evicted.append
+		first, second, replaced, third = {"n": 1}, {"n": 2}, {"n": 2, "edited": True}, {"n": 3}
+
+		cache.put(TEST_KEY_1, TEST_OBJECT_TYPE, first, 10)
+		cache.put(TEST_KEY_2, TEST_OBJECT_TYPE, second, 10)
+		cache.put(TEST_KEY_2, TEST_OBJECT_TYPE, replaced, 10)
+		cache.put(TEST_KEY_3, TEST_OBJECT_TYPE, third, 10)
+		cache.evict(TEST_KEY_2, TEST_OBJECT_TYPE)
+		cache.clear()
+
+		self.assertEqual([id(value) for value in evicted], [id(second), id(first), id(replaced), id(third)])
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,89 @@
+import threading
+import unittest
+
+from operations.blocks.readWriteLock import ReadWriteLock
+
+TEST_TIMEOUT = 2
+
+
+class TestReadWriteLock(unittest.TestCase):
+
+	def setUp(self):
+		self.lock = ReadWriteLock()
+
+	def test_readers_run_in_parallel(self):
+		both_inside = threading.Barrier(2, timeout=TEST_TIMEOUT)
+
+		def reader():
+			with self.lock.read():
+				both_inside.wait()
+
+		threads = [threading.Thread(target=reader) for _ in range(2)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join(TEST_TIMEOUT)
+
+		self.assertFalse(both_inside.broken)
+
+	def test_writer_excludes_readers(self):
+		self.lock.acquire_write()
+		acquired = []
+		thread = threading.Thread(target=lambda: acquired.append(self.lock.acquire_read(timeout=0.1)))
+		thread.start()
+		thread.join(TEST_TIMEOUT)
+		self.assertEqual(acquired, [False])
+
+		self.lock.release_write()
+		thread = threading.Thread(target=lambda: acquired.append(self.lock.acquire_read(timeout=0.1)))
+		thread.start()
+		thread.join(TEST_TIMEOUT)
+		self.assertEqual(acquired, [False, True])
+
+	def test_reader_excludes_writer(self):
+		with self.lock.read():
+			acquired = []
+			thread = threading.Thread(target=lambda: acquired.append(self.lock.acquire(timeout=0.1)))
+			thread.start()
+			thread.join(TEST_TIMEOUT)
+			self.assertEqual(acquired, [False])
+
+	def test_waiting_writer_blocks_new_readers(self):
+		self.lock.acquire_read()
+		writer = threading.Thread(target=lambda: self.lock.acquire_write(timeout=1))
+		writer.start()
+
+		# Give the writer time to start waiting
+		writer.join(0.1)
+		acquired = []
+		reader = threading.Thread(target=lambda: acquired.append(self.lock.acquire_read(timeout=0.1)))
+		reader.start()
+		reader.join(TEST_TIMEOUT)
+		self.assertEqual(acquired, [False])
+
+		self.lock.release_read()
+		writer.join(TEST_TIMEOUT)
+
+	def test_reentrancy(self):
+		with self.lock:
+			with self.lock:
+				with self.lock.read():
+					self.assertTrue(self.lock.is_write_owner())
+		self.assertFalse(self.lock.is_write_owner())
+
+		with self.lock.read():
+			with self.lock.read():
+				pass
+
+		# Lock is free again
+		self.assertTrue(self.lock.acquire(timeout=0))
+		self.lock.release()
+
+	def test_upgrade_raises(self):
+		with self.lock.read():
+			with self.assertRaises(RuntimeError):
+				self.lock.acquire_write()
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,108 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from operations.blocks.blockCache import BlockCache
+from operations.blocks.index import Index
+from operations.blocks.schemaMigrations import apply_migrations, get_schema_version
+
+TEST_CACHE_KEY = "a0eebc999c0b4ef8bb6d6bb9bd380a11"
+TEST_TIMESTAMP = "2023-01-01T12:00:00.123Z"
+TEST_TIMESTAMP_MS = 1672574400123
+
+TEST_MIGRATIONS = [
+	['CREATE TABLE items (id INTEGER PRIMARY KEY)'],
+	['ALTER TABLE items ADD COLUMN name TEXT'],
+]
+
+
+class TestSchemaMigrations(unittest.TestCase):
+
+	def setUp(self):
+		self.conn = sqlite3.connect(':memory:')
+		self.temp_dir = tempfile.TemporaryDirectory()
+
+	def tearDown(self):
+		self.conn.close()
+		self.temp_dir.cleanup()
+
+	def test_migrations_applied_once(self):
+		self.assertTrue(apply_migrations(self.conn, TEST_MIGRATIONS, "Test"))
+		self.assertEqual(get_schema_version(self.conn), 2)
+
+		self.assertFalse(apply_migrations(self.conn, TEST_MIGRATIONS, "Test"))
+		self.conn.execute("INSERT INTO items (id, name) VALUES (1, 'first')")
+
+	def test_failed_migration_is_rolled_back(self):
+		apply_migrations(self.conn, TEST_MIGRATIONS[:1], "Test")
+
+		broken_migrations = TEST_MIGRATIONS[:1] + [['ALTER TABLE items ADD COLUMN name TEXT', 'SELECT * FROM missing_table']]
+		with self.assertRaises(sqlite3.Error):
+			apply_migrations(self.conn, broken_migrations, "Test")
+
+		self.assertEqual(get_schema_version(self.conn), 1)
+		columns = [column[1] for column in self.conn.execute('PRAGMA table_info(items)').fetchall()]
+		self.assertNotIn("name", columns)
+
+	def test_block_cache_file_upgraded_on_load(self):
+		db_path = os.path.join(self.temp_dir.name, 'block_cache.db')
+
+		# Schema of files written before migrations were introduced
+		old_conn = sqlite3.connect(db_path)
+		old_conn.execute('''
+			CREATE TABLE block_cache (
+				cache_key TEXT NOT NULL,
+				object_type TEXT NOT NULL,
+				content TEXT,
+				timestamp TEXT,
+				ttl INTEGER,
+				PRIMARY KEY (cache_key, object_type)
+			)
+		''')
+		old_conn.execute("INSERT INTO block_cache VALUES (?, 'block', 'content', ?, NULL)", (TEST_CACHE_KEY, TEST_TIMESTAMP))
+		old_conn.commit()
+		old_conn.close()
+
+		cache = BlockCache(db_path=db_path, load_from_disk=True, run_on_start=False)
+
+		self.assertEqual(get_schema_version(cache.conn), len(BlockCache.MIGRATIONS))
+		cache.cursor.execute('SELECT timestamp_ms FROM block_cache WHERE cache_key = ?', (TEST_CACHE_KEY,))
+		self.assertEqual(cache.cursor.fetchone()[0], TEST_TIMESTAMP_MS)
+		index_names = [row[0] for row in cache.cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()]
+		self.assertIn('idx_block_relationships_child_id', index_names)
+		# Upgraded file must be rewritten as a whole
+		self.assertTrue(cache.journal.snapshot_required)
+
+		cache.save()
+		reloaded = BlockCache(db_path=db_path, load_from_disk=True, run_on_start=False)
+		self.assertFalse(reloaded.journal.snapshot_required)
+		self.assertEqual(reloaded.get_block(TEST_CACHE_KEY), 'content')
+
+	def test_block_cache_relationships_keyed_by_integer_ids(self):
+		db_path = os.path.join(self.temp_dir.name, 'block_cache.db')
+		child_key = "0c7cb43c09a645a89320573189f0f8f4"
+
+		# Files written before relationships were keyed by integer IDs
+		old_conn = sqlite3.connect(db_path)
+		old_conn.execute('CREATE TABLE block_cache (cache_key TEXT NOT NULL, object_type TEXT NOT NULL, content TEXT, timestamp TEXT, ttl INTEGER, PRIMARY KEY (cache_key, object_type))')
+		old_conn.execute('CREATE TABLE block_relationships (parent_key TEXT, child_key TEXT, PRIMARY KEY (parent_key, child_key))')
+		apply_migrations(old_conn, BlockCache.MIGRATIONS[:5], "Test")
+		old_conn.execute('INSERT INTO block_relationships VALUES (?, ?)', (TEST_CACHE_KEY, child_key))
+		old_conn.commit()
+		old_conn.close()
+
+		cache = BlockCache(db_path=db_path, load_from_disk=True, run_on_start=False)
+
+		self.assertEqual(get_schema_version(cache.conn), len(BlockCache.MIGRATIONS))
+		self.assertEqual([str(uuid) for uuid in cache.get_children_uuids(TEST_CACHE_KEY)], [child_key])
+		columns = [column[1] for column in cache.cursor.execute('PRAGMA table_info(block_relationships)').fetchall()]
+		self.assertEqual(columns, ['parent_id', 'child_id'])
+
+	def test_index_migrated(self):
+		index = Index(db_path=os.path.join(self.temp_dir.name, 'index.db'), load_from_disk=False, run_on_start=False)
+		self.assertEqual(get_schema_version(index.db_conn), len(Index.MIGRATIONS))
+
+
+if __name__ == '__main__':
+	unittest.main()
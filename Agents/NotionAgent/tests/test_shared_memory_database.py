@@ -0,0 +1,56 @@
+import sqlite3
+import threading
+import unittest
+
+from operations.blocks.sharedMemoryDatabase import SharedMemoryDatabase
+
+TEST_TIMEOUT = 2
+
+
+class TestSharedMemoryDatabase(unittest.TestCase):
+
+	def setUp(self):
+		self.database = SharedMemoryDatabase("test")
+		self.database.writer.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)')
+		self.database.writer.execute("INSERT INTO items (id, name) VALUES (1, 'first')")
+		self.database.writer.commit()
+
+	def tearDown(self):
+		self.database.close()
+
+	def test_instances_are_separate(self):
+		other = SharedMemoryDatabase("test")
+		with other.lock.read():
+			rows = other.read("SELECT name FROM sqlite_master WHERE name = 'items'")
+		other.close()
+		self.assertEqual(rows, [])
+
+	def test_other_threads_read_committed_rows(self):
+		results = []
+
+		def reader():
+			with self.database.lock.read():
+				results.append(self.database.read('SELECT name FROM items WHERE id = ?', (1,)))
+
+		threads = [threading.Thread(target=reader) for _ in range(4)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join(TEST_TIMEOUT)
+
+		self.assertEqual(results, [[("first",)]] * 4)
+
+	def test_writer_reads_its_uncommitted_changes(self):
+		with self.database.lock:
+			self.database.writer.execute("INSERT INTO items (id, name) VALUES (2, 'second')")
+			self.assertEqual(self.database.read('SELECT COUNT(*) FROM items'), [(2,)])
+			self.database.writer.commit()
+
+	def test_readers_are_read_only(self):
+		with self.database.lock.read():
+			with self.assertRaises(sqlite3.OperationalError):
+				self.database._reader().execute("DELETE FROM items")
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,102 @@
+import json
+import unittest
+
+from tz_common import CustomUUID
+
+from operations.blocks.blockCache import BlockCache, ObjectType
+from operations.blocks.blockDict import BlockDict
+from operations.blocks.blockTree import BlockTree
+from operations.blocks.subtreeSnapshot import SubtreeSnapshot
+
+TEST_UUID_PAGE = "a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"
+TEST_UUID_CHILD = "0c7cb43c-09a6-45a8-9320-573189f0f8f4"
+TEST_UUID_GRANDCHILD = "123e4567-e89b-12d3-a456-426614174000"
+TEST_UUID_OTHER = "456e7890-e89b-12d3-a456-426614174001"
+TEST_TIMESTAMP_FUTURE = "2100-01-01T00:00:00.000Z"
+
+
+class TestSubtreeSnapshot(unittest.TestCase):
+
+	def setUp(self):
+		self.cache = BlockCache(db_path=':memory:', run_on_start=False)
+		self.cache.add_page(TEST_UUID_PAGE, '{"object": "page"}')
+		self.cache.add_block(TEST_UUID_CHILD, '{"text": "child"}', parent_uuid=TEST_UUID_PAGE, parent_type=ObjectType.PAGE)
+		self.cache.add_block(TEST_UUID_GRANDCHILD, '{"text": "grandchild"}', parent_uuid=TEST_UUID_CHILD)
+		self.cache.add_block(TEST_UUID_OTHER, '{"text": "other"}')
+
+		self.page_uuid = CustomUUID.from_string(TEST_UUID_PAGE)
+		self.child_uuid = CustomUUID.from_string(TEST_UUID_CHILD)
+		self.grandchild_uuid = CustomUUID.from_string(TEST_UUID_GRANDCHILD)
+		self.store_snapshots()
+
+	def tearDown(self):
+		self.cache.stop_periodic_save()
+		self.cache.database.close()
+
+	def store_snapshots(self):
+		page_snapshot = SubtreeSnapshot(self.page_uuid, BlockDict(blocks={1: {"object": "page"}, 2: {"text": "child"}}))
+		page_snapshot.add_edges(self.page_uuid, [self.child_uuid])
+		page_snapshot.add_edges(self.child_uuid, [self.grandchild_uuid])
+		self.cache.add_subtree(self.page_uuid, page_snapshot.to_json())
+		self.cache.add_subtree(self.child_uuid, SubtreeSnapshot(self.child_uuid).to_json())
+
+	def test_round_trip(self):
+		parsed = self.cache.get_subtree_parsed(self.page_uuid)
+		snapshot = SubtreeSnapshot.from_dict(parsed)
+
+		self.assertEqual(str(snapshot.root), str(self.page_uuid))
+		self.assertEqual(snapshot.blocks.to_dict(), {1: {"object": "page"}, 2: {"text": "child"}})
+
+		block_tree = BlockTree()
+		snapshot.apply_to_tree(block_tree)
+		self.assertEqual([str(child) for child in block_tree.children[self.page_uuid]], [str(self.child_uuid)])
+		self.assertEqual([str(child) for child in block_tree.children[self.child_uuid]], [str(self.grandchild_uuid)])
+
+	def test_unrelated_changes_keep_snapshots(self):
+		self.cache.add_block(TEST_UUID_OTHER, '{"text": "other, edited"}')
+		# Unchanged content and repeated relationships are no change
+		self.cache.add_block(TEST_UUID_GRANDCHILD, '{"text": "grandchild"}', parent_uuid=TEST_UUID_CHILD)
+		self.cache.get_block(TEST_UUID_GRANDCHILD)
+		self.cache.save()
+
+		self.assertIsNotNone(self.cache.get_subtree_parsed(self.page_uuid))
+		self.assertIsNotNone(self.cache.get_subtree_parsed(self.child_uuid))
+
+	def test_changed_descendant_invalidates_ancestor_snapshots(self):
+		self.cache.add_block(TEST_UUID_GRANDCHILD, '{"text": "grandchild, edited"}')
+
+		self.assertIsNone(self.cache.get_subtree_parsed(self.page_uuid))
+		self.assertIsNone(self.cache.get_subtree_parsed(self.child_uuid))
+
+	def test_new_child_invalidates_only_its_ancestors(self):
+		self.cache.add_block(TEST_UUID_OTHER, '{"text": "other"}', parent_uuid=TEST_UUID_PAGE, parent_type=ObjectType.PAGE)
+
+		self.assertIsNone(self.cache.get_subtree_parsed(self.page_uuid))
+		self.assertIsNotNone(self.cache.get_subtree_parsed(self.child_uuid))
+
+	def test_recursive_invalidation_reaches_ancestors(self):
+		# Links of the invalidated block are deleted with it, its parent still leads to the page
+		self.cache.invalidate_block_if_expired(self.child_uuid, TEST_TIMESTAMP_FUTURE)
+
+		self.assertIsNone(self.cache.get_subtree_parsed(self.child_uuid))
+		self.assertIsNone(self.cache.get_subtree_parsed(self.page_uuid))
+		self.assertIsNotNone(self.cache.get_page(self.page_uuid))
+
+	def test_snapshot_is_not_an_object_type_of_its_root(self):
+		self.cache.cursor.execute('DELETE FROM block_cache WHERE object_type = ?', (ObjectType.PAGE.value,))
+		self.cache.conn.commit()
+
+		# Only the snapshot is left, the UUID may be looked up as any type
+		self.cache.verify_object_type_or_raise(self.page_uuid, ObjectType.PAGE)
+		self.cache.verify_object_type_or_raise(self.page_uuid, ObjectType.DATABASE)
+
+	def test_changes_before_store_do_not_invalidate_new_snapshot(self):
+		self.cache.add_block(TEST_UUID_GRANDCHILD, '{"text": "grandchild, edited"}')
+		self.cache.add_subtree(self.child_uuid, json.dumps({"root": TEST_UUID_CHILD, "blocks": [], "edges": []}))
+
+		self.assertIsNotNone(self.cache.get_subtree_parsed(self.child_uuid))
+		self.assertIsNone(self.cache.get_subtree_parsed(self.page_uuid))
+
+
+if __name__ == '__main__':
+	unittest.main()
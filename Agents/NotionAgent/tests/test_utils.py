@@ -17,6 +17,11 @@ class TestUtils(unittest.TestCase):
 		self.assertEqual(len(time_str), 24)  # Format: "2023-04-26T12:34:56.789Z"
 		self.assertTrue(time_str.endswith("Z"))
 
+	def test_convert_isoformat_to_epoch_ms(self):
+		self.assertEqual(Utils.convert_isoformat_to_epoch_ms("2023-01-01T12:00:00.123Z"), 1672574400123)
+		self.assertEqual(Utils.convert_isoformat_to_epoch_ms("2023-01-01T12:00:00.123456Z"), 1672574400123)
+		self.assertEqual(Utils.convert_isoformat_to_epoch_ms("2023-01-01T14:00:00+02:00"), 1672574400000)
+
 
 if __name__ == "__main__":
 	unittest.main() 
\ No newline at end of file
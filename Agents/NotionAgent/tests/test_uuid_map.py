@@ -0,0 +1,77 @@
+import unittest
+
+from tz_common import CustomUUID
+
+from operations.blocks.index import Index
+from operations.blocks.uuidMap import UuidMap
+
+TEST_UUID_1 = "a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"
+TEST_UUID_2 = "0c7cb43c-09a6-45a8-9320-573189f0f8f4"
+
+
+class TestUuidMap(unittest.TestCase):
+
+	def setUp(self):
+		self.index = Index(db_path=':memory:', load_from_disk=False, run_on_start=False)
+		self.uuid_1 = CustomUUID.from_string(TEST_UUID_1)
+		self.uuid_2 = CustomUUID.from_string(TEST_UUID_2)
+
+	def tearDown(self):
+		self.index.database.close()
+
+	def fail_on_query(self):
+		def read(sql, parameters=()):
+			raise AssertionError(f"Unexpected query: {sql}")
+		self.index.database.read = read
+
+	def test_add_remove(self):
+		uuid_map = UuidMap()
+		uuid_map.add(7, str(self.uuid_1))
+
+		self.assertEqual(uuid_map.get_int(str(self.uuid_1)), 7)
+		self.assertEqual(uuid_map.get_uuid(7), self.uuid_1)
+
+		uuid_map.remove(str(self.uuid_1))
+		self.assertIsNone(uuid_map.get_int(str(self.uuid_1)))
+		self.assertIsNone(uuid_map.get_uuid(7))
+		self.assertEqual(len(uuid_map), 0)
+
+	def test_known_uuids_are_resolved_without_queries(self):
+		int_id_1 = self.index.add_uuid(self.uuid_1)
+		int_id_2 = self.index.add_uuid(self.uuid_2)
+		self.fail_on_query()
+
+		self.assertEqual(self.index.add_uuid(self.uuid_1), int_id_1)
+		self.assertEqual(self.index.to_int(self.uuid_2), int_id_2)
+		self.assertEqual(self.index.get_uuid(int_id_1), self.uuid_1)
+		self.assertEqual(self.index.resolve_to_uuid(str(int_id_2)), self.uuid_2)
+		self.assertEqual(self.index.map_uuids([self.uuid_1, self.uuid_2])[0], {self.uuid_1: int_id_1, self.uuid_2: int_id_2})
+
+	def test_rows_missing_in_map_are_looked_up(self):
+		self.index.cursor.execute('INSERT INTO index_data (uuid, name) VALUES (?, ?)', (str(self.uuid_1), ""))
+		self.index.db_conn.commit()
+		int_id = self.index.cursor.lastrowid
+
+		self.assertEqual(self.index.get_uuid(int_id), self.uuid_1)
+		self.fail_on_query()
+		self.assertEqual(self.index.to_int(self.uuid_1), int_id)
+
+	def test_map_is_loaded_with_the_index(self):
+		int_id = self.index.add_uuid(self.uuid_1)
+		self.index.uuid_map = UuidMap()
+		self.index._load_uuid_map()
+
+		self.fail_on_query()
+		self.assertEqual(self.index.to_int(self.uuid_1), int_id)
+
+	def test_deleted_uuid_gets_new_id(self):
+		int_id = self.index.add_uuid(self.uuid_1)
+		self.index.delete_uuid(self.uuid_1)
+
+		self.assertIsNone(self.index.to_int(self.uuid_1))
+		self.assertIsNone(self.index.get_uuid(int_id))
+		self.assertNotEqual(self.index.add_uuid(self.uuid_1), int_id)
+
+
+if __name__ == '__main__':
+	unittest.main()
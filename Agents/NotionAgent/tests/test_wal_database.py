@@ -0,0 +1,113 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from tz_common import CustomUUID
+
+from operations.blocks.blockCache import BlockCache
+from operations.blocks.changeJournal import PersistenceMode
+from operations.blocks.index import Index
+from operations.blocks.walDatabase import WalDatabase
+
+TEST_UUID_1 = "a0eebc99-9c0b-4ef8-bb6d-6bb9bd380a11"
+TEST_UUID_2 = "0c7cb43c-09a6-45a8-9320-573189f0f8f4"
+
+
+class TestWalDatabase(unittest.TestCase):
+
+	def setUp(self):
+		self.temp_dir = tempfile.TemporaryDirectory()
+		self.cache_path = os.path.join(self.temp_dir.name, 'block_cache.db')
+		self.index_path = os.path.join(self.temp_dir.name, 'index.db')
+		self.storages = []
+
+	def tearDown(self):
+		for storage in self.storages:
+			storage.stop_periodic_save()
+			storage.database.close()
+		self.temp_dir.cleanup()
+
+	def make_cache(self) -> BlockCache:
+		cache = BlockCache(db_path=self.cache_path, load_from_disk=True, run_on_start=False, persistence_mode=PersistenceMode.WAL)
+		self.storages.append(cache)
+		return cache
+
+	def make_index(self) -> Index:
+		index = Index(db_path=self.index_path, load_from_disk=True, run_on_start=False, persistence_mode=PersistenceMode.WAL)
+		self.storages.append(index)
+		return index
+
+	def test_database_is_in_wal_mode(self):
+		database = WalDatabase(self.cache_path)
+		journal_mode = database.writer.execute('PRAGMA journal_mode').fetchone()[0]
+		with database.lock.read():
+			mmap_size = database.read('PRAGMA mmap_size')[0][0]
+		database.close()
+
+		self.assertEqual(journal_mode, "wal")
+		self.assertEqual(mmap_size, WalDatabase.MMAP_SIZE)
+
+	def test_readers_see_commits_without_blocking_writer(self):
+		database = WalDatabase(self.cache_path)
+		database.writer.execute('CREATE TABLE items (id INTEGER PRIMARY KEY)')
+		database.writer.commit()
+
+		# Open transaction on the writer doesn't prevent reads of the last committed state
+		with database.lock:
+			database.writer.execute('INSERT INTO items (id) VALUES (1)')
+			counts = []
+			reader = threading.Thread(target=lambda: counts.append(database._reader().execute('SELECT COUNT(*) FROM items').fetchone()[0]))
+			reader.start()
+			reader.join()
+			database.writer.commit()
+
+		self.assertEqual(counts, [0])
+		with database.lock.read():
+			self.assertEqual(database.read('SELECT COUNT(*) FROM items'), [(1,)])
+		database.close()
+
+	def test_cache_changes_are_on_disk_without_save(self):
+		cache = self.make_cache()
+		self.assertIsNone(cache.journal)
+		cache.add_block(TEST_UUID_1, "content_1")
+		cache.add_block(TEST_UUID_2, "content_2", parent_uuid=TEST_UUID_1)
+
+		reopened = self.make_cache()
+		self.assertEqual(reopened.get_block(TEST_UUID_1), "content_1")
+		self.assertEqual([str(child) for child in reopened.get_children_uuids(TEST_UUID_1)], [str(CustomUUID.from_string(TEST_UUID_2))])
+
+	def test_cache_save_folds_metrics_and_checkpoints(self):
+		cache = self.make_cache()
+		cache.add_block(TEST_UUID_1, "content_1")
+		cache.get_block(TEST_UUID_1)
+		cache.save()
+		cache.compact()
+
+		reopened = self.make_cache()
+		self.assertEqual(reopened.get_metrics()["hits"], 1)
+		self.assertEqual(os.path.getsize(self.cache_path + "-wal"), 0)
+
+	def test_index_changes_are_on_disk_without_save(self):
+		index = self.make_index()
+		int_id = index.add_uuid(CustomUUID.from_string(TEST_UUID_1), "Page")
+
+		reopened = self.make_index()
+		self.assertEqual(reopened.to_int(CustomUUID.from_string(TEST_UUID_1)), int_id)
+		self.assertEqual(reopened.get_name(int_id), "Page")
+
+	def test_index_cleanup_keeps_pending_visits(self):
+		index = self.make_index()
+		int_id = index.add_uuid(CustomUUID.from_string(TEST_UUID_1), "Page")
+		index.visit_int(int_id)
+		index.visit_int(int_id)
+
+		index.save_enabled = True
+		index.cleanup()
+
+		reopened = self.make_index()
+		self.assertIn(f"{int_id}: Page - visits: 2", reopened.get_most_popular(1))
+
+
+if __name__ == '__main__':
+	unittest.main()